@@ -0,0 +1,70 @@
+"""
+Benchmark of a single Gauß-Helmert iteration of the alignment.
+
+Compares the block-diagonal solver with a sparse LU factorization of
+B @ Σ_ll @ B.T for the reduced normal equations.
+
+Usage: python -m benchmarks.alignment
+"""
+
+import logging
+
+import numpy as np
+from scipy.sparse.linalg import spsolve
+
+from benchmarks.utils import add_noise, generate_trajectory, timed
+from trajectopy_core.alignment.block_solver import BlockDiagonalSolver
+from trajectopy_core.alignment.data import AlignmentData
+from trajectopy_core.alignment.estimation import AlignmentEstimation
+from trajectopy_core.settings.alignment import AlignmentEstimationSettings, AlignmentSettings
+from trajectopy_core.settings.matching import MatchingSettings
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+
+def sparse_iteration(estimation: AlignmentEstimation, a_design: np.ndarray, contradiction_w: np.ndarray) -> np.ndarray:
+    """Reference implementation using sparse LU"""
+    b_cond = estimation._get_condition_matrix()
+    bbt = b_cond @ estimation.data.sigma_ll @ b_cond.T
+    delta_params = -np.linalg.solve(a_design.T @ spsolve(bbt, a_design), a_design.T @ spsolve(bbt, contradiction_w))
+    correlates_k = -spsolve(bbt, a_design @ delta_params + contradiction_w)
+    return estimation.data.sigma_ll @ b_cond.T @ correlates_k
+
+
+def block_iteration(estimation: AlignmentEstimation, a_design: np.ndarray, contradiction_w: np.ndarray) -> np.ndarray:
+    solver = BlockDiagonalSolver(cond_stack=estimation._get_condition_stack(), var_vector=estimation.data.var_vector)
+    normal_matrix, normal_rhs = solver.normal_equations(a_design, contradiction_w)
+    delta_params = -np.linalg.solve(normal_matrix, normal_rhs)
+    correlates_k = -solver.solve(a_design @ delta_params + contradiction_w)
+    return solver.residuals(correlates_k)
+
+
+def main():
+    settings = AlignmentSettings(
+        estimation_settings=AlignmentEstimationSettings.from_components(
+            similarity=True, leverarm=True, auto_update=False
+        )
+    )
+
+    for num in (10_000, 100_000, 500_000):
+        traj_from = generate_trajectory(num)
+        traj_to = add_noise(traj_from)
+        alignment_data = AlignmentData(
+            traj_from=traj_from, traj_to=traj_to, alignment_settings=settings, matching_settings=MatchingSettings()
+        )
+        estimation = AlignmentEstimation(alignment_data=alignment_data)
+        a_design = estimation._get_design_matrix()[:, settings.estimation_settings.lq_parameter_filter]
+        contradiction_w = estimation._eval_functional_relationship()
+
+        duration_block, res_block = timed(block_iteration, estimation, a_design, contradiction_w)
+        duration_sparse, res_sparse = timed(sparse_iteration, estimation, a_design, contradiction_w)
+        max_diff = np.max(np.abs(res_block - res_sparse))
+
+        print(
+            f"{num:>7} epochs | block: {duration_block:7.3f} s | sparse: {duration_sparse:7.3f} s "
+            f"(speedup {duration_sparse / duration_block:.1f}x, max residual diff {max_diff:.1e})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Benchmark of the trajectory approximation.
+
+Approximates the positions using piecewise cubic polynomials and the
+orientations using a moving window average.
+
+Usage: python -m benchmarks.approximation
+"""
+
+import logging
+
+from benchmarks.utils import add_noise, generate_trajectory, timed
+from trajectopy_core.approximation.cubic_approximation import piecewise_cubic
+from trajectopy_core.settings.approximation import ApproximationSettings
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+
+def main():
+    settings = ApproximationSettings()
+
+    for num in (100_000, 1_000_000):
+        trajectory = add_noise(generate_trajectory(num))
+
+        duration_cubic, _ = timed(
+            piecewise_cubic,
+            function_of=trajectory.function_of,
+            values=trajectory.xyz,
+            int_size=settings.fe_int_size,
+            min_obs=settings.fe_min_obs,
+        )
+        duration_total, _ = timed(trajectory.approximate, settings, inplace=False)
+        print(f"{num:>9} epochs | piecewise cubic: {duration_cubic:7.3f} s | approximate: {duration_total:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
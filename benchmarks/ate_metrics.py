@@ -0,0 +1,39 @@
+"""
+Benchmark of the ATE summary statistics.
+
+Times the first and repeated access of the summary statistics of an
+ATE result as done by the reports, i.e. property_dict and the metrics
+tables of the bar plots.
+
+Usage: python -m benchmarks.ate_metrics
+"""
+
+import logging
+
+from benchmarks.utils import add_noise, generate_trajectory, timed
+from trajectopy_core.evaluation.comparison import compare_trajectories_absolute
+from trajectopy_core.plotting.plotly.bar_plots import to_pos_metrics_df, to_rot_metrics_df
+from trajectopy_core.report.data import ATEReportData, ATEReportDataCollection
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+
+def report_statistics(ate_result):
+    ate_result.property_dict
+    collection = ATEReportDataCollection([ATEReportData(ate_result=ate_result)])
+    to_pos_metrics_df(collection)
+    to_rot_metrics_df(collection)
+
+
+def main():
+    for num in (100_000, 1_000_000):
+        traj_ref = generate_trajectory(num)
+        ate_result = compare_trajectories_absolute(traj_test=add_noise(traj_ref), traj_ref=traj_ref)
+
+        duration_first, _ = timed(report_statistics, ate_result)
+        duration_repeated, _ = timed(report_statistics, ate_result)
+        print(f"{num:>9} deviations | first: {duration_first:7.3f} s | repeated: {duration_repeated:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
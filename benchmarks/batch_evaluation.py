@@ -0,0 +1,46 @@
+"""
+Benchmark of evaluating many estimates against one ground truth.
+
+Compares evaluating the estimates one after another with the
+parallel batch evaluation.
+
+Usage: python -m benchmarks.batch_evaluation
+"""
+
+import logging
+import os
+
+from benchmarks.utils import add_noise, generate_trajectory, timed
+from trajectopy_core.evaluation.batch import evaluate_batch
+from trajectopy_core.evaluation.metrics import ate, rpe
+from trajectopy_core.settings.matching import MatchingMethod
+from trajectopy_core.settings.processing import ProcessingSettings
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+NUM_ESTIMATES = 8
+
+
+def evaluate_sequential(traj_gt, estimates, settings: ProcessingSettings) -> None:
+    for traj_est in estimates:
+        ate(trajectory_gt=traj_gt.copy(), trajectory_est=traj_est.copy(), settings=settings)
+        rpe(trajectory_gt=traj_gt.copy(), trajectory_est=traj_est.copy(), settings=settings)
+
+
+def main():
+    settings = ProcessingSettings()
+    settings.matching.method = MatchingMethod.NEAREST_TEMPORAL
+
+    traj_gt = generate_trajectory(50_000)
+    estimates = [add_noise(traj_gt) for _ in range(NUM_ESTIMATES)]
+
+    duration_sequential, _ = timed(evaluate_sequential, traj_gt, estimates, settings)
+    print(f"{NUM_ESTIMATES} estimates | sequential: {duration_sequential:7.3f} s")
+
+    for max_workers in sorted({2, os.cpu_count() or 1}):
+        duration, _ = timed(evaluate_batch, traj_gt, estimates, settings, True, max_workers)
+        print(f"{NUM_ESTIMATES} estimates | batch with {max_workers} workers: {duration:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
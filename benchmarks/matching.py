@@ -0,0 +1,85 @@
+"""
+Benchmark of temporal matching.
+
+Compares matching timestamps using a KDTree with the tree-free
+temporal matcher for sorted and unsorted timestamps and measures
+the spatially interpolated matching. Finally, several estimates are
+matched spatially against one ground truth with and without the
+reference index cache.
+
+Usage: python -m benchmarks.matching
+"""
+
+import logging
+
+import numpy as np
+
+from benchmarks.utils import add_noise, generate_trajectory, timed
+from trajectopy_core.matching import (
+    iter_temporal_matches,
+    kd_matcher,
+    match_trajectories,
+    match_trajectories_spatial_interpolation,
+    temporal_matcher,
+)
+from trajectopy_core.reference_index import reference_index_cache
+from trajectopy_core.settings.matching import MatchingMethod, MatchingSettings
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+MAX_TIME_DIFF = 0.01
+CHUNK_SIZE = 200_000
+NUM_ESTIMATES = 20
+
+
+def match_kd(ref: np.ndarray, test: np.ndarray):
+    return kd_matcher(
+        ref=np.c_[ref, np.zeros_like(ref)], test=np.c_[test, np.zeros_like(test)], max_distance=MAX_TIME_DIFF
+    )
+
+
+def match_streamed(ref: np.ndarray, test: np.ndarray) -> int:
+    chunks = (test[i : i + CHUNK_SIZE] for i in range(0, len(test), CHUNK_SIZE))
+    return sum(len(ref_indices) for ref_indices, _ in iter_temporal_matches(ref, chunks, max_distance=MAX_TIME_DIFF))
+
+
+def match_estimates(traj_gt, estimates, settings: MatchingSettings) -> None:
+    for traj_est in estimates:
+        match_trajectories(traj_from=traj_est, traj_to=traj_gt, settings=settings, inplace=False)
+
+
+def main():
+    for num in (100_000, 1_000_000, 10_000_000):
+        ref = np.arange(num, dtype=float) / 100.0
+        test = np.sort(ref[::2] + np.random.uniform(-0.008, 0.008, len(ref[::2])))
+        shuffled = np.random.permutation(test)
+
+        duration_kd, _ = timed(match_kd, ref, test)
+        duration_sorted, _ = timed(temporal_matcher, ref, test, MAX_TIME_DIFF)
+        duration_unsorted, _ = timed(temporal_matcher, ref, shuffled, MAX_TIME_DIFF)
+        duration_streamed, _ = timed(match_streamed, ref, test)
+        print(
+            f"{num:>9} timestamps | kd-tree: {duration_kd:7.3f} s | sorted: {duration_sorted:7.3f} s | "
+            f"unsorted: {duration_unsorted:7.3f} s | streamed: {duration_streamed:7.3f} s"
+        )
+
+    for num in (100_000, 1_000_000):
+        traj_ref = generate_trajectory(num)
+        traj_test = add_noise(traj_ref)
+        duration, _ = timed(match_trajectories_spatial_interpolation, traj_test, traj_ref, 0.0, 10)
+        print(f"{num:>9} poses | spatial interpolation: {duration:7.3f} s")
+
+    traj_gt = generate_trajectory(1_000_000)
+    estimates = [add_noise(traj_gt).apply_index(slice(None, None, 10)) for _ in range(NUM_ESTIMATES)]
+    for cache_reference_index in (False, True):
+        reference_index_cache.clear()
+        settings = MatchingSettings(method=MatchingMethod.NEAREST_SPATIAL, cache_reference_index=cache_reference_index)
+        duration, _ = timed(match_estimates, traj_gt, estimates, settings)
+        print(
+            f"{NUM_ESTIMATES} estimates against {len(traj_gt)} poses | "
+            f"cache_reference_index={cache_reference_index}: {duration:7.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
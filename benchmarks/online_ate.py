@@ -0,0 +1,49 @@
+"""
+Benchmark of the online absolute trajectory error.
+
+Compares computing the ATE statistics of complete trajectories with
+adding the pose pairs chunk by chunk to an OnlineATE.
+
+Usage: python -m benchmarks.online_ate
+"""
+
+import logging
+
+from benchmarks.utils import add_noise, generate_trajectory, timed
+from trajectopy_core.evaluation.comparison import compare_trajectories_absolute
+from trajectopy_core.evaluation.online import OnlineATE
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+CHUNK_SIZE = 10_000
+
+
+def batch_metrics(traj_test, traj_ref):
+    return compare_trajectories_absolute(traj_test=traj_test, traj_ref=traj_ref).metrics
+
+
+def online_metrics(traj_test, traj_ref):
+    online_ate = OnlineATE()
+    for start in range(0, len(traj_ref), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        online_ate.update(
+            traj_test=traj_test.apply_index(chunk, inplace=False), traj_ref=traj_ref.apply_index(chunk, inplace=False)
+        )
+    return online_ate.summary()
+
+
+def main():
+    for num in (100_000, 1_000_000):
+        traj_ref = generate_trajectory(num)
+        traj_test = add_noise(traj_ref)
+
+        duration_batch, metrics_batch = timed(batch_metrics, traj_test, traj_ref)
+        duration_online, metrics_online = timed(online_metrics, traj_test, traj_ref)
+        print(
+            f"{num:>9} poses | batch: {duration_batch:7.3f} s | online (chunks of {CHUNK_SIZE}): "
+            f"{duration_online:7.3f} s | RMS {metrics_batch.pos_dev_rms:.6f} / {metrics_online.pos_dev_rms:.6f} m"
+        )
+
+
+if __name__ == "__main__":
+    main()
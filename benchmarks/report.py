@@ -0,0 +1,42 @@
+"""
+Benchmark of the HTML report rendering.
+
+Renders single reports of ATE and RPE results with and without
+decimation of the plotted traces and prints the rendering time and the
+size of the report.
+
+Usage: python -m benchmarks.report
+"""
+
+import logging
+
+from benchmarks.utils import add_noise, generate_trajectory, timed
+from trajectopy_core.evaluation.comparison import compare_trajectories_absolute, compare_trajectories_relative
+from trajectopy_core.report.single import render_single_report
+from trajectopy_core.settings.report import ReportSettings
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+
+def main():
+    for num in (10_000, 100_000, 1_000_000):
+        traj_ref = generate_trajectory(num)
+        traj_test = add_noise(traj_ref)
+        ate_result = compare_trajectories_absolute(traj_test=traj_test, traj_ref=traj_ref)
+        rpe_result = compare_trajectories_relative(traj_test=traj_test, traj_ref=traj_ref)
+
+        for max_points_per_trace in (0, ReportSettings.max_points_per_trace):
+            duration, report = timed(
+                render_single_report,
+                ate_result=ate_result,
+                rpe_result=rpe_result,
+                report_settings=ReportSettings(max_points_per_trace=max_points_per_trace),
+            )
+            print(
+                f"{num:>9} poses | max. points per trace: {max_points_per_trace:>6} | "
+                f"rendering: {duration:7.3f} s | size: {len(report.encode('utf-8')) / 1e6:8.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark of the relative pose error (RPE) computation.
+
+Compares the batched implementation of compare_trajectories_relative
+with a per-pair reference loop. The loop is only evaluated for
+trajectories up to LOOP_MAX_POSES poses.
+
+Both pair selections are timed: consecutive pairs only and all pose
+pairs (use_all_pose_pairs=True), which yields about one pair per pose
+and distance. The peak memory of the batched implementation is traced
+in a separate run, as tracing slows down the computation.
+
+Usage: python -m benchmarks.rpe
+"""
+
+import logging
+
+import numpy as np
+
+from benchmarks.utils import add_noise, generate_trajectory, peak_memory, timed
+from trajectopy_core.evaluation.comparison import (
+    _get_pair_indices,
+    compare_trajectories_relative,
+    rotation_error,
+    translation_error,
+)
+from trajectopy_core.poseset import se3_inv
+from trajectopy_core.settings.comparison import RelativeComparisonSettings
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+LOOP_MAX_POSES = 100_000
+
+
+def rpe_loop(traj_test, traj_ref, settings: RelativeComparisonSettings) -> int:
+    """Per-pair reference implementation"""
+    se3_ref = list(traj_ref.se3)
+    se3_test = list(traj_test.se3)
+
+    cnt = 0
+    pair_dists = np.arange(
+        settings.pair_min_distance,
+        settings.pair_max_distance + settings.pair_distance_step,
+        settings.pair_distance_step,
+    )
+    for pair_dist in pair_dists:
+        for pair in _get_pair_indices(traj_ref.arc_lengths, settings, dist=pair_dist):
+            pose_delta_gt = se3_inv(se3_ref[pair[0]]).dot(se3_ref[pair[1]])
+            pose_delta_test = se3_inv(se3_test[pair[0]]).dot(se3_test[pair[1]])
+            pose_error = se3_inv(pose_delta_gt).dot(pose_delta_test)
+            rotation_error(pose_error)
+            translation_error(pose_error)
+            cnt += 1
+    return cnt
+
+
+def main():
+    for num in (100_000, 1_000_000):
+        traj_ref = generate_trajectory(num)
+        traj_test = add_noise(traj_ref)
+
+        for use_all_pose_pairs in (False, True):
+            settings = RelativeComparisonSettings(use_all_pose_pairs=use_all_pose_pairs)
+            label = f"{num:>9} poses | {'all pairs' if use_all_pose_pairs else 'consecutive':>11}"
+
+            duration, rpe_result = timed(
+                compare_trajectories_relative, traj_test=traj_test, traj_ref=traj_ref, settings=settings
+            )
+            memory, _ = peak_memory(
+                compare_trajectories_relative, traj_test=traj_test, traj_ref=traj_ref, settings=settings
+            )
+            print(f"{label} | {len(rpe_result):>9} pairs | batched: {duration:8.3f} s | peak: {memory:8.1f} MB")
+
+            if num <= LOOP_MAX_POSES:
+                duration_loop, _ = timed(rpe_loop, traj_test, traj_ref, settings)
+                print(
+                    f"{label} | {len(rpe_result):>9} pairs | loop:    {duration_loop:8.3f} s "
+                    f"(speedup {duration_loop / duration:.1f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
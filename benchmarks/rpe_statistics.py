@@ -0,0 +1,38 @@
+"""
+Benchmark of the RPE statistics.
+
+Times the statistics of relative pose errors as accessed by the
+reports, i.e. property_dict and the per-bin drifts of the line plots.
+
+Usage: python -m benchmarks.rpe_statistics
+"""
+
+import logging
+
+from benchmarks.utils import add_noise, generate_trajectory, timed
+from trajectopy_core.evaluation.comparison import compare_trajectories_relative
+from trajectopy_core.settings.comparison import RelativeComparisonSettings
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+
+def report_statistics(rpe_result):
+    rpe_result.property_dict
+    rpe_result.pos_std
+    rpe_result.rot_std
+    rpe_result.to_dataframe()
+
+
+def main():
+    settings = RelativeComparisonSettings()
+
+    for num in (100_000, 1_000_000):
+        traj_ref = generate_trajectory(num)
+        rpe_result = compare_trajectories_relative(traj_test=add_noise(traj_ref), traj_ref=traj_ref, settings=settings)
+
+        duration, _ = timed(report_statistics, rpe_result)
+        print(f"{num:>9} poses | {len(rpe_result):>9} pairs | statistics: {duration:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark of reading trajectory files.
+
+Writes a trajectory file and compares reading it at once with
+reading it in chunks.
+
+Usage: python -m benchmarks.trajectory_io
+"""
+
+import logging
+import os
+import tempfile
+
+from benchmarks.utils import generate_trajectory, timed
+from trajectopy_core.trajectory import Trajectory
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+CHUNK_SIZE = 200_000
+
+
+def read_chunked(filename: str) -> int:
+    return sum(len(chunk) for chunk in Trajectory.iter_file_chunks(filename, chunk_size=CHUNK_SIZE))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for num in (100_000, 1_000_000):
+            filename = os.path.join(tmp_dir, f"trajectory_{num}.traj")
+            generate_trajectory(num).to_file(filename)
+            file_size = os.path.getsize(filename) / 1e6
+
+            duration, _ = timed(Trajectory.from_file, filename)
+            duration_chunked, _ = timed(read_chunked, filename)
+            print(
+                f"{num:>9} poses ({file_size:7.1f} MB) | at once: {duration:7.3f} s | "
+                f"chunks of {CHUNK_SIZE}: {duration_chunked:7.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark of the temporal operations of trajectories.
+
+Times crop, intersect and interpolate as used by the matching
+of trajectories via interpolation.
+
+Usage: python -m benchmarks.trajectory_ops [max_num_poses]
+"""
+
+import logging
+import sys
+
+import numpy as np
+
+from benchmarks.utils import generate_trajectory, timed
+from trajectopy_core.trajectory import Trajectory
+
+logging.getLogger("root").setLevel(logging.WARNING)
+
+SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def crop(trajectory: Trajectory) -> Trajectory:
+    t_start, t_end = np.quantile(trajectory.tstamps, [0.1, 0.9])
+    return trajectory.crop(t_start=t_start, t_end=t_end)
+
+
+def intersect(trajectory: Trajectory) -> Trajectory:
+    # reference timestamps with a gap in the middle
+    num = len(trajectory)
+    tstamps = np.r_[trajectory.tstamps[: num // 3], trajectory.tstamps[2 * num // 3 :]] + 0.001
+    return trajectory.intersect(tstamps=tstamps)
+
+
+def interpolate(trajectory: Trajectory) -> Trajectory:
+    return trajectory.interpolate(tstamps=trajectory.tstamps[:-1] + 0.5 / trajectory.data_rate)
+
+
+def main():
+    max_num = int(float(sys.argv[1])) if len(sys.argv) > 1 else SIZES[-1]
+
+    for num in (size for size in SIZES if size <= max_num):
+        trajectory = generate_trajectory(num)
+        durations = [timed(operation, trajectory.copy())[0] for operation in (crop, intersect, interpolate)]
+        print(
+            f"{num:>9} poses | crop: {durations[0]:7.3f} s | intersect: {durations[1]:7.3f} s | "
+            f"interpolate: {durations[2]:7.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
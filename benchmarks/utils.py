@@ -0,0 +1,61 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+"""
+
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import numpy as np
+from pointset import PointSet
+
+from trajectopy_core.rotationset import RotationSet
+from trajectopy_core.trajectory import Trajectory
+
+
+def generate_trajectory(num: int, data_rate: float = 100.0, speed: float = 10.0) -> Trajectory:
+    """Generates a smooth, closed trajectory with num poses sampled at data_rate Hz"""
+    tstamps = np.arange(num, dtype=float) / data_rate
+    total_length = num / data_rate * speed
+    radius = total_length / (2 * np.pi)
+    angle = np.linspace(0, 2 * np.pi, num)
+
+    xyz = np.c_[np.sin(angle) * radius, np.cos(angle) * radius, np.sin(4 * angle) * 5]
+    rpy = np.c_[np.sin(8 * angle) * 0.05, np.cos(8 * angle) * 0.05, -angle]
+
+    return Trajectory(
+        pos=PointSet(xyz=xyz, epsg=0),
+        rot=RotationSet.from_euler(seq="xyz", angles=rpy),
+        tstamps=tstamps,
+    )
+
+
+def add_noise(trajectory: Trajectory, pos_std: float = 0.05, rot_std: float = 1e-3) -> Trajectory:
+    """Returns a copy of the trajectory with gaussian noise added to positions and orientations"""
+    noisy = trajectory.copy()
+    noisy.pos.xyz += np.random.randn(len(noisy), 3) * pos_std
+    if noisy.rot is not None:
+        noise = RotationSet.from_rotvec(np.random.randn(len(noisy), 3) * rot_std)
+        noisy.rot = noisy.rot * noise
+    return noisy
+
+
+def timed(func: Callable, *args, **kwargs) -> Tuple[float, object]:
+    """Returns the wall time in seconds and the result of func(*args, **kwargs)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def peak_memory(func: Callable, *args, **kwargs) -> Tuple[float, object]:
+    """Returns the peak memory in MB traced during func(*args, **kwargs) and its result"""
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6, result
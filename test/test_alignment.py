@@ -4,11 +4,18 @@ from test.util import transform_randomly
 
 import numpy as np
 
+from trajectopy_core.alignment.block_solver import BlockDiagonalSolver
+from trajectopy_core.alignment.data import AlignmentData
 from trajectopy_core.alignment.direct import align_rotations
-from trajectopy_core.alignment.estimation import estimate_alignment
+from trajectopy_core.alignment.estimation import AlignmentEstimation, estimate_alignment
 from trajectopy_core.alignment.parameters import AlignmentParameters
 from trajectopy_core.rotationset import RotationSet
-from trajectopy_core.settings.alignment import AlignmentEstimationSettings, AlignmentSettings, AlignmentStochastics
+from trajectopy_core.settings.alignment import (
+    AlignmentEstimationSettings,
+    AlignmentSettings,
+    AlignmentStochastics,
+    JacobianMethod,
+)
 from trajectopy_core.settings.matching import MatchingSettings
 
 
@@ -84,6 +91,56 @@ class TestAlignment(unittest.TestCase):
 
         np.testing.assert_allclose(rpy_trafo_diff, np.zeros_like(rpy_trafo_diff), atol=1e-8, rtol=1e-8)
 
+    def test_analytic_jacobians(self) -> None:
+        trajectory = open_loop_trajectory.apply_index(np.arange(200), inplace=False)
+        transformed, _ = transform_randomly(trajectory)
+        alignment_data = AlignmentData(
+            traj_from=trajectory,
+            traj_to=transformed,
+            alignment_settings=AlignmentSettings(estimation_settings=AlignmentEstimationSettings.all()),
+            matching_settings=MatchingSettings(),
+        )
+        alignment_data.res_vector = np.random.randn(len(alignment_data.obs_vector)) * 0.01
+        estimation = AlignmentEstimation(alignment_data=alignment_data)
+
+        estimation.settings.jacobian_method = JacobianMethod.ANALYTIC
+        a_design_analytic = estimation._get_design_matrix()
+        b_cond_analytic = estimation._get_condition_matrix().toarray()
+
+        estimation.settings.jacobian_method = JacobianMethod.AUTOGRAD
+        a_design_autograd = estimation._get_design_matrix()
+        b_cond_autograd = estimation._get_condition_matrix().toarray()
+
+        np.testing.assert_allclose(a_design_analytic, a_design_autograd, atol=1e-9)
+        np.testing.assert_allclose(b_cond_analytic, b_cond_autograd, atol=1e-9)
+
+    def test_block_diagonal_solver(self) -> None:
+        trajectory = open_loop_trajectory.apply_index(np.arange(200), inplace=False)
+        transformed, _ = transform_randomly(trajectory)
+        alignment_data = AlignmentData(
+            traj_from=trajectory,
+            traj_to=transformed,
+            alignment_settings=AlignmentSettings(estimation_settings=AlignmentEstimationSettings.all()),
+            matching_settings=MatchingSettings(),
+        )
+        estimation = AlignmentEstimation(alignment_data=alignment_data)
+        a_design = estimation._get_design_matrix()
+        b_cond = estimation._get_condition_matrix().toarray()
+        contradiction_w = estimation._eval_functional_relationship()
+
+        solver = BlockDiagonalSolver(
+            cond_stack=estimation._get_condition_stack(), var_vector=alignment_data.var_vector
+        )
+        normal_matrix, normal_rhs = solver.normal_equations(a_design, contradiction_w)
+
+        bbt = b_cond @ np.diag(alignment_data.var_vector) @ b_cond.T
+        np.testing.assert_allclose(solver.solve(contradiction_w), np.linalg.solve(bbt, contradiction_w))
+        np.testing.assert_allclose(normal_matrix, a_design.T @ np.linalg.solve(bbt, a_design))
+        np.testing.assert_allclose(normal_rhs, a_design.T @ np.linalg.solve(bbt, contradiction_w))
+        np.testing.assert_allclose(
+            solver.residuals(contradiction_w), np.diag(alignment_data.var_vector) @ b_cond.T @ contradiction_w
+        )
+
     def _verify_alignment(
         self, target: AlignmentParameters, estimation: AlignmentParameters, lazy: bool = False
     ) -> None:
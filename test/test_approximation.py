@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from trajectopy_core.approximation.cubic_approximation import CubicApproximation, piecewise_cubic
+from trajectopy_core.approximation.mls_approximation import mls_single
+from trajectopy_core.approximation.rot_approximation import rot_average_window
+from trajectopy_core.approximation.voxelizer import Voxelizer
+from trajectopy_core.rotationset import RotationSet
+from trajectopy_core.utils import Line3D
+
+
+class TestApproximation(unittest.TestCase):
+    def test_mls_single(self) -> None:
+        angles = np.linspace(0, np.pi, 2000)
+        xyz = np.c_[np.sin(angles) * 50, np.cos(angles) * 50, angles] + np.random.randn(len(angles), 3) * 0.05
+
+        mls_approx, avg_point_movement = mls_single(xyz, voxel_size=0.5, k_nearest=4)
+
+        voxelizer = Voxelizer(xyz, voxel_size=0.5)
+        mls_target = np.zeros_like(xyz)
+        for i, voxel_set in enumerate(voxelizer.k_nearest_query(xyz, k_nearest=4)):
+            points = voxelizer.points_from_voxel_set(voxel_set)
+            mls_target[i] = Line3D.from_points(points).evaluate_at(xyz[i]) if len(points) > 1 else xyz[i]
+
+        np.testing.assert_allclose(mls_approx, mls_target, atol=1e-9)
+        self.assertAlmostEqual(avg_point_movement, np.mean(np.linalg.norm(xyz - mls_target, axis=1)))
+
+    def test_cubic_approximation(self) -> None:
+        function_of = np.cumsum(np.random.uniform(0.005, 0.015, 3000))
+        values = np.c_[np.sin(function_of), np.cos(function_of), 0.1 * function_of]
+
+        approx = CubicApproximation(function_of, values, int_size=0.15, min_obs=25)
+        np.testing.assert_allclose(approx.est_obs, values, atol=0.02)
+        np.testing.assert_allclose(approx.eval(function_of[1:]), values[1:], atol=0.05)
+
+        # each interval except the last has at least min_obs observations and spans at least int_size
+        # (the intervals are built relative to function_of[0], shifting them back may round them up)
+        var_red = function_of - function_of[0]
+        int_starts = np.searchsorted(function_of, approx.interval_steps[:-1] - 1e-9)
+        self.assertTrue(np.all(np.diff(int_starts) >= 25))
+        self.assertTrue(np.all(var_red[int_starts[1:] - 1] - var_red[int_starts[:-1]] >= 0.15))
+        self.assertGreaterEqual(len(function_of) - int_starts[-1], 25)
+
+        # approximating all columns at once equals approximating each column
+        for i in range(values.shape[1]):
+            approx_column = CubicApproximation(function_of, values[:, i], int_size=0.15, min_obs=25)
+            np.testing.assert_allclose(approx_column.est_obs, approx.est_obs[:, i], atol=1e-10)
+
+        # one approximation object per column is returned
+        est_obs, approx_list = piecewise_cubic(function_of, values, return_approx_objects=True)
+        self.assertEqual(len(approx_list), values.shape[1])
+        for i, approx_column in enumerate(approx_list):
+            np.testing.assert_array_equal(approx_column.est_obs, est_obs[:, i])
+            np.testing.assert_allclose(approx_column.eval(function_of[1:]), approx.eval(function_of[1:])[:, i])
+
+    def test_rot_average_window(self) -> None:
+        function_of = np.arange(500) * 0.01
+        rotations = RotationSet.from_rotvec(np.c_[function_of, np.zeros((500, 2))] + np.random.randn(500, 3) * 0.01)
+        quat = rotations.as_quat()
+
+        quat_mean = rot_average_window(function_of=function_of, quat=quat, win_size=0.1)
+
+        # about ten rotations per window, rounded to an odd number of 9 steps
+        ext = 4
+        for i in range(len(quat)):
+            window = slice(max(0, i - ext), min(len(quat) - 1, i + ext))
+            target = RotationSet.from_quat(quat[window]).mean()
+            self.assertLess((RotationSet.from_quat(quat_mean[i]) - target).rotangle, 1e-10)
+
+        self.assertTrue(np.all(np.sum(quat_mean * quat, axis=1) > 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from test.testdata import generated_trajectory
+from pathlib import Path
+from test.testdata import generated_trajectory, noisy_trajectory
 from test.util import random_number
 
 import numpy as np
@@ -7,12 +8,25 @@ import numpy as np
 from trajectopy_core.alignment.parameters import AlignmentParameters, Parameter
 from trajectopy_core.alignment.result import AlignmentResult
 from trajectopy_core.definitions import Unit
-from trajectopy_core.evaluation.ate_result import ATEResult
-from trajectopy_core.evaluation.comparison import compare_trajectories_absolute, compare_trajectories_relative
+from trajectopy_core.evaluation.ate_result import ATEMetrics, ATEResult
+from trajectopy_core.evaluation.comparison import (
+    _get_pair_indices,
+    compare_trajectories_absolute,
+    compare_trajectories_relative,
+    derive_dev_directions_no_rot,
+    rotation_error,
+    translation_error,
+)
+from trajectopy_core.evaluation.deviations import AbsoluteTrajectoryDeviations
+from trajectopy_core.evaluation.online import OnlineATE
 from trajectopy_core.evaluation.rpe_result import RPEResult
+from trajectopy_core.evaluation.utils import bin_statistics
 from trajectopy_core.matching import match_trajectories
+from trajectopy_core.poseset import se3_inv
+from trajectopy_core.report.data import ATEReportData
 from trajectopy_core.settings.comparison import RelativeComparisonSettings
 from trajectopy_core.settings.matching import MatchingMethod, MatchingSettings
+from trajectopy_core.settings.report import ReportSettings
 from trajectopy_core.trajectory import Trajectory
 
 
@@ -78,3 +92,145 @@ class TestComparison(unittest.TestCase):
         np.testing.assert_almost_equal(-deviations.pos_bias_x, parameters.sim_trans_x.value)
         np.testing.assert_almost_equal(-deviations.pos_bias_y, parameters.sim_trans_y.value)
         np.testing.assert_almost_equal(-deviations.pos_bias_z, parameters.sim_trans_z.value)
+
+    def test_relative_deviations(self) -> None:
+        trajectory = generated_trajectory.copy()
+        transformed = trajectory.copy()
+        transformed.pos.xyz += np.random.randn(len(transformed), 3) * 0.1
+
+        settings = RelativeComparisonSettings(pair_min_distance=100.0, pair_max_distance=500.0)
+        rpe_result = compare_trajectories_rel(traj_ref=trajectory, traj_test=transformed, settings=settings)
+
+        se3_ref, se3_test = trajectory.se3, transformed.se3
+        rpe_dev = rpe_result.rpe_dev
+        for pair_dist, pos_devs, rot_devs in zip(
+            rpe_dev.bin_distances, rpe_dev.split_bins(rpe_dev.pos_dev), rpe_dev.split_bins(rpe_dev.rot_dev)
+        ):
+            pair_indices = _get_pair_indices(trajectory.arc_lengths, settings, dist=pair_dist)
+            for pair, pos_dev, rot_dev in zip(pair_indices, pos_devs, rot_devs):
+                distance = trajectory.arc_lengths[pair[1]] - trajectory.arc_lengths[pair[0]]
+                pose_delta_gt = se3_inv(se3_ref[pair[0]]).dot(se3_ref[pair[1]])
+                pose_delta_test = se3_inv(se3_test[pair[0]]).dot(se3_test[pair[1]])
+                pose_error = se3_inv(pose_delta_gt).dot(pose_delta_test)
+
+                np.testing.assert_almost_equal(pos_dev, translation_error(pose_error) / distance)
+                np.testing.assert_almost_equal(rot_dev, rotation_error(pose_error) / distance)
+
+    def test_along_cross_track_deviations(self) -> None:
+        num = 100
+        xyz_ref = np.c_[np.arange(num, dtype=float), np.zeros(num), np.zeros(num)]
+        offset = np.array(
+            [
+                random_number(lower_bound=-0.5, upper_bound=0.5),
+                random_number(lower_bound=-1, upper_bound=1),
+                random_number(lower_bound=-1, upper_bound=1),
+            ]
+        )
+
+        directed_dev = derive_dev_directions_no_rot(xyz_ref=xyz_ref, xyz_test=xyz_ref + offset)
+        np.testing.assert_allclose(directed_dev, np.tile([offset[0], offset[1], -offset[2]], (num, 1)), atol=1e-10)
+
+        directed_dev = derive_dev_directions_no_rot(xyz_ref=xyz_ref, xyz_test=xyz_ref + offset, z_slope_dist=True)
+        np.testing.assert_allclose(
+            directed_dev[:, 2], np.full(num, -np.sign(offset[2]) * np.linalg.norm(offset[1:])), atol=1e-10
+        )
+
+    def test_online_ate(self) -> None:
+        for use_rotations in (True, False):
+            traj_ref = generated_trajectory.copy()
+            traj_test = noisy_trajectory.copy()
+            if not use_rotations:
+                traj_ref.rot = traj_test.rot = None
+
+            expected = compare_trajectories_absolute(traj_test=traj_test, traj_ref=traj_ref).metrics
+
+            online_ate = OnlineATE()
+            for chunk in (slice(0, 1), slice(1, 8), slice(8, 40), slice(40, None)):
+                online_ate.update(
+                    traj_test=traj_test.apply_index(chunk, inplace=False),
+                    traj_ref=traj_ref.apply_index(chunk, inplace=False),
+                )
+            metrics = online_ate.summary()
+
+            self.assertEqual(metrics.num_deviations, expected.num_deviations)
+            self.assertEqual(metrics.has_orientation, use_rotations)
+            for statistic in ATEMetrics.statistics():
+                tolerance = 0.01 if statistic.endswith("median") else 1e-9
+                np.testing.assert_allclose(
+                    getattr(metrics, statistic), getattr(expected, statistic), rtol=tolerance, atol=1e-12
+                )
+
+    def test_ate_metrics(self) -> None:
+        ate_result = compare_trajectories_absolute(
+            traj_test=noisy_trajectory.copy(), traj_ref=generated_trajectory.copy()
+        )
+        metrics = ate_result.metrics
+        pos_dev_comb = np.linalg.norm(ate_result.abs_dev.pos_dev, axis=1)
+        rot_dev_comb = ate_result.abs_dev.rot_dev.rotangle
+
+        self.assertIs(ate_result.metrics, metrics)
+        self.assertAlmostEqual(metrics.pos_ate, np.mean(pos_dev_comb))
+        self.assertAlmostEqual(metrics.pos_dev_median, np.median(pos_dev_comb))
+        self.assertAlmostEqual(metrics.pos_rms_cross_h, np.sqrt(np.mean(ate_result.pos_dev_cross_h**2)))
+        self.assertAlmostEqual(metrics.rot_dev_std, np.std(rot_dev_comb))
+        self.assertAlmostEqual(metrics.rot_rms_z, np.sqrt(np.mean(ate_result.rot_dev_z**2)))
+        self.assertEqual(ate_result.property_dict, metrics.property_dict)
+
+        with self.assertRaises(ValueError):
+            ate_result.abs_dev.pos_dev[0] = 0.0
+
+        abs_dev = ate_result.abs_dev
+        pos_dev = abs_dev.pos_dev * 2.0
+        ate_result.abs_dev = AbsoluteTrajectoryDeviations(
+            pos_dev=pos_dev, directed_pos_dev=abs_dev.directed_pos_dev * 2.0
+        )
+        pos_dev += 1.0
+        self.assertAlmostEqual(ate_result.pos_ate, 2.0 * metrics.pos_ate)
+        self.assertFalse(ate_result.has_orientation)
+        self.assertEqual(ate_result.rot_ate, 0.0)
+
+    def test_ate_report_data_in_mm(self) -> None:
+        ate_result = compare_trajectories_absolute(
+            traj_test=noisy_trajectory.copy(), traj_ref=generated_trajectory.copy()
+        )
+        pos_ate = ate_result.pos_ate
+
+        for _ in range(2):
+            report_data = ATEReportData(ate_result=ate_result, settings=ReportSettings(ate_unit_is_mm=True))
+            self.assertAlmostEqual(report_data.metrics.pos_ate, 1000.0 * pos_ate)
+            self.assertAlmostEqual(report_data.metrics.rot_ate, ate_result.rot_ate)
+
+        self.assertEqual(ate_result.pos_ate, pos_ate)
+
+    def test_bin_statistics(self) -> None:
+        bin_sizes = [3, 0, 1, 4, 0, 7]
+        values = np.random.randn(sum(bin_sizes))
+        offsets = np.cumsum([0] + bin_sizes)
+
+        statistics = bin_statistics(values, offsets)
+        bins = [values[start:end] for start, end in zip(offsets[:-1], offsets[1:]) if end > start]
+
+        np.testing.assert_array_equal(statistics.num_values, [3, 1, 4, 7])
+        for attribute, func in (
+            ("mean", np.mean),
+            ("std", np.std),
+            ("min", np.min),
+            ("max", np.max),
+            ("median", np.median),
+        ):
+            np.testing.assert_allclose(getattr(statistics, attribute), [func(b) for b in bins], rtol=1e-12)
+
+    def test_relative_deviations_file(self) -> None:
+        settings = RelativeComparisonSettings(pair_min_distance=100.0, pair_max_distance=500.0)
+        rpe_result = compare_trajectories_rel(
+            traj_ref=generated_trajectory.copy(), traj_test=noisy_trajectory.copy(), settings=settings
+        )
+        Path("./test/tmp").mkdir(parents=True, exist_ok=True)
+        filename = "./test/tmp/rpe_result.csv"
+        rpe_result.to_file(filename, mode="w")
+        rpe_result_file = RPEResult.from_file(filename)
+
+        self.assertEqual(rpe_result_file.num_pairs, rpe_result.num_pairs)
+        np.testing.assert_allclose(rpe_result_file.mean_pair_distances, rpe_result.mean_pair_distances)
+        np.testing.assert_allclose(rpe_result_file.pos_dev_median, rpe_result.pos_dev_median)
+        np.testing.assert_allclose(rpe_result_file.rot_std, rpe_result.rot_std)
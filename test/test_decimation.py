@@ -0,0 +1,93 @@
+import unittest
+from test.testdata import generated_trajectory, noisy_trajectory
+
+import numpy as np
+
+from trajectopy_core.evaluation.comparison import compare_trajectories_absolute
+from trajectopy_core.report.data import ATEReportData
+from trajectopy_core.report.decimation import (
+    grid_indices,
+    line_indices,
+    lttb_indices,
+    minmax_indices,
+    quantile_indices,
+)
+from trajectopy_core.settings.report import (
+    EDFDecimation,
+    LineDecimation,
+    ReportSettings,
+    ScatterDecimation,
+)
+
+
+class TestDecimation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.x = np.linspace(0, 100, 100_000)
+        self.y = np.cumsum(np.random.randn(len(self.x)))
+        self.y[12_345] = 1e3
+
+    def test_minmax(self) -> None:
+        indices = minmax_indices(self.y, 1000)
+
+        self.assertLessEqual(len(indices), 1000)
+        self.assertIn(np.argmin(self.y), indices)
+        self.assertIn(12_345, indices)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_lttb(self) -> None:
+        indices = lttb_indices(self.x, self.y, 1000)
+
+        self.assertEqual(len(indices), 1000)
+        self.assertIn(12_345, indices)
+        self.assertEqual((indices[0], indices[-1]), (0, len(self.y) - 1))
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_quantile(self) -> None:
+        indices = quantile_indices(len(self.y), 1000)
+
+        self.assertEqual(len(indices), 1000)
+        self.assertEqual((indices[0], indices[-1]), (0, len(self.y) - 1))
+
+    def test_grid(self) -> None:
+        for points in (np.c_[self.x, self.y], np.random.rand(20_000, 3)):
+            priority = np.random.randn(len(points))
+            indices = grid_indices(points, 1000, priority=priority)
+
+            self.assertLessEqual(len(indices), 1000)
+            self.assertGreaterEqual(len(indices), 500)
+            self.assertIn(np.argmax(np.abs(priority)), indices)
+
+    def test_unknown_method(self) -> None:
+        with self.assertRaises(ValueError):
+            LineDecimation.from_str("unknown")
+
+        self.assertEqual(LineDecimation.from_str("LTTB"), LineDecimation.LTTB)
+        self.assertEqual(len(line_indices(self.x, self.y, 1000, LineDecimation.NONE)), len(self.y))
+
+    def test_settings(self) -> None:
+        settings = ReportSettings(
+            line_decimation=LineDecimation.LTTB,
+            edf_decimation=EDFDecimation.NONE,
+            scatter_decimation=ScatterDecimation.NONE,
+        )
+        dct = settings.to_dict()
+        self.assertEqual(dct["line_decimation"], "lttb")
+        self.assertEqual(ReportSettings.from_dict(dct), settings)
+
+    def test_report_data(self) -> None:
+        ate_result = compare_trajectories_absolute(
+            traj_test=noisy_trajectory.copy(), traj_ref=generated_trajectory.copy()
+        )
+        num_points = len(ate_result.pos_dev_comb) // 10
+
+        report_data = ATEReportData(ate_result=ate_result, settings=ReportSettings(max_points_per_trace=num_points))
+        _, line_values = report_data.line_data(report_data.comb_dev_pos)
+        edf_values, _ = report_data.edf_data(report_data.comb_dev_pos)
+        _, scatter_values = report_data.scatter_data(report_data.comb_dev_pos)
+        for values in (line_values, edf_values, scatter_values):
+            self.assertLessEqual(len(values), num_points)
+            self.assertEqual(np.max(values), np.max(report_data.comb_dev_pos))
+
+        report_data = ATEReportData(ate_result=ate_result, settings=ReportSettings(max_points_per_trace=0))
+        _, y = report_data.line_data(report_data.comb_dev_pos)
+        np.testing.assert_array_equal(y, report_data.comb_dev_pos)
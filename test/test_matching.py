@@ -0,0 +1,147 @@
+import unittest
+from test.testdata import generated_trajectory
+from unittest import mock
+
+import numpy as np
+from pointset import PointSet
+
+from trajectopy_core.matching import (
+    iter_temporal_matches,
+    kd_matcher,
+    match_trajectories,
+    match_trajectories_spatial_interpolation,
+    temporal_matcher,
+)
+from trajectopy_core.reference_index import ReferenceIndex, ReferenceIndexCache
+from trajectopy_core.rotationset import RotationSet
+from trajectopy_core.settings.matching import MatchingMethod, MatchingSettings
+from trajectopy_core.trajectory import Trajectory
+from trajectopy_core.utils import hash_arrays
+
+
+class TestTemporalMatcher(unittest.TestCase):
+    def test_same_as_kd_matcher(self) -> None:
+        ref = np.random.uniform(0, 100, 1000)
+        test = np.random.uniform(-1, 101, 2000)
+
+        for max_distance in (0.0, 0.01, 0.1):
+            ref_indices, test_indices = temporal_matcher(ref=ref, test=test, max_distance=max_distance)
+            kd_ref_indices, kd_test_indices = kd_matcher(
+                ref=np.c_[ref, np.zeros_like(ref)], test=np.c_[test, np.zeros_like(test)], max_distance=max_distance
+            )
+            np.testing.assert_array_equal(ref_indices, kd_ref_indices)
+            np.testing.assert_array_equal(test_indices, kd_test_indices)
+
+    def test_streaming(self) -> None:
+        ref = np.arange(0, 100, 0.1)
+        test = np.sort(np.random.uniform(-1, 101, 5000))
+
+        ref_indices, test_indices = temporal_matcher(ref=ref, test=test, max_distance=0.02)
+        matches = list(iter_temporal_matches(ref=ref, test_chunks=np.array_split(test, 7), max_distance=0.02))
+
+        np.testing.assert_array_equal(np.concatenate([match[0] for match in matches]), ref_indices)
+        np.testing.assert_array_equal(np.concatenate([match[1] for match in matches]), test_indices)
+        np.testing.assert_array_less(np.abs(ref[ref_indices] - test[test_indices]), 0.02)
+
+        with self.assertRaises(ValueError):
+            list(iter_temporal_matches(ref=ref, test_chunks=[test[1000:], test[:1000]]))
+
+    def test_no_matches(self) -> None:
+        with self.assertRaises(ValueError):
+            temporal_matcher(ref=np.arange(10.0), test=np.arange(10.0) + 0.5, max_distance=0.1)
+
+
+class TestSpatialInterpolationMatching(unittest.TestCase):
+    def test_interpolated_poses(self) -> None:
+        ref_tstamps = np.arange(100.0)
+        traj_ref = Trajectory(
+            pos=PointSet(xyz=np.c_[ref_tstamps, np.zeros((100, 2))], epsg=0),
+            rot=RotationSet.from_rotvec(np.c_[np.zeros((100, 2)), ref_tstamps * 0.01]),
+            tstamps=ref_tstamps,
+        )
+        test_x = np.random.uniform(1, 98, 500)
+        traj_test = Trajectory(
+            pos=PointSet(xyz=np.c_[test_x, np.full((500, 2), 0.1)], epsg=0),
+            tstamps=np.arange(500.0),
+        )
+
+        traj_test, traj_ref = match_trajectories_spatial_interpolation(traj_test, traj_ref, k_nearest=4)
+
+        self.assertEqual(len(traj_test), len(traj_ref))
+        np.testing.assert_allclose(traj_test.tstamps, np.arange(500.0))
+        np.testing.assert_allclose(traj_ref.pos.xyz, np.c_[test_x, np.zeros((500, 2))], atol=1e-9)
+        np.testing.assert_allclose(traj_ref.tstamps, test_x, atol=1e-9)
+        np.testing.assert_allclose(traj_ref.rot.as_rotvec()[:, 2], test_x * 0.01, atol=1e-9)
+
+
+class TestReferenceIndex(unittest.TestCase):
+    def test_cache(self) -> None:
+        cache = ReferenceIndexCache(max_size=2)
+        reference_index = cache.get(generated_trajectory)
+
+        self.assertIs(cache.get(generated_trajectory.copy()), reference_index)
+
+        cache.get(generated_trajectory.apply_index(np.arange(10), inplace=False))
+        cache.get(generated_trajectory.apply_index(np.arange(20), inplace=False))
+
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(reference_index.key, cache)
+
+    def test_cache_hashes_once(self) -> None:
+        cache = ReferenceIndexCache()
+        traj_ref = generated_trajectory.apply_index(np.arange(len(generated_trajectory)), inplace=False)
+        settings = MatchingSettings(method=MatchingMethod.NEAREST_TEMPORAL)
+
+        with mock.patch("trajectopy_core.trajectory.hash_arrays", wraps=hash_arrays) as hashed:
+            for _ in range(3):
+                match_trajectories(
+                    traj_from=generated_trajectory.copy(),
+                    traj_to=traj_ref,
+                    settings=settings,
+                    inplace=False,
+                    reference_index=cache.get(traj_ref),
+                )
+
+            self.assertEqual(hashed.call_count, 1)
+
+            traj_ref.tstamps = traj_ref.tstamps + 1.0
+            self.assertNotIn(traj_ref.content_hash, cache)
+            self.assertEqual(hashed.call_count, 2)
+
+    def test_matching(self) -> None:
+        traj_test = generated_trajectory.copy()
+        traj_test.tstamps = traj_test.tstamps[::-1] + 0.001
+        reference_index = ReferenceIndex.from_trajectory(generated_trajectory)
+
+        for method in (MatchingMethod.NEAREST_TEMPORAL, MatchingMethod.NEAREST_SPATIAL):
+            settings = MatchingSettings(method=method)
+            expected = match_trajectories(traj_test, generated_trajectory, settings=settings, inplace=False)
+            matched = match_trajectories(
+                traj_test, generated_trajectory, settings=settings, inplace=False, reference_index=reference_index
+            )
+
+            for traj_expected, traj_matched in zip(expected, matched):
+                np.testing.assert_array_equal(traj_matched.tstamps, traj_expected.tstamps)
+                np.testing.assert_array_equal(traj_matched.pos.xyz, traj_expected.pos.xyz)
+
+        with self.assertRaises(ValueError):
+            match_trajectories(
+                traj_test,
+                generated_trajectory.apply_index(np.arange(10), inplace=False),
+                settings=MatchingSettings(method=MatchingMethod.NEAREST_SPATIAL),
+                reference_index=reference_index,
+            )
+
+        traj_ref = generated_trajectory.copy()
+        traj_ref.pos.xyz = traj_ref.pos.xyz + 1.0
+        with self.assertRaises(ValueError):
+            match_trajectories(
+                traj_test,
+                traj_ref,
+                settings=MatchingSettings(method=MatchingMethod.NEAREST_SPATIAL),
+                reference_index=reference_index,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
+import base64
 import unittest
 
+import numpy as np
+
+from trajectopy_core.evaluation.batch import evaluate_batch
 from trajectopy_core.evaluation.metrics import ate, rpe
+from trajectopy_core.plotting.plotly.utils import plotly_js, to_typed_array
+from trajectopy_core.report.single import render_single_report
 from trajectopy_core.trajectory import Trajectory
 
 
@@ -16,3 +22,38 @@ class TestPipeline(unittest.TestCase):
 
     def test_rpe(self) -> None:
         rpe(trajectory_gt=self.gt, trajectory_est=self.est)
+
+    def test_batch(self) -> None:
+        num_poses = len(self.est)
+        ate_results, rpe_results = evaluate_batch(
+            trajectory_gt=self.gt, estimates=[self.est, "example_data/KITTI_ORB.traj"], max_workers=2
+        )
+
+        self.assertEqual(len(self.est), num_poses)
+        self.assertEqual(len(ate_results), 2)
+        self.assertEqual(len(rpe_results), 2)
+
+        ate_result = ate(trajectory_gt=self.gt.copy(), trajectory_est=self.est.copy())
+        rpe_result = rpe(trajectory_gt=self.gt, trajectory_est=self.est)
+        for batch_ate_result, batch_rpe_result in zip(ate_results, rpe_results):
+            self.assertAlmostEqual(batch_ate_result.pos_ate, ate_result.pos_ate)
+            self.assertEqual(batch_rpe_result.property_dict, rpe_result.property_dict)
+
+    def test_report(self) -> None:
+        report = render_single_report(
+            ate_result=ate(trajectory_gt=self.gt, trajectory_est=self.est),
+            rpe_result=rpe(trajectory_gt=self.gt, trajectory_est=self.est),
+        )
+
+        self.assertEqual(report.count(plotly_js()), 1)
+        self.assertIn('"bdata"', report)
+
+    def test_typed_array(self) -> None:
+        array = np.random.randn(3, 100)
+        typed_array = to_typed_array(array)
+
+        self.assertEqual(typed_array["shape"], "3, 100")
+        np.testing.assert_array_equal(
+            np.frombuffer(base64.b64decode(typed_array["bdata"]), dtype="<f8").reshape(3, 100), array
+        )
+        self.assertEqual(to_typed_array(np.arange(100))["dtype"], "f8")
@@ -4,7 +4,10 @@ from enum import Enum
 from pathlib import Path
 from typing import Any
 
+from trajectopy_core.settings.alignment import JacobianMethod
 from trajectopy_core.settings.base import Settings
+from trajectopy_core.settings.processing import ProcessingSettings
+from trajectopy_core.settings.report import LineDecimation, ReportSettings
 
 
 class SettingsEnum(Enum):
@@ -71,6 +74,27 @@ class TestSettings(unittest.TestCase):
 
         assert settings == imported_settings
 
+    def test_missing_attributes(self) -> None:
+        settings = AllSettings.from_dict({"setting_1": False, "nested_settings": {"setting_3": 7}})
+        self.assertFalse(settings.setting_1)
+        self.assertEqual(settings.nested_settings.setting_3, 7)
+        self.assertEqual(settings.nested_settings.setting_5, DeeplyNestedSettings())
+        self.assertEqual(settings.setting_5, SettingsEnum.SETTING_1)
+
+        settings.update_from_dict({"setting_2": 7.89})
+        self.assertEqual(settings.setting_2, 7.89)
+        self.assertFalse(settings.setting_1)
+
+    def test_legacy_files(self) -> None:
+        # settings files written before jacobian_method, cache_reference_index and the decimation were added
+        processing_settings = ProcessingSettings.from_file("./test/data/legacy_processing_settings.json")
+        self.assertEqual(processing_settings.alignment.jacobian_method, JacobianMethod.ANALYTIC)
+        self.assertFalse(processing_settings.matching.cache_reference_index)
+
+        report_settings = ReportSettings.from_file("./test/data/legacy_report_settings.json")
+        self.assertEqual(report_settings.max_points_per_trace, ReportSettings().max_points_per_trace)
+        self.assertEqual(report_settings.line_decimation, LineDecimation.MINMAX)
+
 
 if __name__ == "__main__":
     TestSettings().setUp()
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from trajectopy_core.sorting import sort
+
+
+class TestSorting(unittest.TestCase):
+    def test_sort(self) -> None:
+        angles = np.linspace(0, 1.8 * np.pi, 1000)
+        xyz = np.c_[np.sin(angles) * 100, np.cos(angles) * 100, np.linspace(1, 0, len(angles))]
+        permutation = np.random.permutation(len(xyz))
+
+        sort_index = permutation[sort(xyz[permutation])]
+
+        # the sorting is cyclic and the direction of travel cannot be derived from shuffled points
+        steps = np.unique(np.diff(sort_index) % len(xyz))
+        self.assertIn(steps.tolist(), [[1], [len(xyz) - 1]])
+
+    def test_sort_missing_points(self) -> None:
+        angles = np.linspace(0, 1.8 * np.pi, 1000)
+        xyz = np.c_[np.sin(angles) * 100, np.cos(angles) * 100, np.linspace(1, 0, len(angles))]
+        xyz_duplicates = np.r_[xyz, xyz[[100, 500]]]
+
+        self.assertEqual(len(sort(xyz_duplicates, discard_missing=True)), len(xyz))
+
+        sort_index = sort(xyz_duplicates, discard_missing=False)
+        self.assertListEqual(sorted(sort_index), list(range(len(xyz_duplicates))))
+
+        # duplicates are placed next to their originals
+        for duplicate, original in zip([len(xyz), len(xyz) + 1], [100, 500]):
+            self.assertEqual(abs(sort_index.index(duplicate) - sort_index.index(original)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import copy
 import unittest
+from pathlib import Path
 from test.testdata import open_loop_trajectory
 from test.util import random_number
 from typing import Any
@@ -6,8 +8,12 @@ from typing import Any
 import numpy as np
 from pointset import PointSet
 
+from trajectopy_core.input_output.trajectory_io import read_data, read_string
+from trajectopy_core.poseset import PoseSet
 from trajectopy_core.rotationset import RotationSet
+from trajectopy_core.sorting import Sorting
 from trajectopy_core.trajectory import Trajectory
+from trajectopy_core.utils import gradient_3d, lengths_from_xyz
 
 
 class TestTrajectory(unittest.TestCase):
@@ -51,6 +57,17 @@ class TestTrajectory(unittest.TestCase):
         self.trajectory_sanity_check(trajectory)
         self.trajectory_sanity_check(trajectory_ref)
 
+        # repeated final timestamps must not result in NaN values
+        trajectory = open_loop_trajectory.copy()
+        tstamps = trajectory.tstamps
+        tstamps[-1] = tstamps[-2]
+        trajectory.tstamps = tstamps
+        trajectory.interpolate(tstamps=trajectory.tstamps[-10:])
+        self.assertTrue(np.all(np.isfinite(trajectory.xyz)))
+        self.assertTrue(np.all(np.isfinite(trajectory.quat)))
+        self.assertTrue(np.all(np.isfinite(trajectory.arc_lengths)))
+        self.assertTrue(np.all(np.isfinite(trajectory.speed_3d)))
+
     def test_crop(self) -> None:
         trajectory = open_loop_trajectory.copy()
 
@@ -81,6 +98,158 @@ class TestTrajectory(unittest.TestCase):
         self.trajectory_sanity_check(trajectory)
         self.trajectory_sanity_check(trajectory_ref)
 
+        # timestamps within gaps are removed
+        num_poses = len(trajectory_ref)
+        tstamps_gap = np.r_[trajectory_ref.tstamps[: num_poses // 3], trajectory_ref.tstamps[2 * num_poses // 3 :]]
+        gap_start, gap_end = tstamps_gap[num_poses // 3 - 1], tstamps_gap[num_poses // 3]
+        max_gap_size = (gap_end - gap_start) / 2
+
+        trajectory_gap = open_loop_trajectory.intersect(tstamps=tstamps_gap, max_gap_size=max_gap_size, inplace=False)
+        in_gap = (open_loop_trajectory.tstamps > gap_start) & (open_loop_trajectory.tstamps < gap_end)
+        np.testing.assert_array_equal(trajectory_gap.tstamps, open_loop_trajectory.tstamps[~in_gap])
+
+    def test_copy(self) -> None:
+        trajectory = open_loop_trajectory.copy()
+        tstamps, xyz = trajectory.tstamps.copy(), trajectory.pos.xyz.copy()
+
+        # copies share the components, arrays taken before copying become read-only
+        xyz_before, rot_before = trajectory.pos.xyz, trajectory.rot
+        trajectory_copy, trajectory_deepcopy = trajectory.copy(), copy.deepcopy(trajectory)
+        self.assertTrue(np.shares_memory(trajectory_copy._pos.xyz, xyz_before))
+        self.assertFalse(np.shares_memory(trajectory_deepcopy._pos.xyz, xyz_before))
+        with self.assertRaises(ValueError):
+            xyz_before += 7.0
+        rot_before[0] = RotationSet.from_rotvec([0.1, 0.2, 0.3])
+        np.testing.assert_array_equal(trajectory_copy.pos.xyz, xyz)
+        np.testing.assert_array_equal(trajectory_deepcopy.pos.xyz, xyz)
+        np.testing.assert_array_equal(trajectory_copy.rot.as_quat(), open_loop_trajectory.rot.as_quat())
+
+        # components are copied before they are handed out for modification
+        trajectory_copy.pos.xyz += 7.0
+        trajectory_copy.tstamps[:] = 0.0
+        trajectory_deepcopy.tstamps[:] = 0.0
+        np.testing.assert_array_equal(trajectory.pos.xyz, xyz)
+        np.testing.assert_array_equal(trajectory.tstamps, tstamps)
+        trajectory.pos.xyz += 7.0
+        np.testing.assert_array_equal(trajectory.pos.xyz, trajectory_copy.pos.xyz)
+        trajectory.pos.xyz = xyz.copy()
+
+        # filtering without inplace shares slices of the original until they are modified
+        cropped = trajectory.crop(t_start=tstamps[10], t_end=tstamps[-10], inplace=False)
+        self.assertEqual(len(cropped), len(tstamps) - 19)
+        self.assertTrue(np.shares_memory(cropped._tstamps, trajectory._tstamps))
+        self.trajectory_sanity_check(cropped)
+
+        cropped.pos.xyz[:] = 0.0
+        cropped.tstamps[:] = 0.0
+        np.testing.assert_array_equal(trajectory.pos.xyz, xyz)
+        np.testing.assert_array_equal(trajectory.tstamps, tstamps)
+
+    def test_derived_fields(self) -> None:
+        xyz = open_loop_trajectory.pos.xyz.copy()
+        tstamps = open_loop_trajectory.tstamps.copy()
+        trajectory = Trajectory(pos=PointSet(xyz=xyz.copy(), epsg=0), tstamps=tstamps.copy())
+
+        # speeds and arc lengths are computed lazily from the initial positions
+        index = np.sort(np.random.choice(len(xyz), size=len(xyz) // 2, replace=False))
+        trajectory.apply_index(index)
+        trajectory.crop(t_start=tstamps[index[10]], t_end=tstamps[index[-10]])
+        np.testing.assert_allclose(trajectory.arc_lengths, lengths_from_xyz(xyz)[index[10:-9]])
+        np.testing.assert_allclose(trajectory.speed_3d, gradient_3d(xyz=xyz, tstamps=tstamps)[index[10:-9]])
+
+        # the sorted properties are cached until components are retrieved for in-place modification
+        _ = trajectory.xyz, trajectory.sorting_index
+        trajectory.pos.xyz += 3.0
+        trajectory.tstamps[:] = trajectory.tstamps[::-1].copy()
+        np.testing.assert_allclose(trajectory.xyz, xyz[index[10:-9]][::-1] + 3.0)
+        np.testing.assert_array_equal(trajectory.sorting_index, np.arange(len(trajectory))[::-1])
+        self.assertTrue(trajectory.xyz.flags.writeable)
+
+        # or replaced
+        trajectory.tstamps = trajectory.tstamps[::-1].copy()
+        np.testing.assert_array_equal(trajectory.sorting_index, np.arange(len(trajectory)))
+        np.testing.assert_allclose(trajectory.xyz, xyz[index[10:-9]] + 3.0)
+
+        trajectory.sorting = Sorting.ARC_LENGTH
+        np.testing.assert_allclose(trajectory.function_of, trajectory.arc_lengths)
+
+    def test_apply_transformation(self) -> None:
+        trajectory = open_loop_trajectory.copy()
+        transformation = np.eye(4)
+        transformation[:3, :3] = RotationSet.random().as_matrix()
+        transformation[:3, 3] = np.random.randn(3) * 100
+
+        transformed = trajectory.apply_transformation(transformation, inplace=False)
+
+        se3_target = [np.dot(transformation, pose) for pose in trajectory.se3]
+        np.testing.assert_allclose(transformed.se3.matrices, np.array(se3_target), atol=1e-8)
+        np.testing.assert_allclose(
+            (trajectory.se3.inv() @ trajectory.se3).matrices, PoseSet.identity(len(trajectory)).matrices, atol=1e-12
+        )
+        self.trajectory_sanity_check(transformed)
+
+    def test_se3(self) -> None:
+        trajectory = open_loop_trajectory.copy()
+        se3 = trajectory.se3
+
+        se3_list = list(se3)
+        self.assertEqual(len(se3_list), len(trajectory))
+        self.assertIsInstance(se3[-1], np.ndarray)
+        np.testing.assert_array_equal(se3[-1], se3_list[-1])
+        np.testing.assert_array_equal(np.asarray(se3), se3.matrices)
+        np.testing.assert_array_equal(np.array(list(reversed(se3))), se3.matrices[::-1])
+
+        trajectory.se3 = se3_list[::-1]
+        np.testing.assert_allclose(trajectory.pos.xyz, open_loop_trajectory.pos.xyz[::-1])
+
+    def test_iter_file_chunks(self) -> None:
+        filename = "./test/data/open_loop_trajectory.traj"
+        trajectory = Trajectory.from_file(filename)
+        chunks = list(Trajectory.iter_file_chunks(filename, chunk_size=1000))
+
+        self.assertEqual(len(chunks), int(np.ceil(len(trajectory) / 1000)))
+        np.testing.assert_array_equal(np.concatenate([chunk.tstamps for chunk in chunks]), trajectory.tstamps)
+        np.testing.assert_array_equal(np.concatenate([chunk.xyz for chunk in chunks]), trajectory.xyz)
+        np.testing.assert_array_equal(np.concatenate([chunk.quat for chunk in chunks]), trajectory.quat)
+
+        for chunk in chunks:
+            self.assertEqual(chunk.name, trajectory.name)
+            self.trajectory_sanity_check(chunk)
+
+        _, data = read_data(filename)
+        _, data_float32 = read_data(filename, dtype=np.float32)
+        self.assertEqual(data_float32.dtype, np.float32)
+        np.testing.assert_array_equal(data_float32, data.astype(np.float32))
+
+    def test_read_string(self) -> None:
+        header_data, data = read_string(
+            "#fields t,px,py,pz,temp\n#epsg 0\n0,1,2,3,20.5\n1,2,3,4,21.5\n#epsg 25832\n2,3,4,5,22.5\n"
+        )
+
+        # columns that are no trajectory fields are kept as read
+        np.testing.assert_array_equal(data[:, 4], [20.5, 21.5, 22.5])
+        np.testing.assert_array_equal(data[:, 0], [0, 1, 2])
+
+        # header lines following the first data line are ignored
+        self.assertEqual(header_data.epsg, 0)
+
+    def test_binary_file(self) -> None:
+        Path("./test/tmp").mkdir(parents=True, exist_ok=True)
+        trajectory = open_loop_trajectory.copy()
+        trajectory.to_binary_file("./test/tmp/test.trajb")
+        imported_trajectory = Trajectory.from_file("./test/tmp/test.trajb")
+
+        self.assertEqual(imported_trajectory, trajectory)
+        np.testing.assert_array_equal(imported_trajectory.xyz, trajectory.xyz)
+        self.trajectory_sanity_check(imported_trajectory)
+
+        # the fields are copied from the memory-mapped file
+        for field in ("tstamps", "arc_lengths", "speed_3d"):
+            self.assertTrue(getattr(imported_trajectory, field).flags.writeable)
+            self.assertNotIsInstance(getattr(imported_trajectory, field).base, np.memmap)
+        self.assertTrue(imported_trajectory.pos.xyz.flags.writeable)
+        imported_trajectory.arc_lengths -= 1.0
+
     def generate_altered_trajectory(self) -> Trajectory:
         trajectory = open_loop_trajectory.copy()
 
@@ -115,6 +284,6 @@ class TestTrajectory(unittest.TestCase):
         self.check_trajectory_attribute(trajectory.speed_3d, target_length=target_length, target_type=np.ndarray)
         self.check_trajectory_attribute(trajectory.arc_lengths, target_length=target_length, target_type=np.ndarray)
 
-        self.check_trajectory_attribute(trajectory.se3, target_length=target_length, target_type=list)
+        self.check_trajectory_attribute(trajectory.se3, target_length=target_length, target_type=PoseSet)
         self.check_trajectory_attribute(trajectory.data_rate, target_length=0, target_type=float)
         self.check_trajectory_attribute(trajectory.total_length, target_length=0, target_type=float)
@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from trajectopy_core.approximation.voxelizer import Voxelizer
+
+
+class TestVoxelizer(unittest.TestCase):
+    def test_voxel_means(self) -> None:
+        xyz = np.random.rand(1000, 3) * 10
+        voxelizer = Voxelizer(xyz, voxel_size=1.0)
+
+        self.assertEqual(sum(voxel.num_points for voxel in voxelizer.voxels.values()), len(xyz))
+        np.testing.assert_allclose(
+            voxelizer.mean_points, [voxel.mean_point for voxel in voxelizer.voxels.values()], atol=1e-12
+        )
+        for voxel in voxelizer.voxels.values():
+            np.testing.assert_array_less(np.ptp(voxel.points, axis=0), 1.0 + 1e-12)
+
+    def test_distinct_voxel_ids(self) -> None:
+        # grid indices (1, 12, 0) and (11, 2, 0) must not share a voxel
+        xyz = np.array([[0.0, 0.0, 0.0], [0.5, 11.5, 0.0], [10.5, 1.5, 0.0], [12.0, 12.0, 0.0]])
+        voxelizer = Voxelizer(xyz, voxel_size=1.0)
+
+        self.assertEqual(voxelizer.num_voxels, len(xyz))
+        neighbors = voxelizer.k_nearest_query(xyz, k_nearest=1)
+        for point, voxel_set in zip(xyz, neighbors):
+            np.testing.assert_array_equal(voxelizer.points_from_voxel_set(voxel_set), point[None, :])
+
+
+if __name__ == "__main__":
+    unittest.main()
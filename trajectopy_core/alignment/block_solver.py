@@ -0,0 +1,93 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+
+Solver for the normal equations of the Gauß-Helmert-Model.
+
+The three observation equations of an epoch only depend on the
+observations of the same epoch and the observations are uncorrelated.
+Therefore, the matrix B @ Σ_ll @ B.T is block-diagonal with one 3x3
+block per epoch. Instead of factorizing the full sparse matrix, the
+blocks are inverted all at once and the reduced normal equations are
+formed directly.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+class BlockDiagonalSolver:
+    """Inverts the 3x3 blocks of B @ Σ_ll @ B.T of the Gauß-Helmert-Model
+
+    Args:
+        cond_stack (np.ndarray): non-zero data of the condition matrix [n x 3 * num_obs_per_epoch]
+        var_vector (np.ndarray): variances of the observations [n * num_obs_per_epoch]
+    """
+
+    def __init__(self, cond_stack: np.ndarray, var_vector: np.ndarray) -> None:
+        num_epochs = len(cond_stack)
+        self.b_cond = np.reshape(cond_stack, (num_epochs, 3, -1))
+        self.variances = np.reshape(var_vector, (num_epochs, -1))
+
+        bbt = np.einsum("nik,nk,njk->nij", self.b_cond, self.variances, self.b_cond)
+        self.bbt_inv = np.linalg.inv(bbt)
+
+    @property
+    def num_epochs(self) -> int:
+        return len(self.b_cond)
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        """Computes (B @ Σ_ll @ B.T)^-1 @ rhs
+
+        Args:
+            rhs (np.ndarray): right hand side [3n] or [3n x m]
+
+        Returns:
+            np.ndarray: solution with the same shape as rhs
+        """
+        rhs_blocks = np.reshape(rhs, (self.num_epochs, 3, -1))
+        return np.reshape(self.bbt_inv @ rhs_blocks, rhs.shape)
+
+    def normal_equations(self, a_design: np.ndarray, contradiction_w: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Computes the reduced normal equations of the Gauß-Helmert-Model
+
+        Args:
+            a_design (np.ndarray): design matrix [3n x u]
+            contradiction_w (np.ndarray): contradiction vector [3n]
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: normal matrix A.T @ (B @ Σ_ll @ B.T)^-1 @ A [u x u]
+                   and right hand side A.T @ (B @ Σ_ll @ B.T)^-1 @ w [u]
+        """
+        a_blocks = np.reshape(a_design, (self.num_epochs, 3, -1))
+        weighted_a = self.bbt_inv @ a_blocks
+        normal_matrix = np.einsum("niu,niv->uv", a_blocks, weighted_a)
+        rhs = np.einsum("niu,ni->u", weighted_a, np.reshape(contradiction_w, (self.num_epochs, 3)))
+        return normal_matrix, rhs
+
+    def residuals(self, correlates_k: np.ndarray) -> np.ndarray:
+        """Computes the residuals Σ_ll @ B.T @ k
+
+        Args:
+            correlates_k (np.ndarray): correlates [3n]
+
+        Returns:
+            np.ndarray: residuals [n * num_obs_per_epoch]
+        """
+        k_blocks = np.reshape(correlates_k, (self.num_epochs, 3))
+        return np.ravel(self.variances * np.einsum("nij,ni->nj", self.b_cond, k_blocks))
+
+    def condition_product(self, values: np.ndarray) -> np.ndarray:
+        """Computes B @ values
+
+        Args:
+            values (np.ndarray): vector with one entry per observation [n * num_obs_per_epoch]
+
+        Returns:
+            np.ndarray: product [3n]
+        """
+        value_blocks = np.reshape(values, (self.num_epochs, -1))
+        return np.ravel(np.einsum("nij,nj->ni", self.b_cond, value_blocks))
@@ -40,8 +40,8 @@ class AlignmentData:
     matching_settings: MatchingSettings
 
     def __post_init__(self) -> None:
-        self.traj_from = copy.deepcopy(self.traj_from)
-        self.traj_to = copy.deepcopy(self.traj_to)
+        self.traj_from = self.traj_from.copy()
+        self.traj_to = self.traj_to.copy()
         self.alignment_settings = copy.deepcopy(self.alignment_settings)
 
         self.setup()
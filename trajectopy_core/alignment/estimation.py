@@ -11,9 +11,10 @@ from typing import Dict
 import numpy as np
 from numpy import matlib
 from scipy.sparse import csc_matrix
-from scipy.sparse.linalg import spsolve
 from scipy.stats.distributions import chi2
 
+from trajectopy_core.alignment import jacobians
+from trajectopy_core.alignment.block_solver import BlockDiagonalSolver
 from trajectopy_core.alignment.data import AlignmentData
 from trajectopy_core.alignment.direct import (
     align_rotations,
@@ -32,7 +33,7 @@ from trajectopy_core.alignment.parameters import (
 from trajectopy_core.alignment.result import AlignmentResult
 from trajectopy_core.alignment.utils import dict2table
 from trajectopy_core.definitions import Unit
-from trajectopy_core.settings.alignment import AlignmentSettings
+from trajectopy_core.settings.alignment import AlignmentSettings, JacobianMethod
 from trajectopy_core.settings.matching import MatchingSettings
 from trajectopy_core.trajectory import Trajectory
 
@@ -275,9 +276,7 @@ class AlignmentEstimation:
 
     @property
     def variance_factor(self) -> float:
-        return (
-            self.data.res_vector.T @ spsolve(csc_matrix(self.data.sigma_ll), self.data.res_vector)
-        ) / self.redundancy
+        return np.sum(self.data.res_vector**2 / self.data.var_vector) / self.redundancy
 
     def _estimate_parameters(self) -> None:
         """Helmert-Leverarm-Time Transformation using the Gauß-Helmert-Model
@@ -310,44 +309,37 @@ class AlignmentEstimation:
 
             # filter design matrix
             a_design = a_design[:, self.settings.estimation_settings.lq_parameter_filter]
-            b_cond = self._get_condition_matrix()
-
-            bbt = b_cond @ self.data.sigma_ll @ b_cond.T
+            # B @ sigma_ll @ B.T is block-diagonal with 3x3 blocks per epoch
+            solver = BlockDiagonalSolver(cond_stack=self._get_condition_stack(), var_vector=self.data.var_vector)
+            normal_matrix, normal_rhs = solver.normal_equations(a_design, contradiction_w)
 
             # solve normal equations
-            delta_params = self._compute_parameter_deltas(contradiction_w, a_design, bbt)
-            correlates_k = -spsolve(bbt, a_design @ delta_params + contradiction_w)
-            self.data.res_vector = self.data.sigma_ll @ b_cond.T @ correlates_k
+            delta_params = self._compute_parameter_deltas(normal_matrix, normal_rhs)
+            correlates_k = -solver.solve(a_design @ delta_params + contradiction_w)
+            self.data.res_vector = solver.residuals(correlates_k)
 
             # update
             self._est_params.values_enabled += delta_params
-            contradiction_w = self._eval_functional_relationship() - b_cond @ self.data.res_vector.ravel()
+            contradiction_w = self._eval_functional_relationship() - solver.condition_product(self.data.res_vector)
             it_counter += 1
 
         if self._converged:
             logger.info("Adjustment did converge after %i iterations", it_counter)
 
-        self._compute_parameter_variances(a_design, bbt)
+        self._compute_parameter_variances(normal_matrix)
 
-    def _compute_parameter_variances(self, a_design: csc_matrix, bbt: csc_matrix) -> None:
-        sigma_xx_inv: csc_matrix = a_design.T @ spsolve(bbt, a_design)
-        if sigma_xx_inv.size == 1:
-            self._est_params.set_covariance_matrix(np.reciprocal(sigma_xx_inv[:, None]))
+    def _compute_parameter_variances(self, normal_matrix: np.ndarray) -> None:
+        if normal_matrix.size == 1:
+            self._est_params.set_covariance_matrix(np.reciprocal(normal_matrix))
         else:
-            self._est_params.set_covariance_matrix(np.linalg.pinv(sigma_xx_inv.toarray()))
+            self._est_params.set_covariance_matrix(np.linalg.pinv(normal_matrix))
 
-    def _compute_parameter_deltas(
-        self, contradiction_w: np.ndarray, a_design: csc_matrix, bbt: csc_matrix
-    ) -> np.ndarray:
-        if a_design.shape[1] == 1:
-            return -(a_design.T @ spsolve(bbt, contradiction_w)) / (a_design.T @ spsolve(bbt, a_design))
+    def _compute_parameter_deltas(self, normal_matrix: np.ndarray, normal_rhs: np.ndarray) -> np.ndarray:
+        if normal_matrix.size == 1:
+            return -normal_rhs / normal_matrix[0]
 
         # quasi vermittelnd
-        # spsolve(-a_design.T @ spsolve(bbt, -a_design), -a_design.T @ spsolve(bbt, contradiction_w))
-        return -spsolve(
-            a_design.T @ spsolve(bbt, a_design),
-            a_design.T @ spsolve(bbt, contradiction_w),
-        )
+        return -np.linalg.solve(normal_matrix, normal_rhs)
 
     def _global_test(self, variance_factor: float, redundancy: int, description: str = "global") -> bool:
         tau = variance_factor * redundancy
@@ -364,12 +356,15 @@ class AlignmentEstimation:
         )
         return tau <= quantile
 
-    def _get_design_matrix(self) -> csc_matrix:
+    def _get_design_matrix(self) -> np.ndarray:
+        if self.settings.jacobian_method == JacobianMethod.ANALYTIC:
+            return jacobians.design_matrix(observations=self.data, parameters=self.est_params)
+
         a_design = np.zeros((self.data.number_of_epochs * 3, 11))
         a_design[0::3, :] = self._get_design_x()
         a_design[1::3, :] = self._get_design_y()
         a_design[2::3, :] = self._get_design_z()
-        return csc_matrix(a_design)
+        return a_design
 
     def _get_design_z(self) -> np.ndarray:
         return np.c_[
@@ -590,6 +585,14 @@ class AlignmentEstimation:
         Returns:
             np.ndarray: condition matrix data
         """
+        if self.settings.jacobian_method == JacobianMethod.ANALYTIC:
+            return jacobians.condition_stack(
+                observations=self.data,
+                parameters=self.est_params,
+                leverarm_enabled=self.settings.estimation_settings.leverarm_enabled,
+                time_shift_enabled=self.settings.estimation_settings.time_shift_enabled,
+            )
+
         xyz_from_component = self._get_condition_xyz_from()
 
         rpy_body_component = (
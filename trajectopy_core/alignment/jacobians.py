@@ -0,0 +1,143 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+
+Closed-form derivatives of the functional relationship defined in
+alignment.equations. In matrix notation, the functional relationship
+of a single epoch reads
+
+    f = -xyz_to + t + s * R_sim @ (xyz_from + R_body @ l + dt * v)
+
+with the helmert translation t, the scale s, the rotation matrix R_sim
+of the helmert rotation angles, the platform rotation matrix R_body of
+the euler angles, the leverarm l, the time shift dt and the speed v.
+Both rotation matrices are composed as R = Rz @ Ry @ Rx.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from trajectopy_core.alignment.data import AlignmentData
+from trajectopy_core.alignment.parameters import AlignmentParameters
+
+
+def _rotation_matrices(
+    euler_x: np.ndarray, euler_y: np.ndarray, euler_z: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the rotation matrices R = Rz @ Ry @ Rx and their derivatives w.r.t. the three angles
+
+    Args:
+        euler_x (np.ndarray): Rotation angles about the x-axis [n] or scalar
+        euler_y (np.ndarray): Rotation angles about the y-axis [n] or scalar
+        euler_z (np.ndarray): Rotation angles about the z-axis [n] or scalar
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: R, dR/dx, dR/dy, dR/dz [nx3x3] or [3x3]
+    """
+    cos_x, sin_x = np.cos(euler_x), np.sin(euler_x)
+    cos_y, sin_y = np.cos(euler_y), np.sin(euler_y)
+    cos_z, sin_z = np.cos(euler_z), np.sin(euler_z)
+    one, zero = np.ones_like(cos_x), np.zeros_like(cos_x)
+
+    def matrix(*rows) -> np.ndarray:
+        return np.stack([np.stack(np.broadcast_arrays(*row), axis=-1) for row in rows], axis=-2)
+
+    rot_x = matrix((one, zero, zero), (zero, cos_x, -sin_x), (zero, sin_x, cos_x))
+    rot_y = matrix((cos_y, zero, sin_y), (zero, one, zero), (-sin_y, zero, cos_y))
+    rot_z = matrix((cos_z, -sin_z, zero), (sin_z, cos_z, zero), (zero, zero, one))
+
+    d_rot_x = matrix((zero, zero, zero), (zero, -sin_x, -cos_x), (zero, cos_x, -sin_x))
+    d_rot_y = matrix((-sin_y, zero, cos_y), (zero, zero, zero), (-cos_y, zero, -sin_y))
+    d_rot_z = matrix((-sin_z, -cos_z, zero), (cos_z, -sin_z, zero), (zero, zero, zero))
+
+    return (
+        rot_z @ rot_y @ rot_x,
+        rot_z @ rot_y @ d_rot_x,
+        rot_z @ d_rot_y @ rot_x,
+        d_rot_z @ rot_y @ rot_x,
+    )
+
+
+def design_matrix(observations: AlignmentData, parameters: AlignmentParameters) -> np.ndarray:
+    """Computes the design matrix of the Gauß-Helmert-Model
+
+    The design matrix contains the derivatives of the functional
+    relationship with respect to all 11 parameters
+    [trans_x, trans_y, trans_z, rot_x, rot_y, rot_z, scale, time_shift, lever_x, lever_y, lever_z].
+    The rows are sorted in the following way: [X, Y, Z, X, Y, Z, ..., X, Y, Z]
+
+    Args:
+        observations (AlignmentData): (current) estimated observations
+        parameters (AlignmentParameters): (current) estimated parameters
+
+    Returns:
+        np.ndarray: design matrix [3n x 11]
+    """
+    rot_sim, d_rot_sim_x, d_rot_sim_y, d_rot_sim_z = _rotation_matrices(
+        parameters.sim_rot_x.value, parameters.sim_rot_y.value, parameters.sim_rot_z.value
+    )
+    rot_body = _rotation_matrices(observations.est_euler_x, observations.est_euler_y, observations.est_euler_z)[0]
+    scale = parameters.sim_scale.value
+    speed = observations.est_speed
+
+    # positions before applying the helmert transformation
+    xyz_from = (
+        observations.est_xyz_from
+        + np.einsum("nij,j->ni", rot_body, parameters.leverarm.values)
+        + parameters.time_shift.value * speed
+    )
+
+    a_design = np.zeros((observations.number_of_epochs, 3, 11))
+    a_design[:, :, 0:3] = np.eye(3)
+    a_design[:, :, 3] = scale * xyz_from @ d_rot_sim_x.T
+    a_design[:, :, 4] = scale * xyz_from @ d_rot_sim_y.T
+    a_design[:, :, 5] = scale * xyz_from @ d_rot_sim_z.T
+    a_design[:, :, 6] = xyz_from @ rot_sim.T
+    a_design[:, :, 7] = scale * speed @ rot_sim.T
+    a_design[:, :, 8:11] = scale * rot_sim @ rot_body
+
+    return np.reshape(a_design, (observations.number_of_epochs * 3, 11))
+
+
+def condition_stack(
+    observations: AlignmentData, parameters: AlignmentParameters, leverarm_enabled: bool, time_shift_enabled: bool
+) -> np.ndarray:
+    """Computes the non-zero data of the condition matrix of the Gauß-Helmert-Model
+
+    The condition matrix contains the derivatives of the functional
+    relationship with respect to the observations of each epoch, i.e.
+    [xyz_from, xyz_to(, rpy_body)(, speed)].
+
+    Args:
+        observations (AlignmentData): (current) estimated observations
+        parameters (AlignmentParameters): (current) estimated parameters
+        leverarm_enabled (bool): Whether the platform orientations are observations
+        time_shift_enabled (bool): Whether the platform speeds are observations
+
+    Returns:
+        np.ndarray: condition matrix data [n x 3 * num_obs_per_epoch]
+    """
+    rot_sim = _rotation_matrices(parameters.sim_rot_x.value, parameters.sim_rot_y.value, parameters.sim_rot_z.value)[0]
+    scale = parameters.sim_scale.value
+    num_epochs = observations.number_of_epochs
+
+    components = [
+        np.broadcast_to(scale * rot_sim, (num_epochs, 3, 3)),
+        np.broadcast_to(-np.eye(3), (num_epochs, 3, 3)),
+    ]
+
+    if leverarm_enabled:
+        _, d_rot_body_x, d_rot_body_y, d_rot_body_z = _rotation_matrices(
+            observations.est_euler_x, observations.est_euler_y, observations.est_euler_z
+        )
+        lever = parameters.leverarm.values
+        d_lever = np.stack([d_rot_body @ lever for d_rot_body in (d_rot_body_x, d_rot_body_y, d_rot_body_z)], axis=-1)
+        components.append(scale * rot_sim @ d_lever)
+
+    if time_shift_enabled:
+        components.append(np.broadcast_to(scale * parameters.time_shift.value * rot_sim, (num_epochs, 3, 3)))
+
+    return np.reshape(np.concatenate(components, axis=2), (num_epochs, -1))
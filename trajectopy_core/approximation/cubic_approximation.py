@@ -5,14 +5,13 @@ Gereon Tombrink, 2023
 mail@gtombrink.de
 """
 
+import copy
 import logging
 from typing import List, Tuple, Union
 
 import numpy as np
-import numpy.matlib as npm
-from scipy.sparse import csr_matrix
-
-from trajectopy_core.utils import sparse_least_squares
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.linalg import splu
 
 # logger configuration
 logger = logging.getLogger("root")
@@ -21,6 +20,10 @@ logger = logging.getLogger("root")
 class CubicApproximation:
     """
     Class for piecewise cubic approximation
+
+    The values can either be a vector [n] or a matrix [n x m]. In the
+    latter case, all columns are approximated at once using the same
+    intervals.
     """
 
     def __init__(self, function_of: np.ndarray, values: np.ndarray, int_size: float, min_obs: int) -> None:
@@ -60,7 +63,9 @@ class CubicApproximation:
         int_start = self.interval_steps[interval_indices - 1]
         int_end = self.interval_steps[interval_indices]
 
-        c0, c1, c2, c3 = self._compute_c(locations, int_start, int_end)
+        c0, c1, c2, c3 = (
+            c.reshape(c.shape + (1,) * (f_vals.ndim - 1)) for c in self._compute_c(locations, int_start, int_end)
+        )
 
         return (
             f_vals[interval_indices - 1] * c0
@@ -69,152 +74,146 @@ class CubicApproximation:
             + f_deriv_vals[interval_indices] * c3
         )
 
+    def columns(self) -> List["CubicApproximation"]:
+        """
+        Splits an approximation of a matrix of values into one approximation per column
+
+        The columns share the intervals of this approximation, so no new fit is computed.
+        """
+        if self.values.ndim == 1:
+            return [self]
+
+        approx_list = []
+        for i in range(self.values.shape[1]):
+            approx = copy.copy(self)
+            approx.values = self.values[:, i]
+            approx.parameters = self.parameters[:, i]
+            approx.est_obs = self.est_obs[:, i]
+            approx.residuals = self.residuals[:, i]
+            approx_list.append(approx)
+
+        return approx_list
+
     def _cubic_approx(self) -> None:
         """
         Approximation using piece-wise cubic polynomials
         """
         var_red = self.function_of - self.function_of[0]
+        num_obs = len(var_red)
+
+        int_starts = self._interval_starts(var_red, self.int_size, self.min_obs)
+        int_ends = np.r_[int_starts[1:] - 1, num_obs - 1]
 
-        # interval steps
-        interval_steps = np.arange(0, var_red[-1], self.int_size)
-
-        # include endpoint if necessary
-        if interval_steps[-1] != var_red[-1]:
-            interval_steps = np.r_[interval_steps, var_red[-1]]
-
-        # empty list for final interval boundaries
-        t_final = []
-        intervals: List[list] = []
-        coefficients: List[np.ndarray] = []
-
-        int_list = []
-        int_start_idx = 0
-
-        # go through all trajectory lengths
-        for i, parameters in enumerate(var_red):
-            # compute the current length of the interval
-            int_len = parameters - var_red[int_start_idx]
-            # add current value to the interval
-            int_list.append(parameters)
-
-            # check if it's the last interval
-            last_int = i == len(var_red) - 1
-
-            # if the desired interval length is reached and there are enough observations
-            if (len(int_list) >= self.min_obs and int_len >= self.int_size) or last_int:
-                # if it's the last interval and there are not enough values, merge with the second to last
-                last_too_small = last_int and len(int_list) < self.min_obs
-                if last_too_small:
-                    # extend previous interval
-                    t_start = var_red[int_start_idx - 1]
-                    intervals[-1].extend(int_list)
-                else:
-                    # new interval
-                    t_start = var_red[int_start_idx]
-                    t_final.append(t_start)
-                    intervals.append(int_list)
-
-                # compute coefficients
-                x_a = np.repeat(t_start, len(intervals[-1]))
-                x_e = np.repeat(parameters, len(intervals[-1]))
-                c0, c1, c2, c3 = self._compute_c(intervals[-1], x_a, x_e)
-
-                if last_too_small:
-                    coefficients[-1] = np.c_[c0, c1, c2, c3]
-                else:
-                    coefficients.append(np.c_[c0, c1, c2, c3])
-
-                # reset interval list and start index
-                int_list = []
-
-                int_start_idx = i + 1
-
-        t_final.append(var_red[-1])
+        # interval boundaries used for evaluation
+        t_final = np.r_[var_red[int_starts], var_red[-1]]
+
+        # interval locations used for the coefficients of each observation
+        x_a = var_red[int_starts]
+        x_e = var_red[int_ends]
+        int_sizes = int_ends - int_starts + 1
+
+        # if the last interval has not enough values, merge it with the second to last
+        if len(int_starts) > 1 and int_sizes[-1] < self.min_obs:
+            t_final = np.delete(t_final, -2)
+            x_a = np.r_[x_a[:-2], var_red[int_starts[-1] - 1]]
+            x_e = np.r_[x_e[:-2], var_red[-1]]
+            int_sizes = np.r_[int_sizes[:-2], int_sizes[-2] + int_sizes[-1]]
 
         logger.debug(
             "Average observation count per interval: %.2f",
-            len(var_red) / len(intervals),
+            num_obs / len(int_sizes),
         )
 
-        dim = [self.function_of.size, 2 * len(coefficients) + 2]
+        interval_indices = np.repeat(np.arange(len(int_sizes)), int_sizes)
+        coefficients = np.column_stack(self._compute_c(var_red, x_a[interval_indices], x_e[interval_indices]))
+
         # Design matrix (jacobian)
-        a_design = self._design_matrix(coefficients, dim)
+        a_design = self._design_matrix(coefficients, interval_indices, num_parameters=2 * len(int_sizes) + 2)
 
-        # least squares
+        # least squares, the factorization of the normal equations is shared by all columns of values
         logger.debug("Approximation using piece-wise cubic polynomials via least-squares method.")
-        xS, lS, residuals = sparse_least_squares(csr_matrix(a_design), self.values[:, None])
+        normal_matrix = (a_design.T @ a_design).tocsc()
+        xS = splu(normal_matrix).solve(np.asarray(a_design.T @ self.values))
+        lS = a_design @ xS
 
         # store results
         self.parameters = xS
         self.est_obs = lS
-        self.residuals = residuals
+        self.residuals = lS - self.values
         self.interval_steps = t_final + self.function_of[0]
 
     @staticmethod
-    @np.vectorize
-    def _compute_c(location: float, interval_start: float, interval_end: float) -> Tuple[float, float, float, float]:
+    def _interval_starts(var_red: np.ndarray, int_size: float, min_obs: int) -> np.ndarray:
         """
-        Helper function to compute the coefficients for cubic approximation
-        """
-        c0 = (
-            1
-            - 3 * ((location - interval_start) / (interval_end - interval_start)) ** 2
-            + 2 * ((location - interval_start) / (interval_end - interval_start)) ** 3
-        )
+        Helper function to compute the index of the first observation of each interval
 
-        c1 = (location - interval_start) * (
-            1
-            - 2 * (location - interval_start) / (interval_end - interval_start)
-            + ((location - interval_start) / (interval_end - interval_start)) ** 2
-        )
+        An interval is closed as soon as it contains at least min_obs observations
+        and spans at least int_size. The end of an interval starting at any
+        observation is found by binary search, so that only the chain of
+        interval starts has to be followed. var_red must be sorted ascending.
+        """
+        num_obs = len(var_red)
+        indices = np.arange(num_obs)
+
+        # first observation that is at least int_size away from each potential interval start
+        size_reached = np.searchsorted(var_red, var_red + int_size)
+        # correct rounding differences between var_red + int_size and the differences of var_red
+        while np.any(too_far := (size_reached > indices) & (var_red[size_reached - 1] - var_red >= int_size)):
+            size_reached[too_far] -= 1
+        while np.any(
+            too_close := (size_reached < num_obs)
+            & (var_red[np.minimum(size_reached, num_obs - 1)] - var_red < int_size)
+        ):
+            size_reached[too_close] += 1
+
+        next_start = np.minimum(np.maximum(indices + min_obs, size_reached + 1), num_obs).tolist()
+
+        int_starts = []
+        int_start = 0
+        while int_start < num_obs:
+            int_starts.append(int_start)
+            int_start = next_start[int_start]
+
+        return np.array(int_starts)
 
-        c2 = (
-            3 * ((location - interval_start) / (interval_end - interval_start)) ** 2
-            - 2 * ((location - interval_start) / (interval_end - interval_start)) ** 3
-        )
+    @staticmethod
+    def _compute_c(
+        location: np.ndarray, interval_start: np.ndarray, interval_end: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Helper function to compute the coefficients for cubic approximation
+        """
+        rel_location = location - interval_start
+        u = rel_location / (interval_end - interval_start)
+        u_sq = u**2
+        u_cb = u**3
 
-        c3 = (location - interval_start) * (
-            ((location - interval_start) / (interval_end - interval_start)) ** 2
-            - (location - interval_start) / (interval_end - interval_start)
-        )
+        c0 = 1 - 3 * u_sq + 2 * u_cb
+        c1 = rel_location * (1 - 2 * u + u_sq)
+        c2 = 3 * u_sq - 2 * u_cb
+        c3 = rel_location * (u_sq - u)
 
         return c0, c1, c2, c3
 
     @staticmethod
-    def _design_matrix(c: List[np.ndarray], dim: List[int]) -> csr_matrix:
+    def _design_matrix(coefficients: np.ndarray, interval_indices: np.ndarray, num_parameters: int) -> csr_matrix:
         """
         Helper function to create the design (jacobian) matrix for least-squares adjustment
+
+        Each row contains the four coefficients of an observation at the
+        columns of the function values and derivatives at the start and
+        end of its interval. The column indices increase by 2 with each interval:
+        [1,2,3,4;
+         1,2,3,4;
+           ...
+         3,4,5,6;
+         3,4,5,6;
+           ...
         """
-        # vectorize data
-        c_mat = np.row_stack(c)
-        c_vec = np.reshape(c_mat, (c_mat.size,))
-
-        # column indices
-        # [1,2,3,4;
-        #  1,2,3,4;
-        #    ...
-        #  3,4,5,6;
-        #  3,4,5,6;
-        #    ...
-        # Blocks for intervals
-
-        # interval sizes
-        int_sizes = [len(parameters) for parameters in c]
-        # column indicex increase by 2 with each interval
-        col_offs = np.r_[np.arange(0, dim[1] - 4, 2), dim[1] - 4]
-        # offsets are repeated according to interval size
-        col_offs_rep = np.repeat(col_offs, int_sizes).reshape((dim[0], 1))
-        # add offsets to plain [0,1,2,3]
-        col_idx = npm.repmat(np.array([0, 1, 2, 3]), dim[0], 1) + col_offs_rep
-        # vectorize
-        col_idx_vec = np.reshape(col_idx, (col_idx.size,))
-
-        # row indices
-        # [0,0,0,0; 1,1,1,1; 2,2,2,2; 3,3,3,3; ...]
-        row_idx = np.repeat(np.arange(0, dim[0], 1), 4)
-
-        # return design matrix
-        return csr_matrix((c_vec, (row_idx, col_idx_vec)))
+        num_obs = len(coefficients)
+        row_idx = np.repeat(np.arange(num_obs), 4)
+        col_idx = np.ravel(2 * interval_indices[:, None] + np.arange(4))
+        return coo_matrix((np.ravel(coefficients), (row_idx, col_idx)), shape=(num_obs, num_parameters)).tocsr()
 
 
 def piecewise_cubic(
@@ -229,18 +228,15 @@ def piecewise_cubic(
 
     Args:
         function_of (np.ndarray): The input values to approximate the function for.
-        values (np.ndarray): The output values corresponding to the input values.
+        values (np.ndarray): The output values corresponding to the input values, one column per function.
         int_size (float, optional): The interval size for the approximation. Defaults to 0.15.
         min_obs (int, optional): The minimum number of observations required for the approximation. Defaults to 25.
         return_approx_objects (bool, optional): Whether to return the list of CubicApproximation objects along with the approximated values. Defaults to False.
 
     Returns:
-        Union[np.ndarray, Tuple[list[CubicApproximation], np.ndarray]]: The approximated values. If `return_approx_objects` is True, returns a tuple containing the approximated values and the list of CubicApproximation objects.
+        Union[np.ndarray, Tuple[np.ndarray, list[CubicApproximation]]]: The approximated values. If `return_approx_objects` is True, returns a tuple containing the approximated values and the list of CubicApproximation objects, one per column of values.
     """
-    # Cubic spline approximation
-    # least squares
-    approx_list = [CubicApproximation(function_of, values[:, i], int_size, min_obs) for i in range(values.shape[1])]
-
-    approx_values = np.column_stack([ap.est_obs for ap in approx_list if ap.est_obs is not None])
+    # Cubic spline approximation of all columns at once, as they share the same design matrix
+    approx = CubicApproximation(function_of, values, int_size, min_obs)
 
-    return (approx_values, approx_list) if return_approx_objects else approx_values
+    return (approx.est_obs, approx.columns()) if return_approx_objects else approx.est_obs
@@ -6,18 +6,17 @@ mail@gtombrink.de
 """
 
 import logging
-from functools import lru_cache
-from typing import FrozenSet, Tuple, Union
+from typing import Tuple
 
 import numpy as np
 
-from trajectopy_core.utils import Line3D
-
 from .voxelizer import Voxelizer
 
 # logger configuration
 logger = logging.getLogger("root")
 
+NEIGHBORHOOD_CHUNK_SIZE = 2**16
+
 
 def mls_iterative(
     xyz: np.ndarray,
@@ -60,11 +59,15 @@ def mls_iterative(
 
 
 def mls_single(xyz: np.ndarray, voxel_size: float, k_nearest: int) -> Tuple[np.ndarray, float]:
-    """Performs the mls approximation iteratively
+    """Performs a single mls approximation
 
     This method approximates the neighborhood of a point
     using a 3d line. Neighborhoods are defined using voxels.
 
+    Points with identical neighborhoods share the same line. Therefore,
+    the points are grouped by their neighborhoods and the lines of all
+    groups are estimated at once.
+
     Args:
         xyz (np.ndarray): Input points that should be approximated
         voxel_size (float): length of one voxel side
@@ -74,29 +77,68 @@ def mls_single(xyz: np.ndarray, voxel_size: float, k_nearest: int) -> Tuple[np.n
         Tuple[np.ndarray, float]: Approximated positions, average point movement
     """
     voxelizer = Voxelizer(xyz, voxel_size=voxel_size)
-    neighboring_voxels = voxelizer.k_nearest_query(xyz, k_nearest=k_nearest)
-    mls_approx = np.zeros(xyz.shape, dtype=float)
-    for i, voxel_set in enumerate(neighboring_voxels):
-        line = cached_line_approximator(voxelizer=voxelizer, voxel_set=voxel_set)
-        mls_approx[i, :] = line.evaluate_at(xyz[i, :]) if line is not None else xyz[i, :]
+    neighboring_voxels = voxelizer.k_nearest_indices(xyz, k_nearest=k_nearest)
+    neighborhoods, neighborhood_index = np.unique(neighboring_voxels, axis=0, return_inverse=True)
+    neighborhood_index = np.ravel(neighborhood_index)
+
+    line_means, line_directions, num_points = neighborhood_lines(voxelizer=voxelizer, neighborhoods=neighborhoods)
+
+    # project points onto the lines of their neighborhoods
+    means = line_means[neighborhood_index]
+    directions = line_directions[neighborhood_index]
+    mls_approx = means + np.sum((xyz - means) * directions, axis=1)[:, None] * directions
+
+    # neighborhoods with only one point are not approximated
+    single_point = num_points[neighborhood_index] < 2
+    mls_approx[single_point] = xyz[single_point]
 
     avg_point_movement = np.mean(np.sqrt(np.sum(np.power(xyz - mls_approx, 2), axis=1)))
     return mls_approx, avg_point_movement
 
 
-@lru_cache(maxsize=None)
-def cached_line_approximator(voxelizer: Voxelizer, voxel_set: FrozenSet[str]) -> Union[Line3D, None]:
-    """
-    Approximates a 3D line from a set of points and returns it as a Line3D object.
-    If the set contains only one point, returns None.
+def neighborhood_lines(
+    voxelizer: Voxelizer, neighborhoods: np.ndarray, chunk_size: int = NEIGHBORHOOD_CHUNK_SIZE
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Approximates a 3D line for each neighborhood of voxels
+
+    The direction of a line is given by the eigenvector corresponding
+    to the largest eigenvalue of the covariance matrix of all points in
+    the neighborhood. The covariance matrices are assembled from the
+    centered scatter matrices of the voxels and processed in chunks.
 
     Args:
-        voxelizer (Voxelizer): A Voxelizer object used to extract points from the voxel set.
-        voxel_set (frozenset[str]): A set of voxel indices.
+        voxelizer (Voxelizer): A Voxelizer object holding the points.
+        neighborhoods (np.ndarray): Voxel indices of each neighborhood [m x k].
+        chunk_size (int, optional): Number of neighborhoods processed at once.
 
     Returns:
-        Union[Line3D, None]: A Line3D object representing the 3D line approximated from the points in the voxel set,
-        or None if the set contains only one point.
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Line mean points [m x 3],
+                                                  line directions [m x 3],
+                                                  number of points [m]
     """
-    points = voxelizer.points_from_voxel_set(voxel_set)
-    return Line3D.from_points(points) if len(points) > 1 else None
+    voxel_counts = np.diff(voxelizer.offsets)
+    voxel_means = voxelizer.mean_points
+    centered_points = voxelizer.points - np.repeat(voxel_means, voxel_counts, axis=0)
+    voxel_scatter = np.add.reduceat(
+        np.einsum("ni,nj->nij", centered_points, centered_points), voxelizer.offsets[:-1], axis=0
+    )
+
+    line_means = np.zeros((len(neighborhoods), 3))
+    line_directions = np.zeros((len(neighborhoods), 3))
+    num_points = np.sum(voxel_counts[neighborhoods], axis=1)
+
+    for start in range(0, len(neighborhoods), chunk_size):
+        chunk = neighborhoods[start : start + chunk_size]
+        counts = voxel_counts[chunk]
+        means = np.sum(counts[..., None] * voxel_means[chunk], axis=1) / num_points[start : start + chunk_size, None]
+
+        # parallel axis theorem
+        mean_offsets = voxel_means[chunk] - means[:, None, :]
+        scatter = np.sum(voxel_scatter[chunk], axis=1) + np.einsum(
+            "nk,nki,nkj->nij", counts, mean_offsets, mean_offsets
+        )
+
+        line_means[start : start + chunk_size] = means
+        line_directions[start : start + chunk_size] = np.linalg.eigh(scatter)[1][:, :, -1]
+
+    return line_means, line_directions, num_points
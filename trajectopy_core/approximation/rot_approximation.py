@@ -9,7 +9,6 @@ import logging
 
 import numpy as np
 
-from trajectopy_core.rotationset import RotationSet
 from trajectopy_core.utils import rndodd
 
 # logger configuration
@@ -32,7 +31,7 @@ def rot_average_window(function_of: np.ndarray, quat: np.ndarray, win_size: floa
         function_of (np.ndarray): The time / arc lengths describing the
                                   "location" of the given rotations either
                                   in time or in trajectory length.
-        quat (np.ndarray): _description_
+        quat (np.ndarray): Quaternions [n x 4] that should be averaged.
         win_size (float, optional): Window size used for rotation averaging
                                     in meters. Defaults to 0.15.
 
@@ -51,12 +50,24 @@ def rot_average_window(function_of: np.ndarray, quat: np.ndarray, win_size: floa
         )
         return quat
 
-    quat_mean = np.zeros((len(function_of), 4))
     num_rotations = len(quat)
-    for i in range(num_rotations):
-        window_start_index = max(0, i - ext)
-        window_end_index = min(num_rotations - 1, i + ext)
-        quat_i = quat[window_start_index:window_end_index, :]
-        # compute mean
-        quat_mean[i, :] = RotationSet.from_quat(quat_i).mean().as_quat()
+    indices = np.arange(num_rotations)
+    window_start_indices = np.maximum(0, indices - ext)
+    window_end_indices = np.minimum(num_rotations - 1, indices + ext)
+
+    # the chordal L2 mean is the eigenvector corresponding to the largest
+    # eigenvalue of the sum of the outer products of the quaternions.
+    # The window sums of the 10 unique components are computed using prefix sums.
+    quat = quat / np.linalg.norm(quat, axis=1)[:, None]
+    rows, cols = np.triu_indices(4)
+    prefix_sums = np.r_[np.zeros((1, len(rows))), np.cumsum(quat[:, rows] * quat[:, cols], axis=0)]
+    window_sums = prefix_sums[window_end_indices] - prefix_sums[window_start_indices]
+
+    outer_product_sums = np.zeros((num_rotations, 4, 4))
+    outer_product_sums[:, rows, cols] = window_sums
+    outer_product_sums[:, cols, rows] = window_sums
+    quat_mean = np.linalg.eigh(outer_product_sums)[1][:, :, -1]
+
+    # q and -q describe the same rotation, keep the sign of the input quaternions
+    quat_mean[np.sum(quat_mean * quat, axis=1) < 0] *= -1
     return quat_mean
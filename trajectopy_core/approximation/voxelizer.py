@@ -19,7 +19,7 @@ class Voxel:
     Attributes:
         id (int): The unique identifier of the voxel.
         size (float): The size of the voxel.
-        points (list): A list of points contained within the voxel.
+        points (np.ndarray): The points contained within the voxel.
 
     Properties:
         mean_point (np.ndarray): The mean point of the voxel.
@@ -27,9 +27,9 @@ class Voxel:
         to_numpy (np.ndarray): The points contained within the voxel as a numpy array.
     """
 
-    id: str
+    id: int
     size: float
-    points: list
+    points: np.ndarray
 
     @property
     def mean_point(self) -> np.ndarray:
@@ -47,58 +47,76 @@ class Voxel:
 class Voxelizer:
     """A class for voxelizing point clouds.
 
+    Each voxel is identified by an integer id that is derived from its
+    grid indices. The points are stored sorted by voxel, i.e. the points
+    of the i-th voxel are points[offsets[i]:offsets[i + 1]].
+
     Attributes:
-        voxels (dict[str, Voxel]): A dictionary containing voxels, each with a unique id.
+        voxel_size (float): The size of the voxels.
+        voxel_ids (np.ndarray): The sorted unique ids of all occupied voxels.
+        points (np.ndarray): The points sorted by voxel.
+        offsets (np.ndarray): The start index of each voxel in points (and the total number of points).
+        mean_points (np.ndarray): The mean points of all voxels.
         kd_tree (scipy.spatial.KDTree): A KDTree containing the mean points of each voxel.
 
     Methods:
-        ball_query(xyz: np.ndarray, r: float) -> list[frozenset[str]]: Performs a kd-ball-query within the voxels.
+        ball_query(xyz: np.ndarray, r: float) -> list[frozenset[int]]: Performs a kd-ball-query within the voxels.
         index_to_id(index: int) -> int: Returns the id of the voxel at the given index.
     """
 
     def __init__(self, xyz: np.ndarray, voxel_size: float = 0.05) -> None:
-        self.voxels = self._create_voxels(xyz, voxel_size)
+        self.voxel_size = voxel_size
+        self._create_voxels(xyz, voxel_size)
         self.kd_tree = KDTree(self.mean_points)
 
-    def _create_voxels(self, xyz: np.ndarray, voxel_size: float) -> Dict[str, Voxel]:
+    def _create_voxels(self, xyz: np.ndarray, voxel_size: float) -> None:
         """Divides points into voxels of size voxel_size
 
         Args:
             xyz (np.ndarray): nx3 positions
             voxel_size (float): grid size
-
-        Returns:
-            dict[str, Voxel]: dictionary containing voxels, each with an unique id
         """
-        grid_x = np.arange(min(xyz[:, 0]), max(xyz[:, 0]) + voxel_size, voxel_size)
-        grid_y = np.arange(min(xyz[:, 1]), max(xyz[:, 1]) + voxel_size, voxel_size)
-        grid_z = np.arange(min(xyz[:, 2]), max(xyz[:, 2]) + voxel_size, voxel_size)
-
-        x_bin_ids = np.searchsorted(grid_x, xyz[:, 0])
-        y_bin_ids = np.searchsorted(grid_y, xyz[:, 1])
-        z_bin_ids = np.searchsorted(grid_z, xyz[:, 2])
-
-        voxels: Dict[str, Voxel] = {}
-        for i, (x_id, y_id, z_id) in enumerate(zip(x_bin_ids, y_bin_ids, z_bin_ids)):
-            voxel_id = f"{x_id}{y_id}{z_id}"
-            if voxel_id not in voxels:
-                voxels[voxel_id] = Voxel(id=voxel_id, size=voxel_size, points=[])
-            voxels[voxel_id].points.append(xyz[i, :])
-
-        return voxels
+        grid_ids = np.column_stack(
+            [
+                np.searchsorted(np.arange(min(xyz[:, i]), max(xyz[:, i]) + voxel_size, voxel_size), xyz[:, i])
+                for i in range(3)
+            ]
+        )
+        grid_shape = np.max(grid_ids, axis=0) + 1
+
+        if np.prod(grid_shape.astype(float)) < np.iinfo(np.int64).max:
+            linear_ids = np.ravel_multi_index(grid_ids.T, grid_shape)
+            self.voxel_ids, voxel_index, counts = np.unique(linear_ids, return_inverse=True, return_counts=True)
+        else:
+            # grid too large for linear indices, use the grid indices directly
+            _, voxel_index, counts = np.unique(grid_ids, axis=0, return_inverse=True, return_counts=True)
+            self.voxel_ids = np.arange(len(counts))
+
+        voxel_index = np.ravel(voxel_index)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.points = xyz[np.argsort(voxel_index, kind="stable")]
+        self.mean_points = np.column_stack(
+            [np.bincount(voxel_index, weights=xyz[:, i], minlength=len(counts)) / counts for i in range(3)]
+        )
 
     @property
-    def mean_points(self) -> np.ndarray:
-        return np.array([voxel.mean_point for _, voxel in self.voxels.items()])
+    def num_voxels(self) -> int:
+        return len(self.voxel_ids)
 
     @cached_property
-    def voxel_ids(self) -> List[str]:
-        return [voxel.id for _, voxel in self.voxels.items()]
+    def voxels(self) -> Dict[int, Voxel]:
+        return {
+            int(voxel_id): Voxel(id=int(voxel_id), size=self.voxel_size, points=self.points_from_index(index))
+            for index, voxel_id in enumerate(self.voxel_ids)
+        }
+
+    def index_to_id(self, index: int) -> int:
+        return int(self.voxel_ids[index])
 
-    def index_to_id(self, index: int) -> str:
-        return self.voxel_ids[index]
+    def points_from_index(self, index: int) -> np.ndarray:
+        return self.points[self.offsets[index] : self.offsets[index + 1]]
 
-    def ball_query(self, xyz: np.ndarray, r: float) -> List[FrozenSet[str]]:
+    def ball_query(self, xyz: np.ndarray, r: float) -> List[FrozenSet[int]]:
         """Performs a kd-ball-query within the voxels
 
         Returns a list of frozensets containing the
@@ -109,12 +127,12 @@ class Voxelizer:
             r (float): radius in [m]
 
         Returns:
-            list[frozenset[str]]: list of frozensets containing voxel ids.
+            list[frozenset[int]]: list of frozensets containing voxel ids.
         """
         neighbor_voxels = self.kd_tree.query_ball_point(xyz, r=r)
-        return [frozenset(self.index_to_id(index) for index in voxel_list) for voxel_list in neighbor_voxels]
+        return [frozenset(self.voxel_ids[voxel_list].tolist()) for voxel_list in neighbor_voxels]
 
-    def k_nearest_query(self, xyz: np.ndarray, k_nearest: int) -> List[FrozenSet[str]]:
+    def k_nearest_query(self, xyz: np.ndarray, k_nearest: int) -> List[FrozenSet[int]]:
         """Performs a k-nearest-query within the voxels
 
         Returns a list of frozensets containing the
@@ -125,14 +143,35 @@ class Voxelizer:
             k_nearest (int): k-nearest neighbors
 
         Returns:
-            list[frozenset[str]]: list of frozensets containing voxel ids.
+            list[frozenset[int]]: list of frozensets containing voxel ids.
         """
-        _, neighbor_voxels = self.kd_tree.query(xyz, k=k_nearest)
-        return [frozenset(self.index_to_id(index) for index in voxel_list) for voxel_list in neighbor_voxels]
-
-    def points_from_voxel_set(self, voxel_set: FrozenSet[str]) -> np.ndarray:
-        return (
-            np.row_stack([self.voxels[voxel].points for voxel in voxel_set])
-            if voxel_set
-            else np.array([], dtype=float)
-        )
+        _, neighbor_voxels = self.kd_tree.query(xyz, k=[k_nearest] if k_nearest == 1 else k_nearest)
+        return [
+            frozenset(self.voxel_ids[voxel_list[voxel_list < self.num_voxels]].tolist())
+            for voxel_list in neighbor_voxels
+        ]
+
+    def k_nearest_indices(self, xyz: np.ndarray, k_nearest: int) -> np.ndarray:
+        """Performs a k-nearest-query within the voxels
+
+        In contrast to k_nearest_query, the indices of the neighboring
+        voxels are returned as array. The indices of each row are sorted
+        so that identical neighborhoods result in identical rows.
+
+        Args:
+            xyz (np.ndarray): query positions
+            k_nearest (int): k-nearest neighbors, limited to the number of voxels
+
+        Returns:
+            np.ndarray: sorted voxel indices [n x k]
+        """
+        k_nearest = min(k_nearest, self.num_voxels)
+        _, neighbor_voxels = self.kd_tree.query(xyz, k=[k_nearest] if k_nearest == 1 else k_nearest)
+        return np.sort(neighbor_voxels, axis=1)
+
+    def points_from_voxel_set(self, voxel_set: FrozenSet[int]) -> np.ndarray:
+        if not voxel_set:
+            return np.array([], dtype=float)
+
+        indices = np.searchsorted(self.voxel_ids, np.fromiter(voxel_set, dtype=self.voxel_ids.dtype))
+        return np.row_stack([self.points_from_index(index) for index in indices])
@@ -5,6 +5,7 @@ Gereon Tombrink, 2023
 mail@gtombrink.de
 """
 
+from dataclasses import dataclass, fields
 from functools import cached_property
 from typing import Dict, List
 
@@ -13,38 +14,70 @@ import pandas as pd
 from pointset import PointSet
 
 from trajectopy_core.evaluation.deviations import AbsoluteTrajectoryDeviations
-from trajectopy_core.evaluation.utils import rms
 from trajectopy_core.input_output.header import HeaderData
 from trajectopy_core.rotationset import RotationSet
 from trajectopy_core.trajectory import Trajectory
+from trajectopy_core.utils import read_only
 
+CACHED_PROPERTIES = ("metrics", "pos_dev_comb", "rot_dev_comb", "rot_dev_xyz", "rot_bias_xyz")
 
-class ATEResult:
+
+@dataclass(frozen=True)
+class ATEMetrics:
     """
-    This class represents a set of absolute trajectory deviations
+    Summary statistics of absolute trajectory deviations
 
-    Absolute trajectory deviations describe absolute pose deviations between
-    two trajectories. The deviations are calculated by comparing pairs of
-    positions and orientations in the test and reference trajectory.
+    Position statistics are given in meters, rotation statistics in radians.
+    Rotation statistics are zero if no orientations are available.
     """
 
-    def __init__(
-        self,
-        trajectory: Trajectory,
-        abs_dev: AbsoluteTrajectoryDeviations,
-        name: str = "",
-    ) -> None:
-        self.name = name or trajectory.name
-        self.trajectory = trajectory
-        self.abs_dev = abs_dev
+    name: str
+    num_deviations: int
+    rotations_used: bool
+    has_orientation: bool
+    pos_dev_max: float
+    pos_ate: float
+    pos_dev_median: float
+    pos_dev_min: float
+    pos_dev_rms: float
+    pos_dev_std: float
+    pos_bias_x: float
+    pos_bias_y: float
+    pos_bias_z: float
+    pos_rms_x: float
+    pos_rms_y: float
+    pos_rms_z: float
+    pos_bias_along: float
+    pos_bias_cross_h: float
+    pos_bias_cross_v: float
+    pos_rms_along: float
+    pos_rms_cross_h: float
+    pos_rms_cross_v: float
+    rot_dev_max: float
+    rot_ate: float
+    rot_dev_median: float
+    rot_dev_min: float
+    rot_dev_rms: float
+    rot_dev_std: float
+    rot_rms_x: float
+    rot_rms_y: float
+    rot_rms_z: float
+    rot_bias_x: float
+    rot_bias_y: float
+    rot_bias_z: float
+
+    @classmethod
+    def statistics(cls) -> List[str]:
+        """Returns the names of all statistics"""
+        return [field.name for field in fields(cls) if field.type is float]
 
     @property
     def property_dict(self) -> Dict[str, str]:
         return {
             "Name": self.name,
-            "Type": self.__class__.__name__,
-            "Number of deviations": str(len(self.abs_dev.pos_dev)),
-            "Deviation directions derived using": "Rotations" if self.abs_dev.rotations_used else "Positions / Unkown",
+            "Type": "ATEResult",
+            "Number of deviations": str(self.num_deviations),
+            "Deviation directions derived using": "Rotations" if self.rotations_used else "Positions / Unkown",
             "Maximum position deviation [m]": f"{self.pos_dev_max:.4f}",
             "Mean position deviation [m]": f"{self.pos_ate:.4f}",
             "Median position deviation [m]": f"{self.pos_dev_median:.4f}",
@@ -63,28 +96,123 @@ class ATEResult:
             "RMS Along-Track [m]": f"{self.pos_rms_along:.4f}",
             "RMS Horizontal Cross-Track [m]": f"{self.pos_rms_cross_h:.4f}",
             "RMS Vertical Cross-Track [m]": f"{self.pos_rms_cross_v:.4f}",
-            "Maximum rotation deviation [°]": (
-                f"{np.rad2deg(self.rot_dev_max):.4f}" if self.abs_dev.rot_dev is not None else "-"
-            ),
-            "Mean rotation deviation [°]": (
-                f"{np.rad2deg(self.rot_ate):.4f}" if self.abs_dev.rot_dev is not None else "-"
-            ),
+            "Maximum rotation deviation [°]": (f"{np.rad2deg(self.rot_dev_max):.4f}" if self.has_orientation else "-"),
+            "Mean rotation deviation [°]": (f"{np.rad2deg(self.rot_ate):.4f}" if self.has_orientation else "-"),
             "Median rotation deviation [°]": (
-                f"{np.rad2deg(self.rot_dev_median):.4f}" if self.abs_dev.rot_dev is not None else "-"
-            ),
-            "Minimum rotation deviation [°]": (
-                f"{np.rad2deg(self.rot_dev_min):.4f}" if self.abs_dev.rot_dev is not None else "-"
+                f"{np.rad2deg(self.rot_dev_median):.4f}" if self.has_orientation else "-"
             ),
-            "RMS Rotation [°]": f"{np.rad2deg(self.rot_dev_rms):.4f}" if self.abs_dev.rot_dev is not None else "-",
-            "STD Rotation [°]": f"{np.rad2deg(self.rot_dev_std):.4f}" if self.abs_dev.rot_dev is not None else "-",
-            "RMS Roll [°]": f"{np.rad2deg(self.rot_rms_x):.4f}" if self.abs_dev.rot_dev is not None else "-",
-            "RMS Pitch [°]": f"{np.rad2deg(self.rot_rms_y):.4f}" if self.abs_dev.rot_dev is not None else "-",
-            "RMS Yaw [°]": f"{np.rad2deg(self.rot_rms_z):.4f}" if self.abs_dev.rot_dev is not None else "-",
-            "Bias Roll [°]": f"{np.rad2deg(self.rot_bias_x):.4f}" if self.abs_dev.rot_dev is not None else "-",
-            "Bias Pitch [°]": f"{np.rad2deg(self.rot_bias_y):.4f}" if self.abs_dev.rot_dev is not None else "-",
-            "Bias Yaw [°]": f"{np.rad2deg(self.rot_bias_z):.4f}" if self.abs_dev.rot_dev is not None else "-",
+            "Minimum rotation deviation [°]": (f"{np.rad2deg(self.rot_dev_min):.4f}" if self.has_orientation else "-"),
+            "RMS Rotation [°]": f"{np.rad2deg(self.rot_dev_rms):.4f}" if self.has_orientation else "-",
+            "STD Rotation [°]": f"{np.rad2deg(self.rot_dev_std):.4f}" if self.has_orientation else "-",
+            "RMS Roll [°]": f"{np.rad2deg(self.rot_rms_x):.4f}" if self.has_orientation else "-",
+            "RMS Pitch [°]": f"{np.rad2deg(self.rot_rms_y):.4f}" if self.has_orientation else "-",
+            "RMS Yaw [°]": f"{np.rad2deg(self.rot_rms_z):.4f}" if self.has_orientation else "-",
+            "Bias Roll [°]": f"{np.rad2deg(self.rot_bias_x):.4f}" if self.has_orientation else "-",
+            "Bias Pitch [°]": f"{np.rad2deg(self.rot_bias_y):.4f}" if self.has_orientation else "-",
+            "Bias Yaw [°]": f"{np.rad2deg(self.rot_bias_z):.4f}" if self.has_orientation else "-",
         }
 
+
+class ATEResult:
+    """
+    This class represents a set of absolute trajectory deviations
+
+    Absolute trajectory deviations describe absolute pose deviations between
+    two trajectories. The deviations are calculated by comparing pairs of
+    positions and orientations in the test and reference trajectory.
+    """
+
+    def __init__(
+        self,
+        trajectory: Trajectory,
+        abs_dev: AbsoluteTrajectoryDeviations,
+        name: str = "",
+    ) -> None:
+        self.name = name or trajectory.name
+        self.trajectory = trajectory
+        self.abs_dev = abs_dev
+
+    @property
+    def abs_dev(self) -> AbsoluteTrajectoryDeviations:
+        return self._abs_dev
+
+    @abs_dev.setter
+    def abs_dev(self, abs_dev: AbsoluteTrajectoryDeviations) -> None:
+        self._abs_dev = abs_dev
+        self._invalidate_cache()
+
+    def _invalidate_cache(self) -> None:
+        """Removes the cached quantities that depend on the deviations"""
+        for name in CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
+
+    @cached_property
+    def metrics(self) -> ATEMetrics:
+        """
+        Returns the summary statistics of the deviations
+
+        All statistics are computed at once and cached until the
+        deviations are replaced.
+        """
+        pos_dev = self.abs_dev.pos_dev
+        directed_pos_dev = self.abs_dev.directed_pos_dev
+        pos_dev_comb = self.pos_dev_comb
+
+        pos_bias = np.mean(pos_dev, axis=0)
+        pos_rms = np.sqrt(np.mean(pos_dev**2, axis=0))
+        directed_pos_bias = np.mean(directed_pos_dev, axis=0)
+        directed_pos_rms = np.sqrt(np.mean(directed_pos_dev**2, axis=0))
+
+        if self.has_orientation:
+            rot_dev_comb = self.rot_dev_comb
+            rot_rms = np.sqrt(np.mean(self.rot_dev_xyz**2, axis=0))
+            rot_statistics = {
+                "rot_dev_max": float(np.max(rot_dev_comb)),
+                "rot_ate": float(np.mean(rot_dev_comb)),
+                "rot_dev_median": float(np.median(rot_dev_comb)),
+                "rot_dev_min": float(np.min(rot_dev_comb)),
+                "rot_dev_rms": float(np.sqrt(np.mean(rot_dev_comb**2))),
+                "rot_dev_std": float(np.std(rot_dev_comb)),
+                "rot_rms_x": float(rot_rms[0]),
+                "rot_rms_y": float(rot_rms[1]),
+                "rot_rms_z": float(rot_rms[2]),
+                "rot_bias_x": float(self.rot_bias_xyz[0]),
+                "rot_bias_y": float(self.rot_bias_xyz[1]),
+                "rot_bias_z": float(self.rot_bias_xyz[2]),
+            }
+        else:
+            rot_statistics = {statistic: 0.0 for statistic in ATEMetrics.statistics() if statistic.startswith("rot_")}
+
+        return ATEMetrics(
+            name=self.name,
+            num_deviations=len(pos_dev),
+            rotations_used=self.abs_dev.rotations_used,
+            has_orientation=self.has_orientation,
+            pos_dev_max=float(np.max(pos_dev_comb)),
+            pos_ate=float(np.mean(pos_dev_comb)),
+            pos_dev_median=float(np.median(pos_dev_comb)),
+            pos_dev_min=float(np.min(pos_dev_comb)),
+            pos_dev_rms=float(np.sqrt(np.mean(pos_dev_comb**2))),
+            pos_dev_std=float(np.std(pos_dev_comb)),
+            pos_bias_x=float(pos_bias[0]),
+            pos_bias_y=float(pos_bias[1]),
+            pos_bias_z=float(pos_bias[2]),
+            pos_rms_x=float(pos_rms[0]),
+            pos_rms_y=float(pos_rms[1]),
+            pos_rms_z=float(pos_rms[2]),
+            pos_bias_along=float(directed_pos_bias[0]),
+            pos_bias_cross_h=float(directed_pos_bias[1]),
+            pos_bias_cross_v=float(directed_pos_bias[2]),
+            pos_rms_along=float(directed_pos_rms[0]),
+            pos_rms_cross_h=float(directed_pos_rms[1]),
+            pos_rms_cross_v=float(directed_pos_rms[2]),
+            **rot_statistics,
+        )
+
+    @property
+    def property_dict(self) -> Dict[str, str]:
+        return self.metrics.property_dict
+
     @property
     def has_orientation(self) -> bool:
         """
@@ -110,32 +238,32 @@ class ATEResult:
     @property
     def pos_bias_x(self) -> float:
         """Returns x bias"""
-        return np.mean(self.pos_dev_x)
+        return self.metrics.pos_bias_x
 
     @property
     def pos_bias_y(self) -> float:
         """Returns y bias"""
-        return np.mean(self.pos_dev_y)
+        return self.metrics.pos_bias_y
 
     @property
     def pos_bias_z(self) -> float:
         """Returns z bias"""
-        return np.mean(self.pos_dev_z)
+        return self.metrics.pos_bias_z
 
     @property
     def pos_bias_cross_h(self) -> float:
         """Returns horizontal cross track bias"""
-        return np.mean(self.pos_dev_cross_h)
+        return self.metrics.pos_bias_cross_h
 
     @property
     def pos_bias_cross_v(self) -> float:
         """Returns vertical cross track bias"""
-        return np.mean(self.pos_dev_cross_v)
+        return self.metrics.pos_bias_cross_v
 
     @property
     def pos_bias_along(self) -> float:
         """Returns along track bias"""
-        return np.mean(self.pos_dev_along)
+        return self.metrics.pos_bias_along
 
     @property
     def rot_dev_x(self) -> np.ndarray:
@@ -155,22 +283,24 @@ class ATEResult:
     @cached_property
     def rot_bias_xyz(self) -> np.ndarray:
         """Returns roll, pitch and yaw bias"""
-        return self.abs_dev.rot_dev.mean().as_euler(seq="xyz") if self.abs_dev.rot_dev is not None else np.zeros(3)
+        return read_only(
+            self.abs_dev.rot_dev.mean().as_euler(seq="xyz") if self.abs_dev.rot_dev is not None else np.zeros(3)
+        )
 
     @property
-    def rot_bias_x(self) -> np.ndarray:
+    def rot_bias_x(self) -> float:
         """Returns roll bias"""
-        return self.rot_bias_xyz[0]
+        return self.metrics.rot_bias_x
 
     @property
-    def rot_bias_y(self) -> np.ndarray:
+    def rot_bias_y(self) -> float:
         """Returns pitch bias"""
-        return self.rot_bias_xyz[1]
+        return self.metrics.rot_bias_y
 
     @property
-    def rot_bias_z(self) -> np.ndarray:
+    def rot_bias_z(self) -> float:
         """Returns yaw bias"""
-        return self.rot_bias_xyz[2]
+        return self.metrics.rot_bias_z
 
     @property
     def pos_dev_along(self) -> np.ndarray:
@@ -198,25 +328,25 @@ class ATEResult:
         """
         Returns rpy deviations
         """
-        return (
+        return read_only(
             self.abs_dev.rot_dev.as_euler(seq="xyz")
             if self.abs_dev.rot_dev is not None
             else np.zeros_like(self.abs_dev.pos_dev)
         )
 
-    @property
+    @cached_property
     def pos_dev_comb(self) -> np.ndarray:
         """
         Returns position deviations combined using the L2 norm
         """
-        return np.linalg.norm(self.abs_dev.pos_dev, axis=1)
+        return read_only(np.linalg.norm(self.abs_dev.pos_dev, axis=1))
 
-    @property
+    @cached_property
     def rot_dev_comb(self) -> np.ndarray:
         """
         Returns rotation deviations as single rotation angles
         """
-        return (
+        return read_only(
             self.abs_dev.rot_dev.rotangle if self.abs_dev.rot_dev is not None else np.zeros_like(self.abs_dev.pos_dev)
         )
 
@@ -225,147 +355,147 @@ class ATEResult:
         """
         Returns RMS of 3d positions
         """
-        return rms(self.pos_dev_comb)
+        return self.metrics.pos_dev_rms
 
     @property
     def pos_ate(self) -> float:
         """
         Returns mean of 3d position deviations
         """
-        return np.mean(self.pos_dev_comb)
+        return self.metrics.pos_ate
 
     @property
     def pos_dev_max(self) -> float:
         """
         Returns max of 3d position deviations
         """
-        return np.max(self.pos_dev_comb)
+        return self.metrics.pos_dev_max
 
     @property
     def pos_dev_min(self) -> float:
         """
         Returns min of 3d position deviations
         """
-        return np.min(self.pos_dev_comb)
+        return self.metrics.pos_dev_min
 
     @property
     def pos_dev_median(self) -> float:
         """
         Returns min of 3d position deviations
         """
-        return np.median(self.pos_dev_comb)
+        return self.metrics.pos_dev_median
 
     @property
     def pos_dev_std(self) -> float:
         """
         Returns std of 3d position deviations
         """
-        return np.std(self.pos_dev_comb)
+        return self.metrics.pos_dev_std
 
     @property
     def rot_dev_rms(self) -> float:
         """
         Returns RMS of rotations
         """
-        return rms(self.rot_dev_comb) if self.abs_dev.rot_dev is not None else 0.0
+        return self.metrics.rot_dev_rms
 
     @property
     def rot_dev_std(self) -> float:
         """
         Returns STD of rotations
         """
-        return float(np.std(self.rot_dev_comb))
+        return self.metrics.rot_dev_std
 
     @property
     def rot_ate(self) -> float:
         """
         Returns mean of rotation deviations
         """
-        return float(np.mean(self.rot_dev_comb))
+        return self.metrics.rot_ate
 
     @property
     def rot_dev_median(self) -> float:
         """
         Returns median of rotations
         """
-        return float(np.median(self.rot_dev_comb))
+        return self.metrics.rot_dev_median
 
     @property
     def rot_dev_min(self) -> float:
         """
         Returns min of rotations
         """
-        return np.min(self.rot_dev_comb)
+        return self.metrics.rot_dev_min
 
     @property
     def rot_dev_max(self) -> float:
         """
         Returns max of rotations
         """
-        return np.max(self.rot_dev_comb)
+        return self.metrics.rot_dev_max
 
     @property
     def pos_rms_along(self) -> float:
         """
         Returns RMS of along track deviations
         """
-        return rms(self.pos_dev_along)
+        return self.metrics.pos_rms_along
 
     @property
     def pos_rms_cross_h(self) -> float:
         """
         Returns RMS of horizontal cross track deviations
         """
-        return rms(self.pos_dev_cross_h)
+        return self.metrics.pos_rms_cross_h
 
     @property
     def pos_rms_cross_v(self) -> float:
         """
         Returns RMS of vertical cross track deviations
         """
-        return rms(self.pos_dev_cross_v)
+        return self.metrics.pos_rms_cross_v
 
     @property
     def pos_rms_x(self) -> float:
         """
         Returns RMS of x deviations
         """
-        return rms(self.pos_dev_x)
+        return self.metrics.pos_rms_x
 
     @property
     def pos_rms_y(self) -> float:
         """
         Returns RMS of y deviations
         """
-        return rms(self.pos_dev_y)
+        return self.metrics.pos_rms_y
 
     @property
     def pos_rms_z(self) -> float:
         """
         Returns RMS of z deviations
         """
-        return rms(self.pos_dev_z)
+        return self.metrics.pos_rms_z
 
     @property
     def rot_rms_x(self) -> float:
         """
         Returns RMS of roll deviations
         """
-        return rms(self.rot_dev_x)
+        return self.metrics.rot_rms_x
 
     @property
     def rot_rms_y(self) -> float:
         """
         Returns RMS of pitch deviations
         """
-        return rms(self.rot_dev_y)
+        return self.metrics.rot_rms_y
 
     @property
     def rot_rms_z(self) -> float:
         """
         Returns RMS of yaw deviations
         """
-        return rms(self.rot_dev_z)
+        return self.metrics.rot_rms_z
 
     @property
     def columns(self) -> List[str]:
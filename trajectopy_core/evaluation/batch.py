@@ -0,0 +1,171 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+"""
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from trajectopy_core.alignment.result import AlignmentResult
+from trajectopy_core.evaluation.ate_result import ATEResult
+from trajectopy_core.evaluation.metrics import ate, rpe
+from trajectopy_core.evaluation.rpe_result import RPEResult
+from trajectopy_core.input_output.header import HeaderData
+from trajectopy_core.settings.processing import ProcessingSettings
+from trajectopy_core.trajectory import Trajectory
+
+logger = logging.getLogger("root")
+
+# number of estimates submitted per worker before waiting for results
+TASKS_PER_WORKER = 2
+
+# ground truth of the worker process, attached to shared memory by _init_worker
+_worker_gt: Optional[Trajectory] = None
+_worker_memory: Optional[SharedMemory] = None
+
+
+@dataclass
+class BatchEvaluationResult:
+    """Result of the evaluation of one estimate of a batch
+
+    Attributes:
+        index (int): Position of the estimate in the batch
+        ate_result (ATEResult): Absolute trajectory error of the aligned estimate
+        alignment (AlignmentResult): Alignment of the estimate onto the ground truth
+        rpe_result (Optional[RPEResult]): Relative pose error, None if not computed
+    """
+
+    index: int
+    ate_result: ATEResult
+    alignment: AlignmentResult
+    rpe_result: Optional[RPEResult] = None
+
+
+def iter_evaluate_batch(
+    trajectory_gt: Trajectory,
+    estimates: Iterable[Union[Trajectory, str]],
+    settings: ProcessingSettings = ProcessingSettings(),
+    compute_rpe: bool = True,
+    max_workers: Optional[int] = None,
+) -> Iterator[BatchEvaluationResult]:
+    """Evaluates many estimated trajectories against one ground truth in parallel
+
+    Each estimate is evaluated in a separate process like using
+    evaluation.ate (with alignment) and evaluation.rpe on copies of
+    both trajectories, i.e. the inputs are not modified. The ground
+    truth is written to shared memory once and attached by every
+    worker instead of being pickled for each estimate. Estimates given
+    as file paths are read by the workers.
+
+    Args:
+        trajectory_gt (Trajectory): Ground truth trajectory
+        estimates (Iterable[Union[Trajectory, str]]): Estimated trajectories or paths to trajectory files
+        settings (ProcessingSettings, optional): Processing settings
+        compute_rpe (bool, optional): If False, only the ATE is computed. Defaults to True.
+        max_workers (Optional[int], optional): Number of worker processes. Defaults to the number of CPUs.
+
+    Yields:
+        BatchEvaluationResult: Results in the order of completion
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    header_data, gt_data = trajectory_gt._to_data()
+
+    memory = SharedMemory(create=True, size=max(gt_data.nbytes, 1))
+    try:
+        np.ndarray(gt_data.shape, dtype=float, buffer=memory.buf)[:] = gt_data
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(memory.name, header_data.data, gt_data.shape),
+        ) as executor:
+            pending: Dict[Future, int] = {}
+            for index, estimate in enumerate(estimates):
+                if len(pending) >= TASKS_PER_WORKER * max_workers:
+                    yield from _collect_completed(pending)
+
+                pending[executor.submit(_evaluate, index, estimate, settings, compute_rpe)] = index
+
+            while pending:
+                yield from _collect_completed(pending)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def evaluate_batch(
+    trajectory_gt: Trajectory,
+    estimates: Iterable[Union[Trajectory, str]],
+    settings: ProcessingSettings = ProcessingSettings(),
+    compute_rpe: bool = True,
+    max_workers: Optional[int] = None,
+) -> Tuple[List[ATEResult], List[RPEResult]]:
+    """Evaluates many estimated trajectories against one ground truth in parallel
+
+    See iter_evaluate_batch. The results are returned in the order of
+    the estimates and can be passed to report.multi.render_multi_report.
+
+    Args:
+        trajectory_gt (Trajectory): Ground truth trajectory
+        estimates (Iterable[Union[Trajectory, str]]): Estimated trajectories or paths to trajectory files
+        settings (ProcessingSettings, optional): Processing settings
+        compute_rpe (bool, optional): If False, only the ATE is computed. Defaults to True.
+        max_workers (Optional[int], optional): Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        Tuple[List[ATEResult], List[RPEResult]]: ATE and RPE results, the latter is empty
+                                                 if compute_rpe is False
+    """
+    results = sorted(
+        iter_evaluate_batch(
+            trajectory_gt=trajectory_gt,
+            estimates=estimates,
+            settings=settings,
+            compute_rpe=compute_rpe,
+            max_workers=max_workers,
+        ),
+        key=lambda result: result.index,
+    )
+    return [result.ate_result for result in results], [
+        result.rpe_result for result in results if result.rpe_result is not None
+    ]
+
+
+def _collect_completed(pending: Dict[Future, int]) -> Iterator[BatchEvaluationResult]:
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        index = pending.pop(future)
+        result = future.result()
+        logger.info("Evaluated estimate %i (%s)", index, result.ate_result.name)
+        yield result
+
+
+def _init_worker(memory_name: str, header: dict, shape: Tuple[int, int]) -> None:
+    """Attaches the ground truth in shared memory to the worker process"""
+    global _worker_gt, _worker_memory
+    _worker_memory = SharedMemory(name=memory_name)
+    gt_data = np.ndarray(shape, dtype=float, buffer=_worker_memory.buf)
+    gt_data.flags.writeable = False
+    _worker_gt = Trajectory._from_data(header_data=HeaderData(header), trajectory_data=gt_data)
+
+
+def _evaluate(
+    index: int, estimate: Union[Trajectory, str], settings: ProcessingSettings, compute_rpe: bool
+) -> BatchEvaluationResult:
+    traj_est = Trajectory.from_file(estimate) if isinstance(estimate, str) else estimate
+
+    ate_result, alignment = ate(
+        trajectory_gt=_worker_gt.copy(), trajectory_est=traj_est.copy(), settings=settings, return_alignment=True
+    )
+    rpe_result = (
+        rpe(trajectory_gt=_worker_gt.copy(), trajectory_est=traj_est, settings=settings) if compute_rpe else None
+    )
+
+    return BatchEvaluationResult(index=index, ate_result=ate_result, alignment=alignment, rpe_result=rpe_result)
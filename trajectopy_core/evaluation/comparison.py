@@ -5,7 +5,7 @@ Gereon Tombrink, 2023
 mail@gtombrink.de
 """
 import logging
-from typing import Dict, List, Tuple, Union
+from typing import List, Tuple, Union
 
 import numpy as np
 
@@ -13,13 +13,16 @@ from trajectopy_core.definitions import Unit
 from trajectopy_core.evaluation.ate_result import ATEResult
 from trajectopy_core.evaluation.deviations import AbsoluteTrajectoryDeviations, RelativeTrajectoryDeviations
 from trajectopy_core.evaluation.rpe_result import RPEResult
-from trajectopy_core.evaluation.utils import nearest_point
+from trajectopy_core.evaluation.utils import nearest_points
 from trajectopy_core.rotationset import RotationSet
 from trajectopy_core.settings.comparison import RelativeComparisonSettings
 from trajectopy_core.trajectory import Trajectory
 
 logger = logging.getLogger("root")
 
+# number of pose pairs evaluated at once during relative comparison
+RPE_CHUNK_SIZE = 2**18
+
 
 def compare_trajectories_absolute(*, traj_test: Trajectory, traj_ref: Trajectory) -> ATEResult:
     """
@@ -72,15 +75,12 @@ def _get_pair_indices(distances: np.ndarray, settings: RelativeComparisonSetting
 
     """
     if settings.use_all_pose_pairs:
-        dist_steps = np.array(
-            [[i, arc_length + dist] for i, arc_length in enumerate(distances) if (arc_length + dist) < distances[-1]],
-            dtype=float,
-        )
-        if len(dist_steps) == 0:
+        indices_start = np.flatnonzero(distances + dist < distances[-1])
+        if len(indices_start) == 0:
             return np.array([])
 
-        indices_end = np.searchsorted(distances, dist_steps[:, 1])
-        return np.c_[dist_steps[:, 0].astype(int), indices_end]
+        indices_end = np.searchsorted(distances, distances[indices_start] + dist)
+        return np.c_[indices_start, indices_end]
 
     dist_steps = np.arange(distances[0], distances[-1], dist)
 
@@ -91,77 +91,103 @@ def _get_pair_indices(distances: np.ndarray, settings: RelativeComparisonSetting
     return np.c_[indices[:-1], indices[1:]]
 
 
+def _pair_errors(
+    *, traj_test: Trajectory, traj_ref: Trajectory, pair_indices: np.ndarray, use_rotations: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes translation and rotation errors of all given pose pairs
+
+    The pairs are processed in chunks of RPE_CHUNK_SIZE to bound the
+    memory required by the stacked pose arrays.
+
+    Args:
+        traj_test (Trajectory): The trajectory to be tested.
+        traj_ref (Trajectory): The reference trajectory.
+        pair_indices (np.ndarray): Mx2 array of pose pair indices.
+        use_rotations (bool): If True, full SE3 pose errors are computed,
+                              otherwise only the pair distances are compared.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Translation and rotation errors (empty
+                                       if rotations are not used) of all pairs.
+    """
+    if not use_rotations:
+        ref_dist = np.linalg.norm(traj_ref.pos.xyz[pair_indices[:, 1]] - traj_ref.pos.xyz[pair_indices[:, 0]], axis=1)
+        test_dist = np.linalg.norm(
+            traj_test.pos.xyz[pair_indices[:, 1]] - traj_test.pos.xyz[pair_indices[:, 0]], axis=1
+        )
+        return np.abs(ref_dist - test_dist), np.array([])
+
+    se3_ref = traj_ref.se3
+    se3_test = traj_test.se3
+
+    t_err = np.zeros(len(pair_indices))
+    r_err = np.zeros(len(pair_indices))
+    for chunk_start in range(0, len(pair_indices), RPE_CHUNK_SIZE):
+        chunk = slice(chunk_start, chunk_start + RPE_CHUNK_SIZE)
+        idx_from, idx_to = pair_indices[chunk, 0], pair_indices[chunk, 1]
+
+        pose_delta_gt = se3_ref[idx_from].inv() @ se3_ref[idx_to]
+        pose_delta_test = se3_test[idx_from].inv() @ se3_test[idx_to]
+        pose_error = pose_delta_gt.inv() @ pose_delta_test
+
+        r_err[chunk] = rotation_error(pose_error.matrices)
+        t_err[chunk] = translation_error(pose_error.matrices)
+
+    return t_err, r_err
+
+
 def compare_trajectories_relative(
     *, traj_test: Trajectory, traj_ref: Trajectory, settings: RelativeComparisonSettings = RelativeComparisonSettings()
 ) -> RPEResult:
-    """This function compares two trajectories using the relative comparison method."""
+    """This function compares two trajectories using the relative comparison method.
+
+    The pose pairs of all pair distances are gathered first and evaluated
+    at once using stacked SE3 poses.
+    """
     logger.info("Performing relative comparison")
     if settings.pair_min_distance > settings.pair_max_distance:
         raise ValueError("Maximum pose distance must be larger than minimum pose distance")
 
+    if settings.pair_distance_unit == Unit.METER:
+        distances = traj_ref.arc_lengths
+    elif settings.pair_distance_unit == Unit.SECOND:
+        distances = traj_ref.tstamps
+    else:
+        raise ValueError(f"Unknown unit {settings.pair_distance_unit}")
+
     pair_dists = np.arange(
         settings.pair_min_distance,
         settings.pair_max_distance + settings.pair_distance_step,
         settings.pair_distance_step,
     )
 
-    pos_dev: Dict[float, List[float]] = {}
-    rot_dev: Dict[float, List[float]] = {}
-    pair_distance: Dict[float, List[float]] = {}
-
-    se3_ref = traj_ref.se3
-    se3_test = traj_test.se3
-
-    cnt = 0
+    pair_indices_list: List[np.ndarray] = []
     for pair_dist in pair_dists:
-        pos_dev[pair_dist] = []
-        rot_dev[pair_dist] = []
-        pair_distance[pair_dist] = []
-
-        if settings.pair_distance_unit == Unit.METER:
-            pair_indices = _get_pair_indices(traj_ref.arc_lengths, settings, dist=pair_dist)
-
-        elif settings.pair_distance_unit == Unit.SECOND:
-            pair_indices = _get_pair_indices(traj_ref.tstamps, settings, dist=pair_dist)
-
-        else:
-            raise ValueError(f"Unknown unit {settings.pair_distance_unit}")
+        pair_indices = _get_pair_indices(distances, settings, dist=pair_dist)
 
         if len(pair_indices) == 0:
             logger.warning("No pairs found for distance %.2f", pair_dist)
-            continue
-
-        for pair in pair_indices:
-            if settings.pair_distance_unit == Unit.METER:
-                distance = traj_ref.arc_lengths[pair[1]] - traj_ref.arc_lengths[pair[0]]
-            else:
-                distance = traj_ref.tstamps[pair[1]] - traj_ref.tstamps[pair[0]]
-
-            if traj_ref.has_orientation and traj_test.has_orientation:
-                pose_delta_gt = se3_inv(se3_ref[pair[0]]).dot(se3_ref[pair[1]])
-                pose_delta_test = se3_inv(se3_test[pair[0]]).dot(se3_test[pair[1]])
-                pose_error = se3_inv(pose_delta_gt).dot(pose_delta_test)
+            pair_indices = np.zeros((0, 2), dtype=int)
 
-                r_err = rotation_error(pose_error)
-                t_err = translation_error(pose_error)
+        pair_indices_list.append(pair_indices.astype(int))
 
-                rot_dev[pair_dist].append(r_err / distance)
-            else:
-                ref_dist = np.linalg.norm(traj_ref.pos.xyz[pair[1]] - traj_ref.pos.xyz[pair[0]])
-                test_dist = np.linalg.norm(traj_test.pos.xyz[pair[1]] - traj_test.pos.xyz[pair[0]])
-                t_err = np.abs(ref_dist - test_dist)
-
-            pos_dev[pair_dist].append(t_err / distance)
-            pair_distance[pair_dist].append(distance)
-            cnt += 1
-
-    if cnt == 0:
+    all_pair_indices = np.concatenate(pair_indices_list)
+    if len(all_pair_indices) == 0:
         raise ValueError("No pairs found")
 
+    use_rotations = traj_ref.has_orientation and traj_test.has_orientation
+    all_distances = distances[all_pair_indices[:, 1]] - distances[all_pair_indices[:, 0]]
+    all_t_err, all_r_err = _pair_errors(
+        traj_test=traj_test, traj_ref=traj_ref, pair_indices=all_pair_indices, use_rotations=use_rotations
+    )
+
     rpe_dev = RelativeTrajectoryDeviations(
-        pos_dev=pos_dev,
-        rot_dev=rot_dev,
-        pair_distance=pair_distance,
+        pos_dev=all_t_err / all_distances,
+        rot_dev=all_r_err / all_distances if use_rotations else None,
+        pair_distance=all_distances,
+        bin_distances=pair_dists,
+        offsets=np.cumsum([0] + [len(pair_indices) for pair_indices in pair_indices_list]),
         pair_distance_unit=settings.pair_distance_unit,
     )
 
@@ -171,31 +197,20 @@ def compare_trajectories_relative(
     )
 
 
-def se3_inv(pose: np.ndarray) -> np.ndarray:
-    """Invert SE3 pose"""
-    rot_inv = pose[:3, :3].transpose()
-    trans_inv = -rot_inv.dot(pose[:3, 3])
-
-    se3 = np.eye(4)
-    se3[:3, :3] = rot_inv
-    se3[:3, 3] = trans_inv
-    return se3
-
-
-def rotation_error(pose_error: np.ndarray) -> float:
+def rotation_error(pose_error: np.ndarray) -> Union[float, np.ndarray]:
     """KITTI metric port"""
-    a = pose_error[0, 0]
-    b = pose_error[1, 1]
-    c = pose_error[2, 2]
+    a = pose_error[..., 0, 0]
+    b = pose_error[..., 1, 1]
+    c = pose_error[..., 2, 2]
     d = 0.5 * (a + b + c - 1.0)
-    return np.arccos(max(min(d, 1.0), -1.0))
+    return np.arccos(np.clip(d, -1.0, 1.0))
 
 
-def translation_error(pose_error: np.ndarray) -> float:
+def translation_error(pose_error: np.ndarray) -> Union[float, np.ndarray]:
     """KITTI metric port"""
-    dx = pose_error[0, 3]
-    dy = pose_error[1, 3]
-    dz = pose_error[2, 3]
+    dx = pose_error[..., 0, 3]
+    dy = pose_error[..., 1, 3]
+    dz = pose_error[..., 2, 3]
     return np.sqrt(dx * dx + dy * dy + dz * dz)
 
 
@@ -208,31 +223,46 @@ def get_directed_deviations(
     return derive_dev_directions_with_rot(xyz_ref=xyz_ref, xyz_test=xyz_test, rot=rot)
 
 
-def derive_dev_directions_no_rot(*, xyz_ref: np.ndarray, xyz_test: np.ndarray) -> np.ndarray:
+def derive_dev_directions_no_rot(
+    *, xyz_ref: np.ndarray, xyz_test: np.ndarray, z_slope_dist: bool = False
+) -> np.ndarray:
     """
     Function that computes along-track and cross-track deviations
     between two synchronized trajectories.
 
     By constructing a 3D line between the corresponding point in xyz_ref and
     its successor (predecessor for the last point) one can determine the
-    cross- and along-track deviations for each point in xyz_test
+    cross- and along-track deviations for each point in xyz_test.
+    All epochs are processed at once.
+
+    Args:
+        xyz_ref (np.ndarray): Nx3 reference positions.
+        xyz_test (np.ndarray): Nx3 test positions.
+        z_slope_dist (bool, optional): If True, the vertical cross-track deviation
+                                       is measured perpendicular to the sloped line
+                                       instead of along the z-axis. Defaults to False.
+
+    Returns:
+        np.ndarray: Nx3 array of along-track, horizontal and vertical cross-track deviations
     """
     N = len(xyz_test)
 
-    # initialize zero arrays
-    d_along = np.zeros((N, 1))
-    d_cross_h = np.zeros((N, 1))
-    d_cross_v = np.zeros((N, 1))
+    if N == 0:
+        return np.zeros((0, 3))
 
-    for i in range(N):
-        p_curr = xyz_ref[i, :]
-        is_last = i == N - 1
+    # line from each reference point to its successor,
+    # the last line is constructed from the predecessor to the last point
+    line_start_index = np.minimum(np.arange(N), N - 2)
+    line_start = xyz_ref[line_start_index, :]
+    line_end = xyz_ref[line_start_index + 1, :]
 
-        p_next = xyz_ref[i - 1, :] if is_last else xyz_ref[i + 1, :]
-        line_pts = [p_next, p_curr] if is_last else [p_curr, p_next]
+    is_last = np.zeros(N, dtype=bool)
+    is_last[-1] = True
 
-        d_cross_h[i], d_cross_v[i] = _cross_track_dev(p=xyz_test[i, :], line_pts=line_pts)
-        d_along[i] = _along_track_dev(p=xyz_test[i, :], line_pts=line_pts, is_last=is_last)
+    d_cross_h, d_cross_v = _cross_track_dev(
+        p=xyz_test, line_start=line_start, line_end=line_end, z_slope_dist=z_slope_dist
+    )
+    d_along = _along_track_dev(p=xyz_test, line_start=line_start, line_end=line_end, is_last=is_last)
 
     return np.c_[d_along, d_cross_h, d_cross_v]
 
@@ -242,42 +272,34 @@ def derive_dev_directions_with_rot(*, xyz_ref: np.ndarray, xyz_test: np.ndarray,
     Function that computes the deviation between ref and single with
     respect to coordinate axes defined by rpy
     """
-    devs = np.zeros((len(xyz_test), 3))
-
-    rot_matrices = rot.as_matrix()
-
-    for i in range(len(xyz_ref)):
-        # transform to body system
-        devs[i, :] = (xyz_test[i, :] - xyz_ref[i, :]) @ rot_matrices[i]
-
-    return devs
+    # transform to body system
+    return np.einsum("ij,ijk->ik", xyz_test - xyz_ref, rot.as_matrix())
 
 
-def _along_track_dev(*, p: np.ndarray, line_pts: List, is_last: bool) -> float:
+def _along_track_dev(
+    *, p: np.ndarray, line_start: np.ndarray, line_end: np.ndarray, is_last: np.ndarray
+) -> np.ndarray:
     """
-    Helper function that computes the along track deviation
+    Helper function that computes the along track deviations
     """
-    a = line_pts[0]
-    b = line_pts[1]
-    p_nearest, t = nearest_point(p=p, line_pts=line_pts)
-
-    if not is_last:
-        return np.sign(t) * np.linalg.norm(p_nearest - a)
+    p_nearest, t = nearest_points(p=p, line_start=line_start, line_end=line_end)
+    dist_start = np.linalg.norm(p_nearest - line_start, axis=1)
+    dist_end = np.linalg.norm(p_nearest - line_end, axis=1)
+    line_length = np.linalg.norm(line_end - line_start, axis=1)
 
-    return float(
-        -np.linalg.norm(p_nearest - b)
-        if np.linalg.norm(b - a) > np.linalg.norm(p_nearest - a)
-        else np.linalg.norm(p_nearest - b)
-    )
+    # for the last point, the deviation is measured from the end of the line
+    d_along_last = np.where(line_length > dist_start, -dist_end, dist_end)
+    return np.where(is_last, d_along_last, np.sign(t) * dist_start)
 
 
-def _cross_track_dev(*, p: np.ndarray, line_pts: List, z_slope_dist: bool = False) -> Tuple[float, float]:
+def _cross_track_dev(
+    *, p: np.ndarray, line_start: np.ndarray, line_end: np.ndarray, z_slope_dist: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Helper function that computes the cross track deviation
+    Helper function that computes the cross track deviations
     """
-    a = line_pts[0]
-    b = line_pts[1]
-    p_nearest, _ = nearest_point(p=p, line_pts=line_pts)
+    p_nearest, _ = nearest_points(p=p, line_start=line_start, line_end=line_end)
+    line_dir = line_end - line_start
 
     # Determine the sign (left or right of the approximation).
     # It is important that the normal vector is always constructed
@@ -291,24 +313,18 @@ def _cross_track_dev(*, p: np.ndarray, line_pts: List, z_slope_dist: bool = Fals
     # to explicitly calculate the angle. The calculation of the scalar
     # product or the determination of its sign is sufficient.
 
-    n = [b[1] - a[1], -(b[0] - a[0])]
-    d = p[:2] - a[:2]
-    d_sign = -np.sign(d @ n)
+    n = np.c_[line_dir[:, 1], -line_dir[:, 0]]
+    d = p[:, :2] - line_start[:, :2]
+    d_sign = -np.sign(np.einsum("ij,ij->i", d, n))
     diff = p_nearest - p
-    d_cross_h = d_sign * np.sqrt(diff[0] ** 2 + diff[1] ** 2)
-    z_diff = diff[2]
-    if z_slope_dist:
-        angle_z = np.arctan2(b[1] - a[1], b[0] - a[0])
-        gamma = np.pi / 2 + angle_z
-        rotm = np.array(
-            [
-                [np.cos(gamma), -np.sin(gamma), 0],
-                [np.sin(gamma), np.cos(gamma), 0],
-                [0, 0, 1],
-            ]
-        )
-        diff_rot = rotm @ p - rotm @ p_nearest
-        d_cross_v = np.sign(z_diff) * np.sqrt(diff_rot[0] ** 2 + diff_rot[2] ** 2)
-    else:
-        d_cross_v = z_diff
+    d_cross_h = d_sign * np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2)
+    z_diff = diff[:, 2]
+
+    if not z_slope_dist:
+        return d_cross_h, z_diff
+
+    # rotation about the z-axis so that the x-axis is perpendicular to the line
+    gamma = np.pi / 2 + np.arctan2(line_dir[:, 1], line_dir[:, 0])
+    diff_rot_x = np.cos(gamma) * -diff[:, 0] - np.sin(gamma) * -diff[:, 1]
+    d_cross_v = np.sign(z_diff) * np.sqrt(diff_rot_x**2 + z_diff**2)
     return d_cross_h, d_cross_v
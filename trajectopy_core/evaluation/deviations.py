@@ -6,29 +6,84 @@ mail@gtombrink.de
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Union
+from typing import List, Union
 
 import numpy as np
 
 from trajectopy_core.definitions import Unit
 from trajectopy_core.rotationset import RotationSet
+from trajectopy_core.utils import read_only
 
 
-@dataclass
+@dataclass(frozen=True)
 class RelativeTrajectoryDeviations:
-    pos_dev: Dict[float, List[float]]
-    rot_dev: Dict[float, List[float]]
-    pair_distance: Dict[float, List[float]]
+    """
+    Relative deviations of pose pairs grouped into bins of pair distances
+
+    The deviations of all bins are stored in flat read-only copies of the
+    given arrays. The deviations of bin i are values[offsets[i] : offsets[i + 1]].
+
+    Attributes:
+        pos_dev (np.ndarray): Position deviations of all pairs [n]
+        rot_dev (Union[np.ndarray, None]): Rotation deviations of all pairs [n], None if not available
+        pair_distance (np.ndarray): Distances of all pairs [n]
+        bin_distances (np.ndarray): Pair distance of each bin [m]
+        offsets (np.ndarray): Start indices of the bins followed by n [m + 1]
+        pair_distance_unit (Unit): Unit of the pair distances
+    """
+
+    pos_dev: np.ndarray
+    rot_dev: Union[np.ndarray, None]
+    pair_distance: np.ndarray
+    bin_distances: np.ndarray
+    offsets: np.ndarray
     pair_distance_unit: Unit = Unit.METER
 
+    def __post_init__(self) -> None:
+        if len(self.offsets) != len(self.bin_distances) + 1:
+            raise ValueError("Number of offsets must exceed the number of bins by one.")
+
+        if self.offsets[0] != 0 or self.offsets[-1] != len(self.pair_distance) or np.any(np.diff(self.offsets) < 0):
+            raise ValueError("Offsets must increase from zero to the number of pairs.")
+
+        if len(self.pos_dev) != len(self.pair_distance) or (
+            self.rot_dev is not None and len(self.rot_dev) != len(self.pair_distance)
+        ):
+            raise ValueError("Dimension mismatch between deviations and pair distances.")
+
+        for name in ("pos_dev", "rot_dev", "pair_distance", "bin_distances", "offsets"):
+            if getattr(self, name) is not None:
+                object.__setattr__(self, name, read_only(np.array(getattr(self, name))))
+
     @property
     def num_pairs(self) -> int:
-        return sum(len(values) for values in self.pair_distance.values())
+        return len(self.pair_distance)
+
+    @property
+    def bin_sizes(self) -> np.ndarray:
+        """Returns the number of pairs of each bin"""
+        return np.diff(self.offsets)
+
+    def split_bins(self, values: np.ndarray) -> List[np.ndarray]:
+        """Splits values of all pairs into the bins"""
+        return np.split(values, self.offsets[1:-1])
 
 
-@dataclass
+@dataclass(frozen=True)
 class AbsoluteTrajectoryDeviations:
+    """
+    Absolute position and rotation deviations
+
+    The deviations are immutable, i.e. the deviation arrays are
+    read-only copies of the given arrays. Use dataclasses.replace to
+    derive modified deviations.
+    """
+
     pos_dev: np.ndarray
     directed_pos_dev: np.ndarray
     rot_dev: Union[RotationSet, None] = None
     rotations_used: bool = False
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "pos_dev", read_only(np.array(self.pos_dev, dtype=float)))
+        object.__setattr__(self, "directed_pos_dev", read_only(np.array(self.directed_pos_dev, dtype=float)))
@@ -0,0 +1,311 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+"""
+
+import copy
+import logging
+from typing import Dict, Union
+
+import numpy as np
+
+from trajectopy_core.evaluation.ate_result import ATEMetrics
+from trajectopy_core.evaluation.comparison import derive_dev_directions_no_rot, derive_dev_directions_with_rot
+from trajectopy_core.rotationset import RotationSet
+from trajectopy_core.trajectory import Trajectory
+
+logger = logging.getLogger("root")
+
+
+class RunningStatistics:
+    """Running mean, standard deviation, RMS, minimum and maximum
+
+    The statistics of one or more columns are updated chunk-wise using
+    Welford's algorithm in the parallel form of Chan et al., i.e. the
+    statistics of each chunk are computed at once and merged with the
+    previous statistics.
+
+    Attributes:
+        count (int): Number of values
+        mean (np.ndarray): Mean of each column
+        m2 (np.ndarray): Sum of squared differences from the mean of each column
+        min (np.ndarray): Minimum of each column
+        max (np.ndarray): Maximum of each column
+    """
+
+    def __init__(self, num_columns: int = 1) -> None:
+        self.count = 0
+        self.mean = np.zeros(num_columns)
+        self.m2 = np.zeros(num_columns)
+        self.min = np.full(num_columns, np.inf)
+        self.max = np.full(num_columns, -np.inf)
+
+    def update(self, values: np.ndarray) -> None:
+        """Adds values [n] or [n x num_columns] to the statistics"""
+        values = np.reshape(values, (len(values), -1))
+        if len(values) == 0:
+            return
+
+        count = len(values)
+        mean = np.mean(values, axis=0)
+        m2 = np.sum(np.square(values - mean), axis=0)
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.m2 = self.m2 + m2 + np.square(delta) * self.count * count / total
+        self.count = total
+
+        self.min = np.minimum(self.min, np.min(values, axis=0))
+        self.max = np.maximum(self.max, np.max(values, axis=0))
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / self.count)
+
+    @property
+    def rms(self) -> np.ndarray:
+        return np.sqrt(np.square(self.mean) + self.m2 / self.count)
+
+
+class QuantileSketch:
+    """Streaming quantile sketch for non-negative values
+
+    Values are counted in logarithmically spaced bins such that every
+    quantile is approximated with the given relative accuracy. If more
+    than max_bins bins are occupied, the lowest bins are collapsed,
+    which only affects the accuracy of the lowest quantiles.
+
+    Attributes:
+        relative_accuracy (float): Relative accuracy of the quantiles
+        max_bins (int): Maximum number of bins
+        count (int): Number of values
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005, max_bins: int = 2048, min_value: float = 1e-12) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.min_value = min_value
+        self.count = 0
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._zero_count = 0
+        self._bins: Dict[int, int] = {}
+
+    def update(self, values: np.ndarray) -> None:
+        """Adds non-negative values to the sketch"""
+        values = np.ravel(values)
+        self.count += len(values)
+
+        positive = values[values > self.min_value]
+        self._zero_count += len(values) - len(positive)
+
+        keys, counts = np.unique(np.ceil(np.log(positive) / np.log(self._gamma)).astype(int), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self._bins[key] = self._bins.get(key, 0) + count
+
+        if len(self._bins) > self.max_bins:
+            sorted_keys = sorted(self._bins)
+            collapsed = sorted_keys[: len(sorted_keys) - self.max_bins + 1]
+            for key in collapsed[:-1]:
+                self._bins[collapsed[-1]] += self._bins.pop(key)
+
+    def quantile(self, q: float) -> float:
+        """Returns the approximate q-quantile"""
+        if self.count == 0:
+            raise ValueError("Quantile of an empty sketch requested!")
+
+        # linear interpolation between the two neighboring ranks like np.quantile
+        rank = q * (self.count - 1)
+        lower_rank, upper_rank = int(np.floor(rank)), int(np.ceil(rank))
+        lower, upper = self._value_at_rank(lower_rank), self._value_at_rank(upper_rank)
+        return lower + (rank - lower_rank) * (upper - lower)
+
+    def _value_at_rank(self, rank: int) -> float:
+        if rank < self._zero_count:
+            return 0.0
+
+        cumulative_count = self._zero_count
+        for key in sorted(self._bins):
+            cumulative_count += self._bins[key]
+            if cumulative_count > rank:
+                return 2 * self._gamma**key / (self._gamma + 1)
+
+        return 2 * self._gamma ** max(self._bins) / (self._gamma + 1)
+
+
+class OnlineATE:
+    """Online computation of absolute trajectory error statistics
+
+    Matched pose pairs are added in chunks, e.g. during a run, and the
+    summary statistics of the absolute trajectory error can be requested
+    at any time. The memory required does not depend on the number of
+    pose pairs. The deviations are computed like in
+    compare_trajectories_absolute, i.e. the statistics agree with
+    ATEResult.metrics of the complete trajectories except for the medians,
+    which are approximated using a QuantileSketch.
+
+    If no rotations are available, the along- and cross-track
+    deviations of a pose depend on the next reference position.
+    Therefore, the last pose pair of each chunk is evaluated when the
+    next chunk is added or when a summary is requested.
+    """
+
+    def __init__(self, name: str = "", relative_accuracy: float = 0.005) -> None:
+        self.name = name
+        self.rotations_used: Union[bool, None] = None
+        self.has_orientation: Union[bool, None] = None
+
+        self._pos_dev = RunningStatistics(num_columns=3)
+        self._pos_dev_comb = RunningStatistics()
+        self._pos_dev_comb_sketch = QuantileSketch(relative_accuracy=relative_accuracy)
+        self._directed_pos_dev = RunningStatistics(num_columns=3)
+        self._rot_dev_xyz = RunningStatistics(num_columns=3)
+        self._rot_dev_comb = RunningStatistics()
+        self._rot_dev_comb_sketch = QuantileSketch(relative_accuracy=relative_accuracy)
+        self._rot_dev_quat_scatter = np.zeros((4, 4))
+
+        # last reference position and pose pair of the previous chunk
+        # (only used for directed deviations without rotations)
+        self._previous_ref_xyz: Union[np.ndarray, None] = None
+        self._pending_xyz: Union[np.ndarray, None] = None
+
+    def __len__(self) -> int:
+        return self._pos_dev.count
+
+    def update(self, *, traj_test: Trajectory, traj_ref: Trajectory) -> None:
+        """Adds a chunk of matched pose pairs
+
+        Args:
+            traj_test (Trajectory): Chunk of the test trajectory
+            traj_ref (Trajectory): Chunk of the reference trajectory, matched to traj_test
+        """
+        if len(traj_test) != len(traj_ref):
+            raise ValueError("Trajectory chunks must be matched!")
+
+        if len(traj_test) == 0:
+            return
+
+        rot = traj_ref.rot or traj_test.rot
+        has_orientation = traj_ref.rot is not None and traj_test.rot is not None
+        if self.rotations_used is None:
+            self.name = self.name or f"{traj_test.name} vs. {traj_ref.name}"
+            self.rotations_used = rot is not None
+            self.has_orientation = has_orientation
+        elif self.rotations_used != (rot is not None) or self.has_orientation != has_orientation:
+            raise ValueError("Orientations must be available either for all chunks or for none.")
+
+        xyz_ref = traj_ref.pos.xyz
+        xyz_test = traj_test.pos.xyz
+
+        pos_dev = xyz_ref - xyz_test
+        pos_dev_comb = np.linalg.norm(pos_dev, axis=1)
+        self._pos_dev.update(pos_dev)
+        self._pos_dev_comb.update(pos_dev_comb)
+        self._pos_dev_comb_sketch.update(pos_dev_comb)
+
+        if has_orientation:
+            rot_dev = traj_ref.rot - traj_test.rot
+            self._update_rotations(rot_dev)
+
+        if self.rotations_used:
+            self._directed_pos_dev.update(derive_dev_directions_with_rot(xyz_ref=xyz_ref, xyz_test=xyz_test, rot=rot))
+        else:
+            self._update_directions(xyz_ref=xyz_ref, xyz_test=xyz_test)
+
+    def _update_rotations(self, rot_dev: RotationSet) -> None:
+        rot_dev_comb = rot_dev.rotangle
+        self._rot_dev_xyz.update(rot_dev.as_euler(seq="xyz"))
+        self._rot_dev_comb.update(rot_dev_comb)
+        self._rot_dev_comb_sketch.update(rot_dev_comb)
+
+        # the mean rotation is the eigenvector of the quaternion scatter matrix with the largest eigenvalue
+        quat = rot_dev.as_quat()
+        self._rot_dev_quat_scatter += quat.T @ quat
+
+    def _update_directions(self, xyz_ref: np.ndarray, xyz_test: np.ndarray) -> None:
+        """Updates the directed deviations of all pose pairs except for the last one"""
+        if self._pending_xyz is not None:
+            xyz_ref = np.r_[self._pending_xyz[:1], xyz_ref]
+            xyz_test = np.r_[self._pending_xyz[1:], xyz_test]
+
+        if len(xyz_ref) > 1:
+            directed_pos_dev = derive_dev_directions_no_rot(xyz_ref=xyz_ref, xyz_test=xyz_test)
+            self._directed_pos_dev.update(directed_pos_dev[:-1])
+            self._previous_ref_xyz = xyz_ref[-2]
+
+        self._pending_xyz = np.r_[xyz_ref[-1:], xyz_test[-1:]]
+
+    def _directed_pos_dev_statistics(self) -> RunningStatistics:
+        """Returns the statistics of the directed deviations including the last pose pair"""
+        if self._pending_xyz is None:
+            return self._directed_pos_dev
+
+        statistics = copy.deepcopy(self._directed_pos_dev)
+        if self._previous_ref_xyz is None:
+            xyz_ref, xyz_test = self._pending_xyz[:1], self._pending_xyz[1:]
+        else:
+            xyz_ref = np.r_[self._previous_ref_xyz[None, :], self._pending_xyz[:1]]
+            xyz_test = np.r_[self._pending_xyz[1:], self._pending_xyz[1:]]
+
+        statistics.update(derive_dev_directions_no_rot(xyz_ref=xyz_ref, xyz_test=xyz_test)[-1:])
+        return statistics
+
+    def summary(self) -> ATEMetrics:
+        """Returns the statistics of all pose pairs added so far
+
+        Returns:
+            ATEMetrics: Summary statistics, compatible with ATEResult.metrics
+        """
+        if len(self) == 0:
+            raise ValueError("No pose pairs have been added yet!")
+
+        directed_pos_dev = self._directed_pos_dev_statistics()
+
+        if self.has_orientation:
+            rot_bias_xyz = RotationSet.from_quat(np.linalg.eigh(self._rot_dev_quat_scatter)[1][:, -1]).as_euler(
+                seq="xyz"
+            )
+            rot_statistics = {
+                "rot_dev_max": self._rot_dev_comb.max[0],
+                "rot_ate": self._rot_dev_comb.mean[0],
+                "rot_dev_median": self._rot_dev_comb_sketch.quantile(0.5),
+                "rot_dev_min": self._rot_dev_comb.min[0],
+                "rot_dev_rms": self._rot_dev_comb.rms[0],
+                "rot_dev_std": self._rot_dev_comb.std[0],
+                "rot_rms_x": self._rot_dev_xyz.rms[0],
+                "rot_rms_y": self._rot_dev_xyz.rms[1],
+                "rot_rms_z": self._rot_dev_xyz.rms[2],
+                "rot_bias_x": rot_bias_xyz[0],
+                "rot_bias_y": rot_bias_xyz[1],
+                "rot_bias_z": rot_bias_xyz[2],
+            }
+        else:
+            rot_statistics = {metric: 0.0 for metric in ATEMetrics.statistics() if metric.startswith("rot_")}
+
+        return ATEMetrics(
+            name=self.name,
+            num_deviations=len(self),
+            rotations_used=bool(self.rotations_used),
+            has_orientation=bool(self.has_orientation),
+            pos_dev_max=float(self._pos_dev_comb.max[0]),
+            pos_ate=float(self._pos_dev_comb.mean[0]),
+            pos_dev_median=self._pos_dev_comb_sketch.quantile(0.5),
+            pos_dev_min=float(self._pos_dev_comb.min[0]),
+            pos_dev_rms=float(self._pos_dev_comb.rms[0]),
+            pos_dev_std=float(self._pos_dev_comb.std[0]),
+            pos_bias_x=float(self._pos_dev.mean[0]),
+            pos_bias_y=float(self._pos_dev.mean[1]),
+            pos_bias_z=float(self._pos_dev.mean[2]),
+            pos_rms_x=float(self._pos_dev.rms[0]),
+            pos_rms_y=float(self._pos_dev.rms[1]),
+            pos_rms_z=float(self._pos_dev.rms[2]),
+            pos_bias_along=float(directed_pos_dev.mean[0]),
+            pos_bias_cross_h=float(directed_pos_dev.mean[1]),
+            pos_bias_cross_v=float(directed_pos_dev.mean[2]),
+            pos_rms_along=float(directed_pos_dev.rms[0]),
+            pos_rms_cross_h=float(directed_pos_dev.rms[1]),
+            pos_rms_cross_v=float(directed_pos_dev.rms[2]),
+            **{metric: float(value) for metric, value in rot_statistics.items()},
+        )
@@ -6,15 +6,19 @@ mail@gtombrink.de
 """
 
 import csv
-from typing import Any, Callable, Dict, List
+from functools import cached_property
+from typing import Dict, List
 
 import numpy as np
 import pandas as pd
 
 from trajectopy_core.definitions import Unit
 from trajectopy_core.evaluation.deviations import RelativeTrajectoryDeviations
+from trajectopy_core.evaluation.utils import BinStatistics, bin_means, bin_statistics
 from trajectopy_core.input_output.header import HeaderData
 
+CACHED_PROPERTIES = ("pos_statistics", "rot_statistics", "mean_pair_distances")
+
 
 class RPEResult:
     """
@@ -23,6 +27,9 @@ class RPEResult:
     Relative trajectory deviations describe relative pose deviations between
     two trajectories. The deviations are calculated by comparing pairs of
     positions and orientations in the test and reference trajectory.
+
+    The statistics of all pair distance bins are computed at once and
+    cached until the deviations are replaced.
     """
 
     def __init__(
@@ -33,6 +40,20 @@ class RPEResult:
         self.name = name
         self.rpe_dev = rpe_dev
 
+    @property
+    def rpe_dev(self) -> RelativeTrajectoryDeviations:
+        return self._rpe_dev
+
+    @rpe_dev.setter
+    def rpe_dev(self, rpe_dev: RelativeTrajectoryDeviations) -> None:
+        self._rpe_dev = rpe_dev
+        self._invalidate_cache()
+
+    def _invalidate_cache(self) -> None:
+        """Removes the cached quantities that depend on the deviations"""
+        for name in CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
+
     def __eq__(self, other) -> bool:
         for self_value, other_value in zip(self.property_dict.values(), other.property_dict.values()):
             assert self_value == other_value
@@ -44,7 +65,7 @@ class RPEResult:
 
     @property
     def has_rot_dev(self) -> bool:
-        return any(self.rpe_dev.rot_dev.values())
+        return self.rpe_dev.rot_dev is not None and len(self.rpe_dev.rot_dev) > 0
 
     @property
     def step(self) -> float:
@@ -66,16 +87,26 @@ class RPEResult:
     def drift_factor(self) -> float:
         return 100.0 if self.rpe_dev.pair_distance_unit == Unit.METER else 1.0
 
-    def compute_metric(self, key: str, func: Callable[[Any], float], factor: float = 1.0) -> List[float]:
-        return [float(func(values) * factor) for values in self.rpe_dev.__dict__[key].values() if values]
+    @cached_property
+    def pos_statistics(self) -> BinStatistics:
+        """Returns the statistics of the position deviations of each non-empty bin"""
+        return bin_statistics(self.rpe_dev.pos_dev, self.rpe_dev.offsets)
+
+    @cached_property
+    def rot_statistics(self) -> BinStatistics:
+        """Returns the statistics of the rotation deviations of each non-empty bin"""
+        if not self.has_rot_dev:
+            return bin_statistics(np.array([]), np.zeros(1, dtype=int))
+
+        return bin_statistics(self.rpe_dev.rot_dev, self.rpe_dev.offsets)
 
     @property
     def num_pairs(self) -> List[int]:
-        return [len(values) for values in self.rpe_dev.pair_distance.values() if values]
+        return [int(num_pairs) for num_pairs in self.rpe_dev.bin_sizes if num_pairs]
 
-    @property
+    @cached_property
     def mean_pair_distances(self) -> List[float]:
-        return self.compute_metric(key="pair_distance", func=np.mean)
+        return bin_means(self.rpe_dev.pair_distance, self.rpe_dev.offsets).tolist()
 
     @property
     def pos_rpe(self) -> float:
@@ -88,82 +119,55 @@ class RPEResult:
 
     @property
     def pos_std(self) -> List[float]:
-        return self.compute_metric(key="pos_dev", func=np.std, factor=self.drift_factor)
+        return (self.pos_statistics.std * self.drift_factor).tolist()
 
     @property
     def rot_std(self) -> List[float]:
-        if not self.has_rot_dev:
-            return []
-
-        return self.compute_metric(key="rot_dev", func=np.std, factor=self.drift_factor)
+        return (self.rot_statistics.std * self.drift_factor).tolist()
 
     @property
     def pos_dev_mean(self) -> List[float]:
-        return self.compute_metric(key="pos_dev", func=np.mean, factor=self.drift_factor)
+        return (self.pos_statistics.mean * self.drift_factor).tolist()
 
     @property
     def pos_dev_min(self) -> List[float]:
-        return self.compute_metric(key="pos_dev", func=np.min, factor=self.drift_factor)
+        return (self.pos_statistics.min * self.drift_factor).tolist()
 
     @property
     def pos_dev_max(self) -> List[float]:
-        return self.compute_metric(key="pos_dev", func=np.max, factor=self.drift_factor)
+        return (self.pos_statistics.max * self.drift_factor).tolist()
 
     @property
     def pos_dev_median(self) -> List[float]:
-        return self.compute_metric(key="pos_dev", func=np.median, factor=self.drift_factor)
+        return (self.pos_statistics.median * self.drift_factor).tolist()
 
     @property
     def rot_dev_mean(self) -> List[float]:
-        if not self.has_rot_dev:
-            return []
-
-        return self.compute_metric(key="rot_dev", func=np.mean, factor=self.drift_factor)
+        return (self.rot_statistics.mean * self.drift_factor).tolist()
 
     @property
     def rot_dev_min(self) -> List[float]:
-        if not self.has_rot_dev:
-            return []
-
-        return self.compute_metric(key="rot_dev", func=np.min, factor=self.drift_factor)
+        return (self.rot_statistics.min * self.drift_factor).tolist()
 
     @property
     def rot_dev_max(self) -> List[float]:
-        if not self.has_rot_dev:
-            return []
-
-        return self.compute_metric(key="rot_dev", func=np.max, factor=self.drift_factor)
+        return (self.rot_statistics.max * self.drift_factor).tolist()
 
     @property
     def rot_dev_median(self) -> List[float]:
-        if not self.has_rot_dev:
-            return []
-
-        return self.compute_metric(key="rot_dev", func=np.median, factor=self.drift_factor)
-
-    def get_all(self, key: str) -> List[float]:
-        ret_list: List[float] = []
-        model_dict = self.rpe_dev.__dict__
-
-        if key not in model_dict:
-            return ret_list
-
-        for value in model_dict[key].values():
-            ret_list.extend(value)
-
-        return ret_list
+        return (self.rot_statistics.median * self.drift_factor).tolist()
 
     @property
-    def all_pair_distances(self) -> List[float]:
-        return self.get_all(key="pair_distance")
+    def all_pair_distances(self) -> np.ndarray:
+        return self.rpe_dev.pair_distance
 
     @property
-    def pos_dev_all(self) -> List[float]:
-        return self.get_all(key="pos_dev")
+    def pos_dev_all(self) -> np.ndarray:
+        return self.rpe_dev.pos_dev
 
     @property
-    def all_rot_devs(self) -> List[float]:
-        return self.get_all(key="rot_dev")
+    def all_rot_devs(self) -> np.ndarray:
+        return self.rpe_dev.rot_dev if self.has_rot_dev else np.array([])
 
     @property
     def dynamic_pos_dict(self) -> Dict[str, str]:
@@ -251,28 +255,16 @@ class RPEResult:
         header_data = HeaderData.from_file(filename)
         deviation_data = pd.read_csv(filename, comment="#")
 
-        pos_dev: Dict[float, List[float]] = {}
-        rot_dev: Dict[float, List[float]] = {}
-        pair_distance: Dict[float, List[float]] = {}
-
-        last_index = 0
-        for index in header_data.num_pairs:
-            dev_block = deviation_data.iloc[last_index : last_index + index, :]
-            pair_distances = dev_block["pair_distance"].to_numpy(dtype=float)
-            pos_devs = dev_block["pos_dev"].to_numpy(dtype=float)
-            rot_devs = dev_block["rot_dev"].to_numpy(dtype=float) if "rot_dev" in deviation_data.columns else []
-
-            mean_dist = np.mean(pair_distances)
-            pair_distance[mean_dist] = list(pair_distances)
-            pos_dev[mean_dist] = list(pos_devs)
-            rot_dev[mean_dist] = list(rot_devs)
-
-            last_index += index
+        offsets = np.cumsum([0] + [num_pairs for num_pairs in header_data.num_pairs if num_pairs])
+        pair_distance = deviation_data["pair_distance"].to_numpy(dtype=float)
+        rot_dev = deviation_data["rot_dev"].to_numpy(dtype=float) if "rot_dev" in deviation_data.columns else None
 
         rpe_dev = RelativeTrajectoryDeviations(
-            pair_distance=pair_distance,
-            pos_dev=pos_dev,
+            pos_dev=deviation_data["pos_dev"].to_numpy(dtype=float),
             rot_dev=rot_dev,
+            pair_distance=pair_distance,
+            bin_distances=bin_means(pair_distance, offsets),
+            offsets=offsets,
             pair_distance_unit=header_data.relative_dist_unit,
         )
 
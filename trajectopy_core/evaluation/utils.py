@@ -5,6 +5,7 @@ Gereon Tombrink, 2023
 mail@gtombrink.de
 """
 import logging
+from dataclasses import dataclass
 from typing import Tuple, Union
 
 import numpy as np
@@ -26,6 +27,86 @@ def rms(x: Union[np.ndarray, float]) -> float:
     return np.sqrt(np.mean(np.square(x)))
 
 
+@dataclass(frozen=True)
+class BinStatistics:
+    """
+    Statistics of the non-empty bins of a ragged array
+
+    Each attribute contains one value per non-empty bin.
+    """
+
+    num_values: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    median: np.ndarray
+
+
+def _non_empty_bins(offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the start indices and sizes of the non-empty bins"""
+    bin_sizes = np.diff(offsets)
+    non_empty = bin_sizes > 0
+    return offsets[:-1][non_empty], bin_sizes[non_empty]
+
+
+def bin_means(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Calculates the mean of each non-empty bin of a ragged array.
+
+    Args:
+        values (np.ndarray): Values of all bins [n]
+        offsets (np.ndarray): Start indices of the bins followed by n [m + 1]
+
+    Returns:
+        np.ndarray: Mean of each non-empty bin
+    """
+    starts, bin_sizes = _non_empty_bins(offsets)
+    if len(starts) == 0:
+        return np.array([])
+
+    return np.add.reduceat(values, starts) / bin_sizes
+
+
+def bin_statistics(values: np.ndarray, offsets: np.ndarray) -> BinStatistics:
+    """
+    Calculates the statistics of each non-empty bin of a ragged array.
+
+    The values of bin i are values[offsets[i] : offsets[i + 1]]. All
+    statistics except the medians are computed using reductions over
+    the flat array instead of a pass per bin and statistic.
+
+    Args:
+        values (np.ndarray): Values of all bins [n]
+        offsets (np.ndarray): Start indices of the bins followed by n [m + 1]
+
+    Returns:
+        BinStatistics: Statistics of the non-empty bins
+    """
+    starts, bin_sizes = _non_empty_bins(offsets)
+    if len(starts) == 0:
+        empty = np.array([])
+        return BinStatistics(
+            num_values=np.array([], dtype=int), mean=empty, std=empty, min=empty, max=empty, median=empty
+        )
+
+    mean = np.add.reduceat(values, starts) / bin_sizes
+    residuals = values - np.repeat(mean, bin_sizes)
+    std = np.sqrt(np.add.reduceat(residuals**2, starts) / bin_sizes)
+
+    # medians are no reductions, they are selected per bin in linear time
+    median = np.array([np.median(values[start : start + size]) for start, size in zip(starts, bin_sizes)])
+
+    return BinStatistics(
+        num_values=bin_sizes,
+        mean=mean,
+        std=std,
+        min=np.minimum.reduceat(values, starts),
+        max=np.maximum.reduceat(values, starts),
+        median=median,
+    )
+
+
 def nearest_point(*, p: np.ndarray, line_pts: list) -> Tuple[np.ndarray, float]:
     """
     Finds the nearest point on a 3D line to a given point.
@@ -56,3 +137,35 @@ def nearest_point(*, p: np.ndarray, line_pts: list) -> Tuple[np.ndarray, float]:
         # nearest point on the 3d line
         p_nearest = a + t * r_v
     return p_nearest, t
+
+
+def nearest_points(*, p: np.ndarray, line_start: np.ndarray, line_end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the nearest points on multiple 3D lines to multiple given points.
+
+    Vectorized version of nearest_point. The i-th point is projected
+    onto the line through line_start[i] and line_end[i].
+
+    Args:
+        p (np.ndarray): Nx3 array of points to find the nearest points to.
+        line_start (np.ndarray): Nx3 array of the first points defining the lines.
+        line_end (np.ndarray): Nx3 array of the second points defining the lines.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Nx3 array of nearest points and the
+                                       line parameters t of these points.
+    """
+    # direction vectors
+    r_v = line_end - line_start
+    r_v_norm = np.linalg.norm(r_v, axis=1)
+
+    # if both points are identical, the nearest point is the start point
+    valid = r_v_norm > 0
+    r_v[valid] /= r_v_norm[valid, None]
+    r_v[~valid] = 0.0
+
+    t = np.einsum("ij,ij->i", p - line_start, r_v)
+
+    # nearest points on the 3d lines
+    p_nearest = line_start + t[:, None] * r_v
+    return p_nearest, t
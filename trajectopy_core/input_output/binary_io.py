@@ -0,0 +1,97 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+
+Binary trajectory format
+
+A binary trajectory file consists of
+    - the magic string MAGIC (8 bytes)
+    - the length of the json header as little-endian uint32 (4 bytes)
+    - the json header padded with spaces to a multiple of 64 bytes
+    - the data as little-endian float64 array [n x num_fields] in row-major order
+
+The json header contains the header data (epsg, name, nframe, fields)
+and the shape of the data. Since the data is stored uncompressed, it
+can be memory-mapped when reading. The data is read-only in that case.
+Trajectories copy their fields from it, so they are writable.
+"""
+
+import json
+import logging
+from typing import Tuple
+
+import numpy as np
+
+from trajectopy_core.input_output.header import HeaderData
+
+logger = logging.getLogger("root")
+
+MAGIC = b"\x93TRAJPY\x01"
+DATA_ALIGNMENT = 64
+DTYPE = np.dtype("<f8")
+
+
+def is_binary_file(filename: str) -> bool:
+    """Checks whether a file is a binary trajectory file
+
+    Args:
+        filename (str): File to check
+
+    Returns:
+        bool: True if the file starts with the magic string of the binary format
+    """
+    with open(filename, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def write_binary(filename: str, header_data: HeaderData, data: np.ndarray) -> None:
+    """Writes header and data to a binary trajectory file
+
+    Args:
+        filename (str): Output filename
+        header_data (HeaderData): Header data, must contain the fields of the data
+        data (np.ndarray): Trajectory data [n x num_fields]
+    """
+    if data.ndim != 2 or data.shape[1] != len(header_data.fields):
+        raise ValueError(f"Data of shape {data.shape} does not match fields {header_data.fields}")
+
+    header = json.dumps({"header": header_data.data, "shape": data.shape}).encode("utf-8")
+    header_length = len(header) + (-(len(MAGIC) + 4 + len(header)) % DATA_ALIGNMENT)
+
+    with open(filename, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.uint32(header_length).astype("<u4").tobytes())
+        file.write(header.ljust(header_length))
+        np.ascontiguousarray(data, dtype=DTYPE).tofile(file)
+
+
+def read_binary(filename: str, mmap: bool = True) -> Tuple[HeaderData, np.ndarray]:
+    """Reads header and data from a binary trajectory file
+
+    Args:
+        filename (str): File to read
+        mmap (bool, optional): If True, the data is memory-mapped read-only
+                               instead of being loaded into memory. Defaults to True.
+
+    Returns:
+        Tuple[HeaderData, np.ndarray]: Header data and data
+    """
+    with open(filename, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{filename} is not a binary trajectory file")
+
+        header_length = int(np.frombuffer(file.read(4), dtype="<u4")[0])
+        header = json.loads(file.read(header_length).decode("utf-8"))
+
+    shape = tuple(header["shape"])
+    offset = len(MAGIC) + 4 + header_length
+
+    if not mmap or shape[0] == 0:
+        data = np.fromfile(filename, dtype=DTYPE, offset=offset).reshape(shape)
+    else:
+        data = np.memmap(filename, dtype=DTYPE, mode="r", offset=offset, shape=shape)
+
+    logger.info("Read binary trajectory file %s", filename)
+    return HeaderData(header["header"]), data
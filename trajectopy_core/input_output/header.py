@@ -8,7 +8,7 @@ import logging
 import re
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Callable, Dict, List, Union
+from typing import Callable, Dict, List, TextIO, Union
 
 import numpy as np
 
@@ -169,6 +169,38 @@ class HeaderData:
         logger.info("Read header of %s", filename)
         return cls(metadata)
 
+    @classmethod
+    def from_stream(cls, stream: TextIO) -> "HeaderData":
+        """Reads the header at the beginning of a text stream.
+
+        Reading stops at the first line that is neither a comment nor
+        empty. The stream is left positioned at the beginning of this line
+        so that the data can be read from the same stream afterwards.
+        Header lines following this line are not read.
+
+        Args:
+            stream (TextIO): The text stream.
+
+        Returns:
+            HeaderData: The header data.
+        """
+        metadata: Dict[str, Union[str, int, float]] = {}
+        while True:
+            position = stream.tell()
+            line = stream.readline()
+
+            if not line:
+                break
+
+            if line.strip() and not line.startswith("#"):
+                stream.seek(position)
+                break
+
+            cls.handle_line(metadata, line)
+
+        logger.info("Read header from stream")
+        return cls(metadata)
+
     @classmethod
     def from_string(cls, input_str: str) -> "HeaderData":
         """Reads the header of an input string.
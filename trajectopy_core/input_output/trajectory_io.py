@@ -7,7 +7,7 @@ mail@gtombrink.de
 
 import logging
 from io import StringIO
-from typing import List, Tuple, Union
+from typing import Dict, Iterator, List, TextIO, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -21,35 +21,37 @@ from trajectopy_core.rotationset import RotationSet
 logger = logging.getLogger("root")
 
 
-def read_data(filename: str, dtype=float) -> Tuple[HeaderData, np.ndarray]:
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def read_data(filename: str, dtype=None) -> Tuple[HeaderData, np.ndarray]:
     """Reads the header and the data from a file
 
-    By default, the trajectory data is read using pandas. If this fails,
-    numpy is used instead.
+    The header is parsed once from the top of the file. Header lines
+    following the first data line are ignored. Afterwards, the
+    trajectory data is read using pandas. If this fails, numpy is used
+    instead.
 
     Args:
         filename (str): File to read
+        dtype (optional): Type the data is converted to. If None, the data is
+                          float64, or object if the time column holds datetime
+                          strings. Defaults to None.
 
     Returns:
         Tuple[HeaderData, np.ndarray]: Header data and data
     """
-    header_data = HeaderData.from_file(filename)
-    try:
-        data = pd.read_csv(filename, comment="#", header=None, sep=header_data.delimiter).to_numpy(dtype=dtype)
-
-        if data.shape[1] == 1:
-            logger.info("Assuming whitespaces as delimiter since imported data has only one column.")
-            data = pd.read_csv(filename, comment="#", header=None, delim_whitespace=True).to_numpy(dtype=dtype)
-    except Exception:
+    with open(filename, "r", encoding="utf-8") as file:
+        header_data = HeaderData.from_stream(file)
         try:
-            data = pd.read_csv(filename, comment="#", header=None, delim_whitespace=True).to_numpy(dtype=dtype)
+            data = _as_dtype(next(read_data_stream(file, header_data)), dtype)
         except Exception:
             logger.warning("Could not read file using pandas. Trying numpy instead.")
             data = np.loadtxt(filename, comments="#")
     return header_data, data
 
 
-def read_string(input_str: str, dtype=float) -> Tuple[HeaderData, np.ndarray]:
+def read_string(input_str: str, dtype=None) -> Tuple[HeaderData, np.ndarray]:
     """Reads the header and the data from a string
 
     By default, the trajectory data is read using pandas. If this fails,
@@ -57,27 +59,111 @@ def read_string(input_str: str, dtype=float) -> Tuple[HeaderData, np.ndarray]:
 
     Args:
         input_str (str): String to read
+        dtype (optional): Type the data is converted to. If None, the data is
+                          float64, or object if the time column holds datetime
+                          strings. Defaults to None.
 
     Returns:
         Tuple[HeaderData, np.ndarray]: Header data and data
     """
-    header_data = HeaderData.from_string(input_str)
-    input_str = StringIO(input_str)
+    stream = StringIO(input_str)
+    header_data = HeaderData.from_stream(stream)
     try:
-        data = pd.read_csv(input_str, comment="#", header=None, sep=header_data.delimiter).to_numpy(dtype=dtype)
-
-        if data.shape[1] == 1:
-            logger.info("Assuming whitespaces as delimiter since imported data has only one column.")
-            data = pd.read_csv(input_str, comment="#", header=None, delim_whitespace=True).to_numpy(dtype=dtype)
+        data = _as_dtype(next(read_data_stream(stream, header_data)), dtype)
     except Exception:
-        try:
-            data = pd.read_csv(input_str, comment="#", header=None, delim_whitespace=True).to_numpy(dtype=dtype)
-        except Exception:
-            logger.warning("Could not read string using pandas. Trying numpy instead.")
-            data = np.loadtxt(input_str, comments="#")
+        logger.warning("Could not read string using pandas. Trying numpy instead.")
+        data = np.loadtxt(StringIO(input_str), comments="#")
     return header_data, data
 
 
+def read_data_chunks(filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[HeaderData, np.ndarray]]:
+    """Reads the header and the data from a file in chunks
+
+    Only one chunk of the file is held in memory at a time.
+
+    Args:
+        filename (str): File to read
+        chunk_size (int, optional): Number of lines per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+
+    Yields:
+        Tuple[HeaderData, np.ndarray]: Header data and data of the current chunk
+    """
+    with open(filename, "r", encoding="utf-8") as file:
+        header_data = HeaderData.from_stream(file)
+        for data in read_data_stream(file, header_data, chunk_size=chunk_size):
+            yield header_data, data
+
+
+def read_data_stream(
+    stream: TextIO, header_data: HeaderData, chunk_size: Union[int, None] = None
+) -> Iterator[np.ndarray]:
+    """Reads the data following the header from a text stream
+
+    All columns are read as float64, including columns that are not
+    trajectory fields, except for datetime time columns which are read
+    as strings. In this case, an object array is returned. Columns
+    that cannot be parsed raise a ValueError. Lines starting with "#"
+    are skipped, i.e. header lines following the first data line have
+    no effect.
+
+    If the delimiter specified in the header does not occur in the
+    first data line, whitespaces are assumed as delimiter.
+
+    Args:
+        stream (TextIO): Text stream positioned at the first data line
+        header_data (HeaderData): Holds information about the header of the trajectory file
+        chunk_size (Union[int, None], optional): Number of lines per chunk. If None,
+                                                 all data is returned at once. Defaults to None.
+
+    Yields:
+        np.ndarray: Trajectory data
+    """
+    position = stream.tell()
+    first_line = stream.readline()
+    stream.seek(position)
+
+    if header_data.delimiter in first_line:
+        sep = header_data.delimiter
+        num_columns = len(first_line.split(sep))
+    else:
+        logger.info("Assuming whitespaces as delimiter since the delimiter is not contained in the data.")
+        sep = r"\s+"
+        num_columns = len(first_line.split())
+
+    if num_columns == 0:
+        yield np.empty((0, len(header_data.fields)))
+        return
+
+    column_dtypes = _column_dtypes(header_data, num_columns)
+    dtype = object if object in column_dtypes.values() else np.float64
+    reader = pd.read_csv(
+        stream,
+        comment="#",
+        header=None,
+        sep=sep,
+        dtype=column_dtypes,
+        chunksize=chunk_size,
+    )
+
+    for chunk in reader if chunk_size is not None else [reader]:
+        yield chunk.to_numpy(dtype=dtype)
+
+
+def _as_dtype(data: np.ndarray, dtype) -> np.ndarray:
+    """Converts the data to the requested dtype, if any"""
+    return data if dtype is None else data.astype(dtype, copy=False)
+
+
+def _column_dtypes(header_data: HeaderData, num_columns: int) -> Dict[int, type]:
+    """Returns the dtypes of all columns"""
+    datetime_columns = header_data.time_format == TimeFormat.DATETIME
+    fields = header_data.fields[:num_columns]
+    return {
+        index: object if datetime_columns and index < len(fields) and fields[index] == "t" else np.float64
+        for index in range(num_columns)
+    }
+
+
 def extract_trajectory_rotations(header_data: HeaderData, trajectory_data: np.ndarray) -> Union[RotationSet, None]:
     """Extracts rotations from trajectory data and returns them as RotationSet
 
@@ -99,7 +185,7 @@ def extract_trajectory_rotations(header_data: HeaderData, trajectory_data: np.nd
     if all(field in header_data.fields for field in ["ex", "ey", "ez"]) and rot is None:
         rot = extract_euler_angles(header_data, trajectory_data)
 
-    if rot is None:
+    if rot is None or header_data.nframe == "enu":
         return rot
 
     enu_rot = RotationSet.from_matrix(get_rot_matrix(header_data.nframe))
@@ -125,7 +211,7 @@ def extract_quaternions(header_data: HeaderData, trajectory_data: np.ndarray) ->
                 header_data.fields.index("qz"),
                 header_data.fields.index("qw"),
             ],
-        ].astype(float)
+        ].astype(float, copy=False)
     )
 
 
@@ -148,7 +234,7 @@ def extract_euler_angles(header_data: HeaderData, trajectory_data: np.ndarray) -
                 header_data.fields.index("ey"),
                 header_data.fields.index("ez"),
             ],
-        ].astype(float),
+        ].astype(float, copy=False),
         degrees=header_data.rot_unit == "deg",
     )
 
@@ -167,7 +253,9 @@ def extract_trajectory_timestamps(header_data: HeaderData, trajectory_data: np.n
     time_columns = [pos for pos, char in enumerate(header_data.fields) if char == "t"]
 
     if header_data.time_format == TimeFormat.UNIX and len(time_columns) == 1:
-        return trajectory_data[:, header_data.fields.index("t")].astype(float) + header_data.time_offset
+        tstamps = np.array(trajectory_data[:, header_data.fields.index("t")], dtype=float)
+        tstamps += header_data.time_offset
+        return tstamps
 
     if header_data.time_format == TimeFormat.DATETIME and time_columns:
         return (
@@ -257,14 +345,17 @@ def extract_trajectory_speed(header_data: HeaderData, trajectory_data: np.ndarra
     return (
         None
         if any(item not in header_data.fields for item in ["vx", "vy", "vz"])
-        else trajectory_data[
-            :,
-            [
-                header_data.fields.index("vx"),
-                header_data.fields.index("vy"),
-                header_data.fields.index("vz"),
+        else np.ascontiguousarray(
+            trajectory_data[
+                :,
+                [
+                    header_data.fields.index("vx"),
+                    header_data.fields.index("vy"),
+                    header_data.fields.index("vz"),
+                ],
             ],
-        ].astype(float)
+            dtype=float,
+        )
     )
 
 
@@ -278,7 +369,11 @@ def extract_trajectory_arc_lengths(header_data: HeaderData, trajectory_data: np.
     Returns:
         np.ndarray: Arc lengths read from the trajectory file
     """
-    return None if "l" not in header_data.fields else trajectory_data[:, header_data.fields.index("l")].astype(float)
+    return (
+        None
+        if "l" not in header_data.fields
+        else np.array(trajectory_data[:, header_data.fields.index("l")], dtype=float)
+    )
 
 
 def extract_trajectory_pointset(header_data: HeaderData, trajectory_data: np.ndarray) -> PointSet:
@@ -295,13 +390,16 @@ def extract_trajectory_pointset(header_data: HeaderData, trajectory_data: np.nda
         PointSet: PointSet object containing the parsed positions.
     """
     return PointSet(
-        xyz=trajectory_data[
-            :,
-            [
-                header_data.fields.index("px"),
-                header_data.fields.index("py"),
-                header_data.fields.index("pz"),
+        xyz=np.ascontiguousarray(
+            trajectory_data[
+                :,
+                [
+                    header_data.fields.index("px"),
+                    header_data.fields.index("py"),
+                    header_data.fields.index("pz"),
+                ],
             ],
-        ].astype(float),
+            dtype=float,
+        ),
         epsg=header_data.epsg,
     )
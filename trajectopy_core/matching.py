@@ -7,24 +7,33 @@ mail@gtombrink.de
 
 import copy
 import logging
-from typing import Tuple
+from typing import Iterable, Iterator, Tuple, Union
 
 import numpy as np
 from pointset import PointSet
 from scipy.spatial import KDTree
 
+from trajectopy_core.reference_index import (
+    ReferenceIndex,
+    reference_index_cache,
+    time_order,
+)
+from trajectopy_core.rotationset import RotationSet
 from trajectopy_core.settings.matching import MatchingMethod, MatchingSettings
 from trajectopy_core.trajectory import Trajectory
-from trajectopy_core.utils import Line3D
+from trajectopy_core.utils import fit_lines, slerp
 
 logger = logging.getLogger("root")
 
+SPATIAL_INTERPOLATION_CHUNK_SIZE = 2**16
+
 
 def match_trajectories(
     traj_from: Trajectory,
     traj_to: Trajectory,
     settings: MatchingSettings = MatchingSettings(),
     inplace: bool = True,
+    reference_index: Union[ReferenceIndex, None] = None,
 ) -> Tuple[Trajectory, Trajectory]:
     """
     Matches two trajectories using the specified method
@@ -36,7 +45,16 @@ def match_trajectories(
         - MatchingMethod.NEAREST_SPATIAL
         - MatchingMethod.NEAREST_SPATIAL_INTERPOLATED
 
+    All methods except for MatchingMethod.INTERPOLATION can use a
+    reference index of traj_to to avoid rebuilding it for every
+    trajectory matched against the same reference. If no index is
+    given and settings.cache_reference_index is set, the index is
+    taken from the reference index cache.
+
     """
+    if reference_index is None and settings.cache_reference_index and settings.method != MatchingMethod.INTERPOLATION:
+        reference_index = reference_index_cache.get(traj_to)
+
     traj_from = traj_from if inplace else traj_from.copy()
     traj_to = traj_to if inplace else traj_to.copy()
 
@@ -46,10 +64,20 @@ def match_trajectories(
         return match_trajectories_interpolation(traj_test=traj_from, traj_ref=traj_to)
 
     if settings.method == MatchingMethod.NEAREST_TEMPORAL:
-        return match_trajectories_temporal(traj_test=traj_from, traj_ref=traj_to, max_distance=settings.max_time_diff)
+        return match_trajectories_temporal(
+            traj_test=traj_from,
+            traj_ref=traj_to,
+            max_distance=settings.max_time_diff,
+            reference_index=reference_index,
+        )
 
     if settings.method == MatchingMethod.NEAREST_SPATIAL:
-        return match_trajectories_spatial(traj_test=traj_from, traj_ref=traj_to, max_distance=settings.max_distance)
+        return match_trajectories_spatial(
+            traj_test=traj_from,
+            traj_ref=traj_to,
+            max_distance=settings.max_distance,
+            reference_index=reference_index,
+        )
 
     if settings.method == MatchingMethod.NEAREST_SPATIAL_INTERPOLATED:
         return match_trajectories_spatial_interpolation(
@@ -57,6 +85,7 @@ def match_trajectories(
             traj_ref=traj_to,
             max_distance=settings.max_distance,
             k_nearest=settings.k_nearest,
+            reference_index=reference_index,
         )
 
     raise ValueError(f"Matching method {settings.method} not supported!")
@@ -90,7 +119,10 @@ def match_trajectories_interpolation(traj_test: Trajectory, traj_ref: Trajectory
 
 
 def match_trajectories_temporal(
-    traj_test: Trajectory, traj_ref: Trajectory, max_distance: float = 0.01
+    traj_test: Trajectory,
+    traj_ref: Trajectory,
+    max_distance: float = 0.01,
+    reference_index: Union[ReferenceIndex, None] = None,
 ) -> Tuple[Trajectory, Trajectory]:
     """This method matches both trajectories temporally
 
@@ -103,19 +135,24 @@ def match_trajectories_temporal(
         traj_ref (Trajectory): Reference trajectory
         max_distance (float, optional): Maximum distance between two timestamps.
                                         Defaults to 0.1.
+        reference_index (ReferenceIndex, optional): Index of the reference trajectory.
 
     Returns:
         Tuple[Trajectory, Trajectory]: Matched trajectories
     """
-    tstamps_ref_2d = np.c_[traj_ref.tstamps, np.zeros(traj_ref.tstamps.shape)]
-    tstamps_test_2d = np.c_[traj_test.tstamps, np.zeros(traj_test.tstamps.shape)]
-    ref_indices, test_indices = kd_matcher(ref=tstamps_ref_2d, test=tstamps_test_2d, max_distance=max_distance)
+    _check_reference_index(reference_index, traj_ref)
+    ref_indices, test_indices = temporal_matcher(
+        ref=traj_ref.tstamps, test=traj_test.tstamps, max_distance=max_distance, reference_index=reference_index
+    )
     logger.info("Found %i temporal matches", len(ref_indices))
     return traj_test.apply_index(test_indices), traj_ref.apply_index(ref_indices)
 
 
 def match_trajectories_spatial(
-    traj_test: Trajectory, traj_ref: Trajectory, max_distance: float = 0.0
+    traj_test: Trajectory,
+    traj_ref: Trajectory,
+    max_distance: float = 0.0,
+    reference_index: Union[ReferenceIndex, None] = None,
 ) -> Tuple[Trajectory, Trajectory]:
     """This method matches both trajectories spatially
 
@@ -129,22 +166,37 @@ def match_trajectories_spatial(
         max_distance (float, optional): Maximum distance between two poses.
                                         Defaults to None. This means all
                                         matches are accepted.
+        reference_index (ReferenceIndex, optional): Index of the reference trajectory.
 
     Returns:
         Tuple[Trajectory, Trajectory]: Matched trajectories
     """
-    ref_indices, test_indices = kd_matcher(ref=traj_ref.pos.xyz, test=traj_test.pos.xyz, max_distance=max_distance)
+    _check_reference_index(reference_index, traj_ref)
+    ref_indices, test_indices = kd_matcher(
+        ref=traj_ref.pos.xyz,
+        test=traj_test.pos.xyz,
+        max_distance=max_distance,
+        kd_tree=None if reference_index is None else reference_index.kd_tree,
+    )
     logger.info("Found %i spatial matches", len(ref_indices))
     return traj_test.apply_index(test_indices), traj_ref.apply_index(ref_indices)
 
 
 def match_trajectories_spatial_interpolation(
-    traj_test: Trajectory, traj_ref: Trajectory, max_distance: float = 0.0, k_nearest: int = 10
+    traj_test: Trajectory,
+    traj_ref: Trajectory,
+    max_distance: float = 0.0,
+    k_nearest: int = 10,
+    reference_index: Union[ReferenceIndex, None] = None,
 ) -> Tuple[Trajectory, Trajectory]:
     """This method matches both trajectories spatially by requesting
-    the nearest two poses from the reference trajectory for each pose in the
-    test trajectory. Then, an interpolation is performed between the two
-    nearest poses.
+    the k nearest poses from the reference trajectory for each pose in the
+    test trajectory. Then, the test position is projected onto a line
+    fitted through these poses. Timestamps and rotations are interpolated
+    between the two nearest poses at the location of the projection.
+
+    The lines of all poses are fitted at once in chunks of
+    SPATIAL_INTERPOLATION_CHUNK_SIZE poses.
 
     After this operation, both trajectories will have the length of the
     test trajectory. This means, that the reference trajectory may be
@@ -158,69 +210,118 @@ def match_trajectories_spatial_interpolation(
                                         matches are accepted.
         k_nearest (int, optional): Number of nearest poses to request from
                                    the reference trajectory. Defaults to 10.
+        reference_index (ReferenceIndex, optional): Index of the reference trajectory.
 
     Returns:
         Tuple[Trajectory, Trajectory]: Matched trajectories
     """
+    if k_nearest < 2:
+        raise ValueError("At least two nearest poses are required for the interpolation!")
+
+    _check_reference_index(reference_index, traj_ref)
     test_xyz = traj_test.pos.xyz
     ref_xyz = traj_ref.pos.xyz
+    kd_tree = KDTree(ref_xyz) if reference_index is None else reference_index.kd_tree
 
     if max_distance == 0:
-        distances, closest_indices = KDTree(ref_xyz).query(test_xyz, k=k_nearest, workers=-1)
+        distances, closest_indices = kd_tree.query(test_xyz, k=k_nearest, workers=-1)
     else:
-        distances, closest_indices = KDTree(ref_xyz).query(
+        distances, closest_indices = kd_tree.query(
             test_xyz, k=k_nearest, workers=-1, distance_upper_bound=max_distance
         )
 
-    if np.isinf(distances).all():
+    distance_filter = np.isfinite(distances).all(axis=1)
+
+    if not distance_filter.any():
         raise ValueError("No matches found!")
 
-    matched_ref_pos = []
-    matched_test_pos = []
-    for i, (dists, idxs) in enumerate(zip(distances, closest_indices)):
-        if any(np.isinf(dists)):
-            continue
+    test_indices = np.flatnonzero(distance_filter)
+    closest_indices = closest_indices[distance_filter]
 
-        test_pos = test_xyz[i, :]
+    line_points = np.zeros((len(test_indices), 3))
+    weights = np.zeros(len(test_indices))
+    for start in range(0, len(test_indices), SPATIAL_INTERPOLATION_CHUNK_SIZE):
+        chunk = slice(start, start + SPATIAL_INTERPOLATION_CHUNK_SIZE)
+        line_points[chunk], weights[chunk] = _interpolate_on_lines(
+            ref_xyz=ref_xyz, test_xyz=test_xyz[test_indices[chunk]], closest_indices=closest_indices[chunk]
+        )
 
-        fit_line = Line3D.from_points(ref_xyz[idxs, :])
-        line_point = fit_line.evaluate_at(test_pos)
+    nearest, second_nearest = closest_indices[:, 0], closest_indices[:, 1]
+    ref_tstamps = traj_ref.tstamps
+    matched_ref_tstamps = ref_tstamps[nearest] + weights * (ref_tstamps[second_nearest] - ref_tstamps[nearest])
 
-        matched_test_pos.append(test_pos)
-        matched_ref_pos.append(line_point)
+    if traj_ref.rot is None:
+        matched_ref_rot = None
+    else:
+        ref_quat = traj_ref.rot.as_quat()
+        matched_ref_rot = RotationSet.from_quat(slerp(ref_quat[nearest], ref_quat[second_nearest], weights))
 
-    traj_test = Trajectory(
-        name=traj_test.name,
-        pos=PointSet(np.array(matched_test_pos), local_transformer=traj_test.pos.local_transformer),
-    )
+    traj_test = traj_test.apply_index(test_indices)
     traj_ref = Trajectory(
         name=traj_ref.name,
-        pos=PointSet(np.array(matched_ref_pos), local_transformer=traj_ref.pos.local_transformer),
+        pos=PointSet(line_points, local_transformer=traj_ref.pos.local_transformer),
+        rot=matched_ref_rot,
+        tstamps=matched_ref_tstamps,
     )
 
+    logger.info("Found %i spatial matches", len(test_indices))
     return traj_test, traj_ref
 
 
-def kd_matcher(ref: np.ndarray, test: np.ndarray, max_distance: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+def _interpolate_on_lines(
+    ref_xyz: np.ndarray, test_xyz: np.ndarray, closest_indices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Projects test positions onto lines fitted through their nearest reference positions
+
+    Args:
+        ref_xyz (np.ndarray): Reference positions
+        test_xyz (np.ndarray): Test positions [m x 3]
+        closest_indices (np.ndarray): Indices of the nearest reference positions
+                                      sorted by distance [m x k]
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Projected positions [m x 3] and interpolation
+                                       weights between the two nearest reference
+                                       positions at the projections [m]
+    """
+    neighbors = ref_xyz[closest_indices]
+    means, directions = fit_lines(neighbors)
+
+    line_params = np.einsum("ni,ni->n", test_xyz - means, directions)
+    nearest_params = np.einsum("nki,ni->nk", neighbors[:, :2] - means[:, None, :], directions)
+
+    param_diffs = nearest_params[:, 1] - nearest_params[:, 0]
+    valid = param_diffs != 0
+    weights = np.zeros(len(test_xyz))
+    weights[valid] = np.clip((line_params[valid] - nearest_params[valid, 0]) / param_diffs[valid], 0, 1)
+
+    return means + line_params[:, None] * directions, weights
+
+
+def kd_matcher(
+    ref: np.ndarray, test: np.ndarray, max_distance: float = 0.0, kd_tree: Union[KDTree, None] = None
+) -> Tuple[np.ndarray, np.ndarray]:
     """This method matches data using a KDTree
 
     Args:
         ref (np.ndarray): Reference data
         test (np.ndarray): Test data
         max_distance (float): Maximum distance for a match
+        kd_tree (KDTree, optional): KDTree of the reference data. Built if not given.
 
     Returns:
         Tuple[np.ndarray, np.ndarray]: Matched indices
     """
+    kd_tree = KDTree(ref) if kd_tree is None else kd_tree
+
     if max_distance == 0:
-        distances, closest_indices = KDTree(ref).query(test, k=1, workers=-1)
+        distances, closest_indices = kd_tree.query(test, k=1, workers=-1)
     else:
-        distances, closest_indices = KDTree(ref).query(test, k=1, workers=-1, distance_upper_bound=max_distance)
+        distances, closest_indices = kd_tree.query(test, k=1, workers=-1, distance_upper_bound=max_distance)
 
     logger.info("Mean matching distance %.3f", np.mean(distances))
 
-    distance_index_matrix = np.array([[not np.isinf(dist), index] for index, dist in enumerate(distances)], dtype=int)
-    distance_filter = distance_index_matrix[:, 0].astype(bool)
+    distance_filter = np.isfinite(distances)
 
     if not distance_filter.any():
         raise ValueError("No matches found!")
@@ -229,21 +330,177 @@ def kd_matcher(ref: np.ndarray, test: np.ndarray, max_distance: float = 0.0) ->
 
     return (
         closest_indices[distance_filter][unique_indices],
-        distance_index_matrix[distance_filter, 1][unique_indices],
+        np.flatnonzero(distance_filter)[unique_indices],
     )
 
 
-def rough_timestamp_matching(traj_ref: Trajectory, traj_test: Trajectory, max_distance: float = 0.0) -> float:
+def temporal_matcher(
+    ref: np.ndarray,
+    test: np.ndarray,
+    max_distance: float = 0.0,
+    reference_index: Union[ReferenceIndex, None] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """This method matches timestamps to their nearest reference timestamps
+
+    In contrast to the kd_matcher, no tree is built. Instead, the sorted
+    reference timestamps are searched for each test timestamp and the
+    closer one of both neighbors is chosen (the earlier one in case of
+    a tie). The semantics are the same as for the kd_matcher: Matches
+    must be closer than max_distance (all matches are accepted if it is 0)
+    and each reference timestamp is matched to the first test timestamp
+    only.
+
+    Args:
+        ref (np.ndarray): Reference timestamps
+        test (np.ndarray): Test timestamps
+        max_distance (float): Maximum time difference for a match
+        reference_index (ReferenceIndex, optional): Index of the reference timestamps.
+                                                    Provides the sorted reference timestamps.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Matched indices sorted by reference index
+    """
+    ref = np.asarray(ref, dtype=float)
+    test = np.asarray(test, dtype=float)
+
+    if len(ref) == 0 or len(test) == 0:
+        raise ValueError("No matches found!")
+
+    if reference_index is None:
+        ref_order = time_order(ref)
+        sorted_ref = ref if ref_order is None else ref[ref_order]
+    else:
+        ref_order, sorted_ref = reference_index.time_order, reference_index.sorted_tstamps
+
+    if ref_order is None and _is_sorted(test):
+        ref_indices, test_indices = next(
+            iter_temporal_matches(ref=sorted_ref, test_chunks=[test], max_distance=max_distance)
+        )
+    else:
+        test_order = np.argsort(test, kind="stable")
+        closest_indices, distance_filter = _match_sorted(
+            sorted_ref=sorted_ref, test=test[test_order], max_distance=max_distance
+        )
+        closest_indices = closest_indices[distance_filter]
+        candidates = test_order[distance_filter]
+
+        # matches of the sorted test timestamps are sorted by reference, keep the first test index of each reference
+        group_starts = np.flatnonzero(np.r_[True, closest_indices[1:] != closest_indices[:-1]])[: len(candidates)]
+        test_indices = np.minimum.reduceat(candidates, group_starts) if len(candidates) > 0 else candidates
+        ref_indices = closest_indices[group_starts]
+
+        if ref_order is not None:
+            ref_indices = ref_order[ref_indices]
+            ref_index_order = np.argsort(ref_indices)
+            ref_indices, test_indices = ref_indices[ref_index_order], test_indices[ref_index_order]
+
+    if len(ref_indices) == 0:
+        raise ValueError("No matches found!")
+
+    logger.info("Mean matching distance %.3f", np.mean(np.abs(ref[ref_indices] - test[test_indices])))
+    return ref_indices, test_indices
+
+
+def iter_temporal_matches(
+    ref: np.ndarray, test_chunks: Iterable[np.ndarray], max_distance: float = 0.0
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Matches chunks of sorted test timestamps to sorted reference timestamps
+
+    Streaming version of the temporal_matcher, e.g. for test timestamps
+    read using Trajectory.iter_file_chunks. Since both inputs are sorted,
+    the matched reference indices are non-decreasing and uniqueness can
+    be enforced by comparing each match with its predecessor, even across
+    chunk boundaries.
+
+    Args:
+        ref (np.ndarray): Sorted reference timestamps
+        test_chunks (Iterable[np.ndarray]): Consecutive chunks of sorted test timestamps
+        max_distance (float): Maximum time difference for a match
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: Matched reference indices and test indices
+                                       (counted from the start of the first chunk)
+                                       for each chunk
+    """
+    ref = np.asarray(ref, dtype=float)
+
+    if not _is_sorted(ref):
+        raise ValueError("Reference timestamps must be sorted!")
+
+    offset = 0
+    last_tstamp = -np.inf
+    last_ref_index = -1
+    for chunk in test_chunks:
+        chunk = np.asarray(chunk, dtype=float)
+
+        if len(chunk) > 0 and (chunk[0] < last_tstamp or not _is_sorted(chunk)):
+            raise ValueError("Test timestamps must be sorted!")
+
+        closest_indices, distance_filter = _match_sorted(sorted_ref=ref, test=chunk, max_distance=max_distance)
+        test_indices = np.flatnonzero(distance_filter)
+        ref_indices = closest_indices[test_indices]
+
+        first_match = np.r_[last_ref_index, ref_indices[:-1]] != ref_indices
+        if len(ref_indices) > 0:
+            last_ref_index = ref_indices[-1]
+
+        if len(chunk) > 0:
+            last_tstamp = chunk[-1]
+
+        yield ref_indices[first_match], test_indices[first_match] + offset
+        offset += len(chunk)
+
+
+def _match_sorted(sorted_ref: np.ndarray, test: np.ndarray, max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the indices of the nearest sorted reference timestamps and a filter for valid matches"""
+    upper = np.searchsorted(sorted_ref, test)
+    lower = np.maximum(upper - 1, 0)
+    upper = np.minimum(upper, len(sorted_ref) - 1)
+
+    distances_lower = np.abs(test - sorted_ref[lower])
+    distances_upper = np.abs(sorted_ref[upper] - test)
+    use_upper = distances_upper < distances_lower
+
+    closest_indices = np.where(use_upper, upper, lower)
+
+    if max_distance == 0:
+        return closest_indices, np.ones(len(test), dtype=bool)
+
+    return closest_indices, np.where(use_upper, distances_upper, distances_lower) < max_distance
+
+
+def _check_reference_index(reference_index: Union[ReferenceIndex, None], traj_ref: Trajectory) -> None:
+    if reference_index is None:
+        return
+
+    if len(reference_index) != len(traj_ref) or reference_index.key != traj_ref.content_hash:
+        raise ValueError("Reference index does not match the reference trajectory!")
+
+
+def _is_sorted(tstamps: np.ndarray) -> bool:
+    return bool(np.all(tstamps[1:] >= tstamps[:-1]))
+
+
+def rough_timestamp_matching(
+    traj_ref: Trajectory,
+    traj_test: Trajectory,
+    max_distance: float = 0.0,
+    reference_index: Union[ReferenceIndex, None] = None,
+) -> float:
     """This method roughly matches two trajectories temporally
     Args:
         traj_from (Trajectory): Test trajectory
         traj_to (Trajectory): Reference trajectory
+        reference_index (ReferenceIndex, optional): Index of the reference trajectory.
 
     Returns:
         float: Mean time offset
     """
     traj_test, traj_ref = match_trajectories_spatial(
-        traj_test=traj_test.copy(), traj_ref=traj_ref.copy(), max_distance=max_distance
+        traj_test=traj_test.copy(),
+        traj_ref=traj_ref.copy(),
+        max_distance=max_distance,
+        reference_index=reference_index,
     )
     mean_time_offset = np.median(traj_ref.tstamps - traj_test.tstamps)
     logger.info("Median time offset: %.3f s", mean_time_offset)
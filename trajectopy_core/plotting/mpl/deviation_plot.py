@@ -326,11 +326,7 @@ def _plot_rpe_pos(figure_dict: Dict[Unit, Axes], devs: List[RPEResult]) -> None:
             continue
 
         violin_plot = figure_dict[dev.rpe_dev.pair_distance_unit].violinplot(
-            [
-                [val * dev.drift_factor for val in pos_list]
-                for pos_list in list(dev.rpe_dev.pos_dev.values())
-                if pos_list
-            ],
+            [pos_devs * dev.drift_factor for pos_devs in dev.rpe_dev.split_bins(dev.rpe_dev.pos_dev) if len(pos_devs)],
             positions=dev.mean_pair_distances,
             showmeans=True,
             widths=max(0.5, dev.step / 4),
@@ -354,9 +350,9 @@ def _plot_rpe_rot(figure_dict: Dict[Unit, Axes], devs: List[RPEResult]) -> None:
 
         violin_plot = figure_dict[dev.rpe_dev.pair_distance_unit].violinplot(
             [
-                list(np.rad2deg(rot_list) * dev.drift_factor)
-                for rot_list in list(dev.rpe_dev.rot_dev.values())
-                if rot_list
+                np.rad2deg(rot_devs) * dev.drift_factor
+                for rot_devs in dev.rpe_dev.split_bins(dev.rpe_dev.rot_dev)
+                if len(rot_devs)
             ],
             positions=dev.mean_pair_distances,
             showmeans=True,
@@ -7,8 +7,8 @@ mail@gtombrink.de
 import numpy as np
 import pandas as pd
 import plotly.express as px
-from plotly.offline import plot
 
+from trajectopy_core.plotting.plotly.utils import render_div
 from trajectopy_core.report.data import ATEReportData, ATEReportDataCollection
 
 
@@ -28,12 +28,12 @@ def to_pos_metrics_df(report_data_collection: ATEReportDataCollection) -> pd.Dat
             metrics,
             "Value",
             [
-                data.ate_result.pos_ate,
-                data.ate_result.pos_dev_min,
-                data.ate_result.pos_dev_max,
-                data.ate_result.pos_dev_median,
-                data.ate_result.pos_dev_rms,
-                data.ate_result.pos_dev_std,
+                data.metrics.pos_ate,
+                data.metrics.pos_dev_min,
+                data.metrics.pos_dev_max,
+                data.metrics.pos_dev_median,
+                data.metrics.pos_dev_rms,
+                data.metrics.pos_dev_std,
             ],
         )
 
@@ -56,12 +56,12 @@ def to_rot_metrics_df(report_data_collection: ATEReportDataCollection) -> pd.Dat
             metrics,
             "Value",
             [
-                np.rad2deg(data.ate_result.rot_ate),
-                np.rad2deg(data.ate_result.rot_dev_min),
-                np.rad2deg(data.ate_result.rot_dev_max),
-                np.rad2deg(data.ate_result.rot_dev_median),
-                np.rad2deg(data.ate_result.rot_dev_rms),
-                np.rad2deg(data.ate_result.rot_dev_std),
+                np.rad2deg(data.metrics.rot_ate),
+                np.rad2deg(data.metrics.rot_dev_min),
+                np.rad2deg(data.metrics.rot_dev_max),
+                np.rad2deg(data.metrics.rot_dev_median),
+                np.rad2deg(data.metrics.rot_dev_rms),
+                np.rad2deg(data.metrics.rot_dev_std),
             ],
         )
 
@@ -78,7 +78,7 @@ def render_multi_pos_bar_plot(report_data_collection: ATEReportDataCollection) -
         height=report_data_collection.items[0].settings.single_plot_height,
     )
     fig.update_yaxes(title_text=f"Value [{report_data_collection.items[0].ate_unit}]")
-    return plot(fig, output_type="div", config=report_data_collection.items[0].settings.single_plot_export.to_config())
+    return render_div(fig, config=report_data_collection.items[0].settings.single_plot_export.to_config())
 
 
 def render_pos_bar_plot(report_data: ATEReportData) -> str:
@@ -95,7 +95,7 @@ def render_multi_rot_bar_plot(report_data_collection: ATEReportDataCollection) -
         height=report_data_collection.items[0].settings.single_plot_height,
     )
     fig.update_yaxes(title_text=f"Value [{report_data_collection.items[0].settings.rot_unit}]")
-    return plot(fig, output_type="div", config=report_data_collection.items[0].settings.single_plot_export.to_config())
+    return render_div(fig, config=report_data_collection.items[0].settings.single_plot_export.to_config())
 
 
 def render_rot_bar_plot(report_data: ATEReportData) -> str:
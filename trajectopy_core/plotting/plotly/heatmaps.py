@@ -6,8 +6,8 @@ mail@gtombrink.de
 """
 import pandas as pd
 import plotly.express as px
-from plotly.offline import plot
 
+from trajectopy_core.plotting.plotly.utils import render_div
 from trajectopy_core.settings.report import ReportSettings
 
 
@@ -33,4 +33,4 @@ def render_heatmap(dataframe: pd.DataFrame, report_settings: ReportSettings = Re
 
     fig.update_layout(height=report_settings.single_plot_height)
 
-    return plot(fig, output_type="div", config=report_settings.single_plot_export.to_config())
+    return render_div(fig, config=report_settings.single_plot_export.to_config())
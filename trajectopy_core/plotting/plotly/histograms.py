@@ -6,8 +6,8 @@ mail@gtombrink.de
 """
 
 import plotly.graph_objects as go
-from plotly.offline import plot
 
+from trajectopy_core.plotting.plotly.utils import render_div
 from trajectopy_core.report.data import ATEReportData
 
 
@@ -38,7 +38,7 @@ def render_pos_devs(report_data: ATEReportData) -> str:
         bargap=report_data.settings.histogram_bargap,
         height=report_data.settings.single_plot_height,
     )
-    return plot(fig, output_type="div", config=report_data.settings.single_plot_export.to_config())
+    return render_div(fig, config=report_data.settings.single_plot_export.to_config())
 
 
 def render_rot_devs(report_data: ATEReportData) -> str:
@@ -75,4 +75,4 @@ def render_rot_devs(report_data: ATEReportData) -> str:
         height=report_data.settings.single_plot_height,
     )
 
-    return plot(fig, output_type="div", config=report_data.settings.single_plot_export.to_config())
+    return render_div(fig, config=report_data.settings.single_plot_export.to_config())
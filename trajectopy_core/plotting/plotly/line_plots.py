@@ -5,11 +5,10 @@ Gereon Tombrink, 2023
 mail@gtombrink.de
 """
 
-import numpy as np
 import plotly.graph_objects as go
-from plotly.offline import plot
 from plotly.subplots import make_subplots
 
+from trajectopy_core.plotting.plotly.utils import render_div
 from trajectopy_core.report.data import ATEReportData, RPEReportData
 
 
@@ -19,8 +18,7 @@ def render_dev_edf(report_data: ATEReportData) -> str:
     else:
         fig = make_subplots(rows=1, cols=1)
 
-    sorted_comb_pos_dev = np.sort(report_data.comb_dev_pos)
-    pos_norm_cdf = np.arange(len(sorted_comb_pos_dev)) / float(len(sorted_comb_pos_dev))
+    sorted_comb_pos_dev, pos_norm_cdf = report_data.edf_data(report_data.comb_dev_pos)
     fig.add_trace(
         go.Scattergl(x=sorted_comb_pos_dev, y=pos_norm_cdf, mode=report_data.settings.plot_mode, name="position"),
         row=1,
@@ -28,8 +26,7 @@ def render_dev_edf(report_data: ATEReportData) -> str:
     )
 
     if report_data.has_ate_rot:
-        sorted_comb_rot_dev = np.sort(report_data.comb_dev_rot)
-        rot_norm_cdf = np.arange(len(sorted_comb_rot_dev)) / float(len(sorted_comb_rot_dev))
+        sorted_comb_rot_dev, rot_norm_cdf = report_data.edf_data(report_data.comb_dev_rot)
         fig.add_trace(
             go.Scattergl(x=sorted_comb_rot_dev, y=rot_norm_cdf, mode=report_data.settings.plot_mode, name="rotation"),
             row=2,
@@ -49,41 +46,19 @@ def render_dev_edf(report_data: ATEReportData) -> str:
     fig.update_xaxes(title_text=f"[{report_data.ate_unit}]", row=1, col=1)
     fig.update_yaxes(title_text="CDF", row=1, col=1)
 
-    return plot(fig, output_type="div", config=config)
+    return render_div(fig, config=config)
 
 
 def render_pos_plot(report_data: ATEReportData) -> str:
     fig = make_subplots(rows=3, cols=1, shared_xaxes=True)
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.pos_x,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.pos_x_name,
-        ),
-        row=1,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.pos_y,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.pos_y_name,
-        ),
-        row=2,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.pos_z,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.pos_z_name,
-        ),
-        row=3,
-        col=1,
+    components = (
+        (report_data.pos_x, report_data.settings.pos_x_name),
+        (report_data.pos_y, report_data.settings.pos_y_name),
+        (report_data.pos_z, report_data.settings.pos_z_name),
     )
+    for row, (values, name) in enumerate(components, start=1):
+        x, y = report_data.line_data(values)
+        fig.add_trace(go.Scattergl(x=x, y=y, mode=report_data.settings.plot_mode, name=name), row=row, col=1)
 
     fig.update_layout(title="Position Components", height=report_data.settings.three_subplots_height)
 
@@ -92,41 +67,19 @@ def render_pos_plot(report_data: ATEReportData) -> str:
     fig.update_yaxes(title_text=f"[{report_data.settings.pos_y_unit}]", row=2, col=1)
     fig.update_yaxes(title_text=f"[{report_data.settings.pos_z_unit}]", row=3, col=1)
 
-    return plot(fig, output_type="div", config=report_data.settings.three_subplots_export.to_config())
+    return render_div(fig, config=report_data.settings.three_subplots_export.to_config())
 
 
 def render_rot_plot(report_data: ATEReportData) -> str:
     fig = make_subplots(rows=3, cols=1, shared_xaxes=True)
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.roll,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.rot_x_name,
-        ),
-        row=1,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.pitch,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.rot_y_name,
-        ),
-        row=2,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.yaw,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.rot_z_name,
-        ),
-        row=3,
-        col=1,
+    components = (
+        (report_data.roll, report_data.settings.rot_x_name),
+        (report_data.pitch, report_data.settings.rot_y_name),
+        (report_data.yaw, report_data.settings.rot_z_name),
     )
+    for row, (values, name) in enumerate(components, start=1):
+        x, y = report_data.line_data(values)
+        fig.add_trace(go.Scattergl(x=x, y=y, mode=report_data.settings.plot_mode, name=name), row=row, col=1)
 
     fig.update_layout(title="Rotation Components", height=report_data.settings.three_subplots_height)
 
@@ -135,41 +88,19 @@ def render_rot_plot(report_data: ATEReportData) -> str:
     fig.update_yaxes(title_text=f"[{report_data.settings.rot_unit}]", row=2, col=1)
     fig.update_yaxes(title_text=f"[{report_data.settings.rot_unit}]", row=3, col=1)
 
-    return plot(fig, output_type="div", config=report_data.settings.three_subplots_export.to_config())
+    return render_div(fig, config=report_data.settings.three_subplots_export.to_config())
 
 
 def render_dev_pos_plot(report_data: ATEReportData) -> str:
     fig = make_subplots(rows=3, cols=1, shared_xaxes=True)
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.pos_dev_x,
-            mode=report_data.settings.plot_mode,
-            name=report_data.pos_dev_x_name,
-        ),
-        row=1,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.pos_dev_y,
-            mode=report_data.settings.plot_mode,
-            name=report_data.pos_dev_y_name,
-        ),
-        row=2,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.pos_dev_z,
-            mode=report_data.settings.plot_mode,
-            name=report_data.pos_dev_z_name,
-        ),
-        row=3,
-        col=1,
+    components = (
+        (report_data.pos_dev_x, report_data.pos_dev_x_name),
+        (report_data.pos_dev_y, report_data.pos_dev_y_name),
+        (report_data.pos_dev_z, report_data.pos_dev_z_name),
     )
+    for row, (values, name) in enumerate(components, start=1):
+        x, y = report_data.line_data(values)
+        fig.add_trace(go.Scattergl(x=x, y=y, mode=report_data.settings.plot_mode, name=name), row=row, col=1)
 
     fig.update_layout(title="Position Deviations per Direction", height=report_data.settings.three_subplots_height)
 
@@ -178,42 +109,19 @@ def render_dev_pos_plot(report_data: ATEReportData) -> str:
     fig.update_yaxes(title_text=f"[{report_data.ate_unit}]", row=2, col=1)
     fig.update_yaxes(title_text=f"[{report_data.ate_unit}]", row=3, col=1)
 
-    return plot(fig, output_type="div", config=report_data.settings.three_subplots_export.to_config())
+    return render_div(fig, config=report_data.settings.three_subplots_export.to_config())
 
 
 def render_dev_rot_plot(report_data: ATEReportData) -> str:
     fig = make_subplots(rows=3, cols=1, shared_xaxes=True)
-
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.rot_dev_x,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.rot_x_name,
-        ),
-        row=1,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.rot_dev_y,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.rot_y_name,
-        ),
-        row=2,
-        col=1,
-    )
-    fig.add_trace(
-        go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.rot_dev_z,
-            mode=report_data.settings.plot_mode,
-            name=report_data.settings.rot_z_name,
-        ),
-        row=3,
-        col=1,
+    components = (
+        (report_data.rot_dev_x, report_data.settings.rot_x_name),
+        (report_data.rot_dev_y, report_data.settings.rot_y_name),
+        (report_data.rot_dev_z, report_data.settings.rot_z_name),
     )
+    for row, (values, name) in enumerate(components, start=1):
+        x, y = report_data.line_data(values)
+        fig.add_trace(go.Scattergl(x=x, y=y, mode=report_data.settings.plot_mode, name=name), row=row, col=1)
 
     fig.update_layout(title="Rotation Deviations per Axis", height=report_data.settings.three_subplots_height)
     fig.update_xaxes(title_text=report_data.function_of_label, row=3, col=1)
@@ -221,7 +129,7 @@ def render_dev_rot_plot(report_data: ATEReportData) -> str:
     fig.update_yaxes(title_text=f"[{report_data.settings.rot_unit}]", row=2, col=1)
     fig.update_yaxes(title_text=f"[{report_data.settings.rot_unit}]", row=3, col=1)
 
-    return plot(fig, output_type="div", config=report_data.settings.three_subplots_export.to_config())
+    return render_div(fig, config=report_data.settings.three_subplots_export.to_config())
 
 
 def render_dev_comb_plot(report_data: ATEReportData) -> str:
@@ -234,10 +142,11 @@ def render_dev_comb_plot(report_data: ATEReportData) -> str:
         config = report_data.settings.single_plot_export.to_config()
         height = report_data.settings.single_plot_height
 
+    function_of, comb_dev_pos = report_data.line_data(report_data.comb_dev_pos)
     fig.add_trace(
         go.Scattergl(
-            x=report_data.function_of,
-            y=report_data.comb_dev_pos,
+            x=function_of,
+            y=comb_dev_pos,
             mode=report_data.settings.plot_mode,
             name="position",
         ),
@@ -246,10 +155,11 @@ def render_dev_comb_plot(report_data: ATEReportData) -> str:
     )
 
     if report_data.has_ate_rot:
+        function_of, comb_dev_rot = report_data.line_data(report_data.comb_dev_rot)
         fig.add_trace(
             go.Scattergl(
-                x=report_data.function_of,
-                y=report_data.comb_dev_rot,
+                x=function_of,
+                y=comb_dev_rot,
                 mode=report_data.settings.plot_mode,
                 name="rotation",
             ),
@@ -263,7 +173,7 @@ def render_dev_comb_plot(report_data: ATEReportData) -> str:
     fig.update_xaxes(title_text=report_data.function_of_label, row=2 if report_data.has_ate_rot else 1, col=1)
     fig.update_yaxes(title_text=f"[{report_data.ate_unit}]", row=1, col=1)
 
-    return plot(fig, output_type="div", config=config)
+    return render_div(fig, config=config)
 
 
 def render_rpe(report_data: RPEReportData) -> str:
@@ -272,15 +182,16 @@ def render_rpe(report_data: RPEReportData) -> str:
         return ""
 
     fig = make_subplots(rows=2, cols=1, shared_xaxes=True)
+    pair_distances, pos_dev_mean, pos_std = report_data.pos_drift
     fig.add_trace(
         go.Scattergl(
-            x=rpe_result.mean_pair_distances,
-            y=rpe_result.pos_dev_mean,
+            x=pair_distances,
+            y=pos_dev_mean,
             mode=report_data.settings.plot_mode,
             name="position",
             error_y=dict(
                 type="data",
-                array=rpe_result.pos_std,
+                array=pos_std,
                 visible=True,
             ),
         ),
@@ -289,15 +200,16 @@ def render_rpe(report_data: RPEReportData) -> str:
     )
 
     if rpe_result.has_rot_dev:
+        pair_distances, rot_dev_mean, rot_std = report_data.rot_drift
         fig.add_trace(
             go.Scattergl(
-                x=rpe_result.mean_pair_distances,
-                y=np.rad2deg(rpe_result.rot_dev_mean),
+                x=pair_distances,
+                y=rot_dev_mean,
                 mode=report_data.settings.plot_mode,
                 name="rotation",
                 error_y=dict(
                     type="data",
-                    array=np.rad2deg(rpe_result.rot_std),
+                    array=rot_std,
                     visible=True,
                 ),
             ),
@@ -318,4 +230,4 @@ def render_rpe(report_data: RPEReportData) -> str:
         title_text=f"Pose Distance [{rpe_result.pair_distance_unit}]", row=2 if rpe_result.has_rot_dev else 1, col=1
     )
 
-    return plot(fig, output_type="div", config=config)
+    return render_div(fig, config=config)
@@ -6,16 +6,20 @@ mail@gtombrink.de
 """
 
 import itertools
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.offline import plot
 from plotly.subplots import make_subplots
 
+from trajectopy_core.plotting.plotly.utils import render_div
 from trajectopy_core.plotting.utils import derive_xlabel_from_sortings, get_axis_label
-from trajectopy_core.report.data import ATEReportDataCollection, RPEReportDataCollection
+from trajectopy_core.report.data import (
+    ATEReportData,
+    ATEReportDataCollection,
+    RPEReportDataCollection,
+)
 from trajectopy_core.settings.report import ReportSettings
 from trajectopy_core.trajectory import Trajectory
 
@@ -45,8 +49,7 @@ def render_dev_edf(report_data_collection: ATEReportDataCollection) -> str:
     fig, config = setup_edf_axis(report_data_collection)
 
     for data, color in zip(report_data_collection.items, itertools.cycle(px.colors.qualitative.Plotly)):
-        sorted_comb_pos_dev = np.sort(data.comb_dev_pos)
-        pos_norm_cdf = np.arange(len(sorted_comb_pos_dev)) / float(len(sorted_comb_pos_dev))
+        sorted_comb_pos_dev, pos_norm_cdf = data.edf_data(data.comb_dev_pos)
         fig.add_trace(
             go.Scattergl(
                 x=sorted_comb_pos_dev,
@@ -60,8 +63,7 @@ def render_dev_edf(report_data_collection: ATEReportDataCollection) -> str:
         )
 
         if data.has_ate_rot:
-            sorted_comb_rot_dev = np.sort(data.comb_dev_rot)
-            rot_norm_cdf = np.arange(len(sorted_comb_rot_dev)) / float(len(sorted_comb_rot_dev))
+            sorted_comb_rot_dev, rot_norm_cdf = data.edf_data(data.comb_dev_rot)
             fig.add_trace(
                 go.Scattergl(
                     x=sorted_comb_rot_dev,
@@ -74,7 +76,7 @@ def render_dev_edf(report_data_collection: ATEReportDataCollection) -> str:
                 row=2,
                 col=1,
             )
-    return plot(fig, output_type="div", config=config)
+    return render_div(fig, config=config)
 
 
 def setup_dev_comb_axis(report_data_collection: ATEReportDataCollection) -> Tuple[go.Figure, dict]:
@@ -99,16 +101,28 @@ def setup_dev_comb_axis(report_data_collection: ATEReportDataCollection) -> Tupl
     return fig, config
 
 
+def decimate_lines(
+    report_data: ATEReportData, values: List[Optional[np.ndarray]]
+) -> Tuple[List[Optional[np.ndarray]], List[Optional[np.ndarray]]]:
+    """Decimates the lines of one report data item and returns the x and y values per subplot"""
+    lines = [report_data.line_data(item) if item is not None else (None, None) for item in values]
+    return [x for x, _ in lines], [y for _, y in lines]
+
+
 def render_dev_comb_plot(report_data_collection: ATEReportDataCollection) -> str:
     report_data = report_data_collection.items[0]
 
     any_rot_available = any(data.has_ate_rot for data in report_data_collection.items)
 
-    y_data = (
-        [[data.comb_dev_pos, data.comb_dev_rot if data.has_ate_rot else None] for data in report_data_collection.items]
-        if any_rot_available
-        else [[data.comb_dev_pos] for data in report_data_collection.items]
-    )
+    lines = [
+        decimate_lines(
+            data,
+            [data.comb_dev_pos, data.comb_dev_rot if data.has_ate_rot else None]
+            if any_rot_available
+            else [data.comb_dev_pos],
+        )
+        for data in report_data_collection.items
+    ]
 
     y_labels = (
         [f"[{report_data.ate_unit}]", f"[{report_data.settings.rot_unit}]"]
@@ -117,8 +131,8 @@ def render_dev_comb_plot(report_data_collection: ATEReportDataCollection) -> str
     )
 
     return render_shared_x_plot(
-        x_data=[data.function_of for data in report_data_collection.items],
-        y_data=y_data,
+        x_data=[x_data for x_data, _ in lines],
+        y_data=[y_data for _, y_data in lines],
         names=[data.short_name for data in report_data_collection.items],
         x_label=report_data.function_of_label,
         y_labels=y_labels,
@@ -130,9 +144,13 @@ def render_dev_comb_plot(report_data_collection: ATEReportDataCollection) -> str
 def render_dev_pos_plot(report_data_collection: ATEReportDataCollection) -> str:
     report_data = report_data_collection.items[0]
 
+    lines = [
+        decimate_lines(data, [data.pos_dev_x, data.pos_dev_y, data.pos_dev_z]) for data in report_data_collection.items
+    ]
+
     return render_shared_x_plot(
-        x_data=[data.function_of for data in report_data_collection.items],
-        y_data=[[data.pos_dev_x, data.pos_dev_y, data.pos_dev_z] for data in report_data_collection.items],
+        x_data=[x_data for x_data, _ in lines],
+        y_data=[y_data for _, y_data in lines],
         names=[data.short_name for data in report_data_collection.items],
         x_label=report_data.function_of_label,
         y_labels=[
@@ -148,14 +166,13 @@ def render_dev_pos_plot(report_data_collection: ATEReportDataCollection) -> str:
 def render_dev_rot_plot(report_data_collection: ATEReportDataCollection) -> str:
     report_data = report_data_collection.items[0]
 
+    rot_items = [data for data in report_data_collection.items if data.has_ate_rot]
+    lines = [decimate_lines(data, [data.rot_dev_x, data.rot_dev_y, data.rot_dev_z]) for data in rot_items]
+
     return render_shared_x_plot(
-        x_data=[data.function_of for data in report_data_collection.items],
-        y_data=[
-            [data.rot_dev_x, data.rot_dev_y, data.rot_dev_z]
-            for data in report_data_collection.items
-            if data.has_ate_rot
-        ],
-        names=[data.short_name for data in report_data_collection.items],
+        x_data=[x_data for x_data, _ in lines],
+        y_data=[y_data for _, y_data in lines],
+        names=[data.short_name for data in rot_items],
         x_label=report_data.function_of_label,
         y_labels=[
             f"{report_data.settings.rot_x_name} [{report_data.settings.rot_unit}]",
@@ -195,15 +212,16 @@ def render_rpe(report_data_collection: RPEReportDataCollection) -> str:
     for data, color in zip(report_data_collection.items, itertools.cycle(px.colors.qualitative.Plotly)):
         rpe_result = data.rpe_result
 
+        pair_distances, pos_dev_mean, pos_std = data.pos_drift
         fig.add_trace(
             go.Scattergl(
-                x=rpe_result.mean_pair_distances,
-                y=rpe_result.pos_dev_mean,
+                x=pair_distances,
+                y=pos_dev_mean,
                 mode=data.settings.plot_mode,
                 name=f"{data.short_name}",
                 error_y=dict(
                     type="data",
-                    array=rpe_result.pos_std,
+                    array=pos_std,
                     visible=True,
                 ),
                 marker=dict(color=color),
@@ -213,15 +231,16 @@ def render_rpe(report_data_collection: RPEReportDataCollection) -> str:
         )
 
         if rpe_result.has_rot_dev:
+            pair_distances, rot_dev_mean, rot_std = data.rot_drift
             fig.add_trace(
                 go.Scattergl(
-                    x=rpe_result.mean_pair_distances,
-                    y=np.rad2deg(rpe_result.rot_dev_mean),
+                    x=pair_distances,
+                    y=rot_dev_mean,
                     mode=data.settings.plot_mode,
                     name=f"{data.short_name}",
                     error_y=dict(
                         type="data",
-                        array=np.rad2deg(rpe_result.rot_std),
+                        array=rot_std,
                         visible=True,
                     ),
                     marker=dict(color=color),
@@ -231,7 +250,7 @@ def render_rpe(report_data_collection: RPEReportDataCollection) -> str:
                 col=1,
             )
 
-    return plot(fig, output_type="div", config=config)
+    return render_div(fig, config=config)
 
 
 def render_pos_plot(trajectories: List[Trajectory], report_settings: ReportSettings = ReportSettings()) -> str:
@@ -266,7 +285,7 @@ def render_rot_plot(trajectories: List[Trajectory], report_settings: ReportSetti
 
 
 def render_shared_x_plot(
-    x_data: List[np.ndarray],
+    x_data: List[Union[np.ndarray, List[Union[np.ndarray, None]]]],
     y_data: List[List[Union[np.ndarray, None]]],
     names: List[str],
     x_label: str,
@@ -296,7 +315,7 @@ def render_shared_x_plot(
 
             fig.add_trace(
                 go.Scattergl(
-                    x=x_data_item,
+                    x=x_data_item[i] if isinstance(x_data_item, list) else x_data_item,
                     y=y_data_subitem,
                     mode=report_settings.plot_mode,
                     name=name,
@@ -313,4 +332,4 @@ def render_shared_x_plot(
         3: report_settings.three_subplots_export.to_config(),
     }
 
-    return plot(fig, output_type="div", config=config_dicts[len(y_labels)])
+    return render_div(fig, config=config_dicts[len(y_labels)])
@@ -9,8 +9,8 @@ from typing import List, Tuple, Union
 
 import numpy as np
 import plotly.graph_objects as go
-from plotly.offline import plot
 
+from trajectopy_core.plotting.plotly.utils import render_div
 from trajectopy_core.plotting.utils import get_axis_label
 from trajectopy_core.report.data import ATEReportData
 from trajectopy_core.settings.report import ReportSettings
@@ -81,7 +81,7 @@ def render_trajectories_mapbox(trajectories: List[Trajectory], report_settings:
         height=report_settings.single_plot_height,
     )
 
-    return plot(fig, output_type="div", config=report_settings.single_plot_export.to_config())
+    return render_div(fig, config=report_settings.single_plot_export.to_config())
 
 
 def scatter_plot(
@@ -141,7 +141,7 @@ def scatter_plot(
         scaleratio=1,
     )
 
-    return plot(fig, output_type="div", config=report_settings.single_plot_export.to_config())
+    return render_div(fig, config=report_settings.single_plot_export.to_config())
 
 
 def get_marker_dict(
@@ -162,10 +162,10 @@ def get_marker_dict(
 
 
 def render_pos_devs(report_data: ATEReportData) -> str:
-    comb_pos_devs = report_data.comb_dev_pos
+    pos, comb_pos_devs = report_data.scatter_data(report_data.comb_dev_pos)
 
     return scatter_plot(
-        pos=np.c_[report_data.pos_x, report_data.pos_y, report_data.pos_z],
+        pos=pos,
         colors=comb_pos_devs,
         report_settings=report_data.settings,
         figure_title="Position Deviations",
@@ -174,9 +174,11 @@ def render_pos_devs(report_data: ATEReportData) -> str:
 
 
 def render_pos_x_devs(report_data: ATEReportData) -> str:
+    pos, colors = report_data.scatter_data(report_data.pos_dev_x)
+
     return scatter_plot(
-        pos=np.c_[report_data.pos_x, report_data.pos_y, report_data.pos_z],
-        colors=report_data.pos_dev_x,
+        pos=pos,
+        colors=colors,
         report_settings=report_data.settings,
         figure_title=f"{report_data.pos_dev_x_name.capitalize()} Deviations",
         colorbar_title=f"{report_data.settings.pos_x_name} [{report_data.ate_unit}]",
@@ -184,9 +186,11 @@ def render_pos_x_devs(report_data: ATEReportData) -> str:
 
 
 def render_pos_y_devs(report_data: ATEReportData) -> str:
+    pos, colors = report_data.scatter_data(report_data.pos_dev_y)
+
     return scatter_plot(
-        pos=np.c_[report_data.pos_x, report_data.pos_y, report_data.pos_z],
-        colors=report_data.pos_dev_y,
+        pos=pos,
+        colors=colors,
         report_settings=report_data.settings,
         figure_title=f"{report_data.pos_dev_y_name.capitalize()} Deviations",
         colorbar_title=f"{report_data.settings.pos_y_name} [{report_data.ate_unit}]",
@@ -194,9 +198,11 @@ def render_pos_y_devs(report_data: ATEReportData) -> str:
 
 
 def render_pos_z_devs(report_data: ATEReportData) -> str:
+    pos, colors = report_data.scatter_data(report_data.pos_dev_z)
+
     return scatter_plot(
-        pos=np.c_[report_data.pos_x, report_data.pos_y, report_data.pos_z],
-        colors=report_data.pos_dev_z,
+        pos=pos,
+        colors=colors,
         report_settings=report_data.settings,
         figure_title=f"{report_data.pos_dev_z_name.capitalize()} Deviations",
         colorbar_title=f"{report_data.settings.pos_z_name} [{report_data.ate_unit}]",
@@ -204,9 +210,11 @@ def render_pos_z_devs(report_data: ATEReportData) -> str:
 
 
 def render_rot_x_devs(report_data: ATEReportData) -> str:
+    pos, colors = report_data.scatter_data(report_data.rot_dev_x)
+
     return scatter_plot(
-        pos=np.c_[report_data.pos_x, report_data.pos_y, report_data.pos_z],
-        colors=report_data.rot_dev_x,
+        pos=pos,
+        colors=colors,
         report_settings=report_data.settings,
         figure_title=f"{report_data.settings.rot_x_name.capitalize()} Deviations",
         colorbar_title=f"{report_data.settings.rot_x_name} [{report_data.settings.rot_unit}]",
@@ -214,9 +222,11 @@ def render_rot_x_devs(report_data: ATEReportData) -> str:
 
 
 def render_rot_y_devs(report_data: ATEReportData) -> str:
+    pos, colors = report_data.scatter_data(report_data.rot_dev_y)
+
     return scatter_plot(
-        pos=np.c_[report_data.pos_x, report_data.pos_y, report_data.pos_z],
-        colors=report_data.rot_dev_y,
+        pos=pos,
+        colors=colors,
         report_settings=report_data.settings,
         figure_title=f"{report_data.settings.rot_y_name.capitalize()} Deviations",
         colorbar_title=f"{report_data.settings.rot_y_name} [{report_data.settings.rot_unit}]",
@@ -224,9 +234,11 @@ def render_rot_y_devs(report_data: ATEReportData) -> str:
 
 
 def render_rot_z_devs(report_data: ATEReportData) -> str:
+    pos, colors = report_data.scatter_data(report_data.rot_dev_z)
+
     return scatter_plot(
-        pos=np.c_[report_data.pos_x, report_data.pos_y, report_data.pos_z],
-        colors=report_data.rot_dev_z,
+        pos=pos,
+        colors=colors,
         report_settings=report_data.settings,
         figure_title=f"{report_data.settings.rot_z_name.capitalize()} Deviations",
         colorbar_title=f"{report_data.settings.rot_z_name} [{report_data.settings.rot_unit}]",
@@ -234,10 +246,10 @@ def render_rot_z_devs(report_data: ATEReportData) -> str:
 
 
 def render_rot_devs(report_data: ATEReportData) -> str:
-    comb_rot_devs = report_data.comb_dev_rot
+    pos, comb_rot_devs = report_data.scatter_data(report_data.comb_dev_rot)
 
     return scatter_plot(
-        pos=np.c_[report_data.pos_x, report_data.pos_y, report_data.pos_z],
+        pos=pos,
         colors=comb_rot_devs,
         report_settings=report_data.settings,
         figure_title="Rotation Deviations",
@@ -304,4 +316,4 @@ def render_trajectories(trajectories: List[Trajectory], report_settings: ReportS
         scaleratio=1,
     )
 
-    return plot(fig, output_type="div", config=report_settings.single_plot_export.to_config())
+    return render_div(fig, config=report_settings.single_plot_export.to_config())
@@ -1,7 +1,7 @@
 import plotly.graph_objects as go
-from plotly.offline import plot
 
 from trajectopy_core.alignment.parameters import AlignmentParameters
+from trajectopy_core.plotting.plotly.utils import render_div
 from trajectopy_core.settings.report import ReportSettings
 
 
@@ -40,4 +40,4 @@ def render_alignment_table(
         )
     ]
     fig = go.Figure(data=alignment_data)
-    return plot(fig, output_type="div", config=report_settings.single_plot_export.to_config())
+    return render_div(fig, config=report_settings.single_plot_export.to_config())
@@ -0,0 +1,101 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+"""
+
+import base64
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs, get_plotlyjs_version, plot
+
+# arrays with fewer elements are written as JSON lists
+TYPED_ARRAY_MIN_SIZE = 64
+
+# first plotly.js version that decodes base64 encoded typed arrays
+TYPED_ARRAY_PLOTLYJS_VERSION = (2, 28, 0)
+
+TYPED_ARRAY_DTYPES = ("f4", "f8", "i1", "i2", "i4", "u1", "u2", "u4")
+
+
+@lru_cache(maxsize=1)
+def plotly_js() -> str:
+    """Returns the plotly.js library that is included once in the reports"""
+    return get_plotlyjs()
+
+
+@lru_cache(maxsize=1)
+def typed_arrays_supported() -> bool:
+    """Returns True if the bundled plotly.js decodes base64 encoded typed arrays"""
+    version = tuple(int(part) for part in get_plotlyjs_version().split(".")[:3])
+    return version >= TYPED_ARRAY_PLOTLYJS_VERSION
+
+
+def to_typed_array(array: np.ndarray) -> Dict[str, str]:
+    """
+    Encodes a one- or two-dimensional numeric array as plotly.js typed array.
+
+    Data types without typed array in JavaScript, e.g. int64, are
+    converted to float64.
+
+    Args:
+        array (np.ndarray): Numeric array
+
+    Returns:
+        Dict[str, str]: Typed array specification with data type, base64 data and shape
+    """
+    dtype = f"{array.dtype.kind}{array.dtype.itemsize}"
+    if dtype not in TYPED_ARRAY_DTYPES:
+        dtype = "f8"
+
+    data = np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder("<"))
+    typed_array = {"dtype": dtype, "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+
+    if array.ndim == 2:
+        typed_array["shape"] = f"{array.shape[0]}, {array.shape[1]}"
+
+    return typed_array
+
+
+def encode_arrays(value: Any) -> Any:
+    """Replaces the large numeric arrays of figure data by typed arrays"""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in "fiu" and value.ndim in (1, 2) and value.size >= TYPED_ARRAY_MIN_SIZE:
+            return to_typed_array(value)
+
+        return value
+
+    if isinstance(value, dict):
+        return {key: encode_arrays(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [encode_arrays(item) for item in value]
+
+    return value
+
+
+def render_div(fig: go.Figure, config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Renders a figure as HTML div without plotly.js.
+
+    The reports include plotly.js once using plotly_js. Large trace
+    arrays are written as base64 encoded typed arrays if supported by
+    plotly.js.
+
+    Args:
+        fig (go.Figure): Figure to render
+        config (Optional[Dict[str, Any]]): Plotly configuration
+
+    Returns:
+        str: HTML div of the figure
+    """
+    if not typed_arrays_supported():
+        return plot(fig, output_type="div", include_plotlyjs=False, config=config)
+
+    fig_dict = fig.to_dict()
+    fig_dict["data"] = encode_arrays(fig_dict["data"])
+    return plot(fig_dict, output_type="div", include_plotlyjs=False, config=config, validate=False)
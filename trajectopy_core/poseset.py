@@ -0,0 +1,124 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+"""
+
+from collections.abc import Sequence
+from typing import Iterator, Union
+
+import numpy as np
+
+
+def se3_inv(pose: np.ndarray) -> np.ndarray:
+    """Invert SE3 pose(s), either a single 4x4 pose or a stack of poses (Nx4x4)"""
+    rot_inv = np.swapaxes(pose[..., :3, :3], -1, -2)
+    trans_inv = -np.einsum("...ij,...j->...i", rot_inv, pose[..., :3, 3])
+
+    se3 = np.zeros_like(pose, dtype=float)
+    se3[..., :3, :3] = rot_inv
+    se3[..., :3, 3] = trans_inv
+    se3[..., 3, 3] = 1.0
+    return se3
+
+
+class PoseSet(Sequence):
+    """Class representing a set of SE3 poses
+
+    The poses are stored as a single contiguous Nx4x4 array so that
+    composition, inversion and transformation of points can be done
+    for all poses at once.
+
+    Indexing with a single integer returns the corresponding 4x4
+    matrix, all other indices return a new PoseSet. Iterating over a
+    PoseSet yields the 4x4 matrices, so that it can be used wherever
+    a list of 4x4 matrices is expected. np.asarray returns the Nx4x4
+    array.
+    """
+
+    # let numpy defer to PoseSet.__rmatmul__ for "ndarray @ PoseSet"
+    __array_ufunc__ = None
+
+    def __init__(self, matrices: np.ndarray) -> None:
+        matrices = np.asarray(matrices, dtype=float)
+
+        if matrices.ndim == 2:
+            matrices = matrices[None, :, :]
+
+        if matrices.ndim != 3 or matrices.shape[1:] != (4, 4):
+            raise ValueError(f"Poses must be of shape Nx4x4 (got {matrices.shape})")
+
+        self.matrices = matrices
+
+    @classmethod
+    def from_components(cls, xyz: np.ndarray, rot_matrices: Union[np.ndarray, None] = None) -> "PoseSet":
+        """
+        Creates poses from Nx3 positions and Nx3x3 rotation matrices
+
+        If no rotation matrices are given, identity rotations are used.
+        """
+        matrices = np.zeros((len(xyz), 4, 4))
+        matrices[:, :3, 3] = xyz
+        matrices[:, 3, 3] = 1.0
+
+        if rot_matrices is None:
+            matrices[:, [0, 1, 2], [0, 1, 2]] = 1.0
+        else:
+            matrices[:, :3, :3] = rot_matrices
+
+        return cls(matrices)
+
+    @classmethod
+    def identity(cls, num: int) -> "PoseSet":
+        """Returns num identity poses"""
+        return cls(np.tile(np.eye(4), (num, 1, 1)))
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return np.array(self.matrices, dtype=dtype, copy=True) if copy else np.asarray(self.matrices, dtype=dtype)
+
+    def __len__(self) -> int:
+        return len(self.matrices)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(self.matrices)
+
+    def __getitem__(self, index) -> Union[np.ndarray, "PoseSet"]:
+        if isinstance(index, (int, np.integer)):
+            return self.matrices[index]
+
+        return PoseSet(self.matrices[index])
+
+    def __matmul__(self, other: Union["PoseSet", np.ndarray]) -> "PoseSet":
+        other_matrices = other.matrices if isinstance(other, PoseSet) else np.asarray(other)
+        return PoseSet(np.matmul(self.matrices, other_matrices))
+
+    def __rmatmul__(self, other: np.ndarray) -> "PoseSet":
+        return PoseSet(np.matmul(np.asarray(other), self.matrices))
+
+    @property
+    def xyz(self) -> np.ndarray:
+        """Returns the Nx3 translations"""
+        return self.matrices[:, :3, 3]
+
+    @property
+    def rot_matrices(self) -> np.ndarray:
+        """Returns the Nx3x3 rotation matrices"""
+        return self.matrices[:, :3, :3]
+
+    def inv(self) -> "PoseSet":
+        """Returns the inverse poses"""
+        return PoseSet(se3_inv(self.matrices))
+
+    def transform_points(self, xyz: np.ndarray) -> np.ndarray:
+        """
+        Transforms points using the poses
+
+        Args:
+            xyz (np.ndarray): Nx3 array of points. The i-th point is
+                              transformed using the i-th pose.
+
+        Returns:
+            np.ndarray: Nx3 array of transformed points
+        """
+        return np.einsum("ijk,ik->ij", self.rot_matrices, xyz) + self.xyz
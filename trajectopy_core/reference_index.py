@@ -0,0 +1,153 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+"""
+
+import logging
+from collections import OrderedDict
+from functools import cached_property
+from typing import Union
+
+import numpy as np
+from scipy.spatial import KDTree
+
+from trajectopy_core.trajectory import Trajectory
+from trajectopy_core.utils import hash_arrays
+
+logger = logging.getLogger("root")
+
+REFERENCE_INDEX_CACHE_SIZE = 4
+
+
+def content_hash(xyz: np.ndarray, tstamps: np.ndarray) -> str:
+    """Computes a hash of positions and timestamps
+
+    Args:
+        xyz (np.ndarray): Positions [n x 3]
+        tstamps (np.ndarray): Timestamps [n]
+
+    Returns:
+        str: Hexadecimal hash
+    """
+    return hash_arrays(xyz, tstamps)
+
+
+def time_order(tstamps: np.ndarray) -> Union[np.ndarray, None]:
+    """Returns the indices that sort the timestamps or None if they are sorted already"""
+    if np.all(tstamps[1:] >= tstamps[:-1]):
+        return None
+
+    return np.argsort(tstamps, kind="stable")
+
+
+class ReferenceIndex:
+    """Spatial and temporal index of a reference trajectory
+
+    The index is built once from a reference trajectory and can be used
+    to match any number of trajectories against it. The KDTree over the
+    reference positions and the sorted reference timestamps are built
+    when they are needed for the first time.
+
+    Attributes:
+        xyz (np.ndarray): Read-only copy of the reference positions [n x 3]
+        tstamps (np.ndarray): Read-only copy of the reference timestamps [n]
+        key (str): Content hash of positions and timestamps
+
+    Properties:
+        kd_tree (scipy.spatial.KDTree): KDTree containing the reference positions
+        time_order (Union[np.ndarray, None]): Indices that sort the reference timestamps,
+                                              None if they are sorted already
+        sorted_tstamps (np.ndarray): Sorted reference timestamps
+    """
+
+    def __init__(self, xyz: np.ndarray, tstamps: np.ndarray, key: Union[str, None] = None) -> None:
+        if len(xyz) != len(tstamps):
+            raise ValueError("Dimension mismatch between positions and timestamps.")
+
+        self.xyz = np.array(xyz, dtype=float)
+        self.tstamps = np.array(tstamps, dtype=float)
+        self.xyz.flags.writeable = False
+        self.tstamps.flags.writeable = False
+        self.key = key or content_hash(self.xyz, self.tstamps)
+
+    @classmethod
+    def from_trajectory(cls, trajectory: Trajectory) -> "ReferenceIndex":
+        # the components are copied without being handed out, which would reset the cached hash
+        return cls(
+            xyz=trajectory._pos.xyz,  # pylint: disable=protected-access
+            tstamps=trajectory._tstamps,  # pylint: disable=protected-access
+            key=trajectory.content_hash,
+        )
+
+    def __len__(self) -> int:
+        return len(self.tstamps)
+
+    @cached_property
+    def kd_tree(self) -> KDTree:
+        logger.info("Building KDTree of reference index %s", self.key)
+        return KDTree(self.xyz)
+
+    @cached_property
+    def time_order(self) -> Union[np.ndarray, None]:
+        return time_order(self.tstamps)
+
+    @cached_property
+    def sorted_tstamps(self) -> np.ndarray:
+        return self.tstamps if self.time_order is None else self.tstamps[self.time_order]
+
+
+class ReferenceIndexCache:
+    """Cache of reference indices keyed by the content hash of the reference trajectories
+
+    If more than max_size indices are cached, the least recently
+    used index is evicted.
+
+    Attributes:
+        max_size (int): Maximum number of cached indices
+    """
+
+    def __init__(self, max_size: int = REFERENCE_INDEX_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._indices: "OrderedDict[str, ReferenceIndex]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._indices
+
+    def get(self, trajectory: Trajectory) -> ReferenceIndex:
+        """Returns the reference index of a trajectory
+
+        The index is built if it is not cached yet. The content hash
+        is cached by the trajectory, so that repeated lookups of an
+        unchanged trajectory do not hash it again.
+
+        Args:
+            trajectory (Trajectory): Reference trajectory
+
+        Returns:
+            ReferenceIndex: Index of the reference trajectory
+        """
+        key = trajectory.content_hash
+
+        if key in self._indices:
+            self._indices.move_to_end(key)
+            return self._indices[key]
+
+        reference_index = ReferenceIndex.from_trajectory(trajectory)
+        self._indices[key] = reference_index
+
+        while len(self._indices) > self.max_size:
+            evicted_key, _ = self._indices.popitem(last=False)
+            logger.info("Evicted reference index %s from cache", evicted_key)
+
+        return reference_index
+
+    def clear(self) -> None:
+        self._indices.clear()
+
+
+reference_index_cache = ReferenceIndexCache()
@@ -14,6 +14,7 @@ import pandas as pd
 
 from trajectopy_core.alignment.parameters import AlignmentParameters
 from trajectopy_core.plotting.plotly import heatmaps, tables
+from trajectopy_core.plotting.plotly.utils import plotly_js
 from trajectopy_core.report.utils import TEMPLATES_PATH, convert_icon_to_base64
 from trajectopy_core.settings.report import ReportSettings
 
@@ -72,6 +73,7 @@ def render_heatmaps(
         "title": name,
         "one_line_plots": one_line_plots,
         "icon": icon,
+        "plotly_js": plotly_js(),
     }
 
     return template.render(context)
@@ -5,14 +5,15 @@ Gereon Tombrink, 2023
 mail@gtombrink.de
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from functools import cached_property
-from typing import List
+from typing import List, Tuple
 
 import numpy as np
 
-from trajectopy_core.evaluation.ate_result import ATEResult
+from trajectopy_core.evaluation.ate_result import ATEMetrics, ATEResult
 from trajectopy_core.evaluation.rpe_result import RPEResult
+from trajectopy_core.report.decimation import edf_indices, line_indices, scatter_indices
 from trajectopy_core.settings.report import ReportSettings
 
 
@@ -21,6 +22,13 @@ class ATEReportData:
     """
     Class to store all ATE data needed to render the report.
 
+    If the ATE unit is mm, the position deviations are scaled on a
+    copy of the ATE result, i.e. the given result is not modified.
+
+    The plotted traces are decimated to at most max_points_per_trace
+    points of the report settings using line_data, edf_data and
+    scatter_data.
+
     Args:
         ate_result: The ATE result to be rendered.
         settings: The report settings.
@@ -32,8 +40,21 @@ class ATEReportData:
 
     def __post_init__(self) -> None:
         if self.settings.ate_unit_is_mm:
-            self.ate_result.abs_dev.pos_dev *= 1000.0
-            self.ate_result.abs_dev.directed_pos_dev *= 1000.0
+            abs_dev = self.ate_result.abs_dev
+            self.ate_result = ATEResult(
+                trajectory=self.ate_result.trajectory,
+                abs_dev=replace(
+                    abs_dev,
+                    pos_dev=abs_dev.pos_dev * 1000.0,
+                    directed_pos_dev=abs_dev.directed_pos_dev * 1000.0,
+                ),
+                name=self.ate_result.name,
+            )
+
+    @property
+    def metrics(self) -> ATEMetrics:
+        """Summary statistics of the ATE result in report units"""
+        return self.ate_result.metrics
 
     @property
     def short_name(self) -> str:
@@ -144,6 +165,59 @@ class ATEReportData:
 
         return np.rad2deg(self.ate_result.rot_dev_z)
 
+    def line_data(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decimates a line plot of values over function_of.
+
+        Args:
+            values (np.ndarray): Values for each pose
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: x and y values of the trace
+        """
+        indices = line_indices(
+            self.function_of, values, self.settings.max_points_per_trace, self.settings.line_decimation
+        )
+        return self.function_of[indices], values[indices]
+
+    def edf_data(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the decimated empirical distribution function of values.
+
+        Args:
+            values (np.ndarray): Values for each pose
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Sorted values and cumulative probabilities
+        """
+        sorted_values = np.sort(values)
+        norm_cdf = np.arange(len(sorted_values)) / float(len(sorted_values))
+        indices = edf_indices(len(sorted_values), self.settings.max_points_per_trace, self.settings.edf_decimation)
+        return sorted_values[indices], norm_cdf[indices]
+
+    def scatter_data(self, colors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decimates a scatter plot of the positions colored by values.
+
+        The grid is computed in the plotted axes. The largest absolute
+        value is kept in each grid cell.
+
+        Args:
+            colors (np.ndarray): Values for each pose
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Positions [n x 3] and colors of the trace
+        """
+        pos = self.ate_result.trajectory.xyz
+        axes_indices = ["xyz".index(axis) for axis in self.settings.scatter_axis_order]
+        indices = scatter_indices(
+            pos[:, axes_indices],
+            self.settings.max_points_per_trace,
+            self.settings.scatter_decimation,
+            priority=colors,
+        )
+        return pos[indices], colors[indices]
+
 
 @dataclass
 class RPEReportData:
@@ -163,6 +237,22 @@ class RPEReportData:
     def short_name(self) -> str:
         return self.rpe_result.name.split("vs")[0]
 
+    @property
+    def pos_drift(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Decimated mean pair distances, mean and standard deviation of the position drift"""
+        return self._line_data(self.rpe_result.pos_dev_mean, self.rpe_result.pos_std)
+
+    @property
+    def rot_drift(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Decimated mean pair distances, mean and standard deviation of the rotation drift in degrees"""
+        return self._line_data(np.rad2deg(self.rpe_result.rot_dev_mean), np.rad2deg(self.rpe_result.rot_std))
+
+    def _line_data(self, mean: np.ndarray, std: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        distances = np.asarray(self.rpe_result.mean_pair_distances)
+        mean, std = np.asarray(mean), np.asarray(std)
+        indices = line_indices(distances, mean, self.settings.max_points_per_trace, self.settings.line_decimation)
+        return distances[indices], mean[indices], std[indices]
+
 
 @dataclass
 class ATEReportDataCollection:
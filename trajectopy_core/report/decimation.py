@@ -0,0 +1,235 @@
+"""
+Trajectopy - Trajectory Evaluation in Python
+
+Gereon Tombrink, 2023
+mail@gtombrink.de
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from trajectopy_core.settings.report import (
+    EDFDecimation,
+    LineDecimation,
+    ScatterDecimation,
+)
+
+# maximum number of cell size refinements of the grid thinning
+GRID_BISECTION_STEPS = 8
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Selects points of a line using the largest triangle three buckets algorithm.
+
+    The first and the last point are kept. The remaining points are split
+    into num_points - 2 buckets. From each bucket, the point is selected
+    that forms the largest triangle with the previously selected point and
+    the mean of the next bucket.
+
+    Args:
+        x (np.ndarray): x values of the line
+        y (np.ndarray): y values of the line
+        num_points (int): Number of points to select, at least 3
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    num = len(y)
+    num_points = max(num_points, 3)
+    if num <= num_points:
+        return np.arange(num)
+
+    edges = np.linspace(1, num - 1, num_points - 1).astype(int)
+    bucket_sizes = np.diff(edges)
+    x_sums = np.concatenate(([0.0], np.cumsum(x, dtype=float)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y, dtype=float)))
+    x_means = np.append((x_sums[edges[1:]] - x_sums[edges[:-1]]) / bucket_sizes, x[-1])
+    y_means = np.append((y_sums[edges[1:]] - y_sums[edges[:-1]]) / bucket_sizes, y[-1])
+
+    indices = np.empty(num_points, dtype=int)
+    indices[0], indices[-1] = 0, num - 1
+    selected = 0
+    for bucket, (start, end) in enumerate(zip(edges[:-1], edges[1:])):
+        x_a, y_a = x[selected], y[selected]
+        x_c, y_c = x_means[bucket + 1], y_means[bucket + 1]
+        areas = np.abs((x_a - x_c) * (y[start:end] - y_a) - (x_a - x[start:end]) * (y_c - y_a))
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+
+    return indices
+
+
+def minmax_indices(y: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Selects the minimum and maximum of each bucket of a line.
+
+    The points are split into buckets of equal size so that at most
+    num_points points are selected including the first and the last
+    point. Thereby, the envelope of the line and all peaks are kept.
+
+    Args:
+        y (np.ndarray): y values of the line
+        num_points (int): Maximum number of points to select, at least 4
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    num = len(y)
+    if num <= num_points:
+        return np.arange(num)
+
+    bucket_size = int(np.ceil(num / max((num_points - 2) // 2, 1)))
+    num_buckets = int(np.ceil(num / bucket_size))
+    bucket_starts = np.arange(num_buckets) * bucket_size
+
+    values = np.full(num_buckets * bucket_size, np.inf)
+    values[:num] = np.where(np.isnan(y), np.inf, y)
+    min_indices = np.argmin(values.reshape(num_buckets, bucket_size), axis=1) + bucket_starts
+
+    values[:num] = np.where(np.isnan(y), -np.inf, y)
+    values[num:] = -np.inf
+    max_indices = np.argmax(values.reshape(num_buckets, bucket_size), axis=1) + bucket_starts
+
+    return np.unique(np.concatenate(([0, num - 1], min_indices, max_indices)))
+
+
+def quantile_indices(num: int, num_points: int) -> np.ndarray:
+    """
+    Selects evenly spaced ranks of sorted values.
+
+    Applied to the sorted values of an empirical distribution function,
+    the selected points are evenly spaced quantiles including the minimum
+    and the maximum.
+
+    Args:
+        num (int): Number of sorted values
+        num_points (int): Number of points to select
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    if num <= num_points:
+        return np.arange(num)
+
+    return np.unique(np.round(np.linspace(0, num - 1, max(num_points, 2))).astype(int))
+
+
+def grid_indices(points: np.ndarray, num_points: int, priority: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Thins out points using a regular grid.
+
+    One point is kept per occupied grid cell. If a priority is given,
+    the point with the largest absolute priority is kept, e.g. the
+    largest deviation, otherwise the first point. The cell size is
+    increased until at most num_points cells are occupied.
+
+    Args:
+        points (np.ndarray): Points [n x d]
+        num_points (int): Maximum number of points to select
+        priority (Optional[np.ndarray]): Priority of each point [n]
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    num = len(points)
+    if num <= num_points:
+        return np.arange(num)
+
+    order = np.arange(num) if priority is None else np.argsort(-np.abs(priority), kind="stable")
+    ordered_points = points[order] - np.min(points, axis=0)
+
+    cell_size = np.max(ordered_points) / num_points
+    if cell_size <= 0:
+        return order[:1]
+
+    # for points along a trajectory, the number of occupied cells is inversely proportional to the cell size
+    lower_cell_size = None
+    first_indices = _first_in_cells(ordered_points, cell_size)
+    while len(first_indices) > num_points:
+        lower_cell_size = cell_size
+        cell_size *= len(first_indices) / num_points
+        first_indices = _first_in_cells(ordered_points, cell_size)
+
+    # points filling an area or a volume are thinned out too much, the cell size is reduced again
+    for _ in range(GRID_BISECTION_STEPS):
+        if lower_cell_size is None or len(first_indices) >= num_points // 2:
+            break
+
+        candidate_cell_size = np.sqrt(lower_cell_size * cell_size)
+        candidate_indices = _first_in_cells(ordered_points, candidate_cell_size)
+        if len(candidate_indices) > num_points:
+            lower_cell_size = candidate_cell_size
+        else:
+            cell_size, first_indices = candidate_cell_size, candidate_indices
+
+    return np.sort(order[first_indices])
+
+
+def _first_in_cells(points: np.ndarray, cell_size: float) -> np.ndarray:
+    """Returns the index of the first point in each occupied grid cell"""
+    cells = np.floor(points / cell_size).astype(np.int64)
+    cell_keys = np.ravel_multi_index(cells.T, np.max(cells, axis=0) + 1)
+    return np.unique(cell_keys, return_index=True)[1]
+
+
+def line_indices(x: np.ndarray, y: np.ndarray, num_points: int, method: LineDecimation) -> np.ndarray:
+    """
+    Selects the points of a line plot trace.
+
+    Args:
+        x (np.ndarray): x values of the line
+        y (np.ndarray): y values of the line
+        num_points (int): Maximum number of points, no decimation if not positive
+        method (LineDecimation): Decimation method
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    if method == LineDecimation.NONE or num_points <= 0 or len(y) <= num_points:
+        return np.arange(len(y))
+
+    if method == LineDecimation.LTTB:
+        return lttb_indices(x, y, num_points)
+
+    return minmax_indices(y, num_points)
+
+
+def edf_indices(num: int, num_points: int, method: EDFDecimation) -> np.ndarray:
+    """
+    Selects the points of an empirical distribution function trace.
+
+    Args:
+        num (int): Number of sorted values
+        num_points (int): Maximum number of points, no decimation if not positive
+        method (EDFDecimation): Decimation method
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    if method == EDFDecimation.NONE or num_points <= 0:
+        return np.arange(num)
+
+    return quantile_indices(num, num_points)
+
+
+def scatter_indices(
+    points: np.ndarray, num_points: int, method: ScatterDecimation, priority: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Selects the points of a scatter plot trace.
+
+    Args:
+        points (np.ndarray): Plotted coordinates of the points [n x d]
+        num_points (int): Maximum number of points, no decimation if not positive
+        method (ScatterDecimation): Decimation method
+        priority (Optional[np.ndarray]): Priority of each point [n], e.g. the colored deviations
+
+    Returns:
+        np.ndarray: Sorted indices of the selected points
+    """
+    if method == ScatterDecimation.NONE or num_points <= 0:
+        return np.arange(len(points))
+
+    return grid_indices(points, num_points, priority)
@@ -13,6 +13,7 @@ import jinja2
 from trajectopy_core.evaluation.ate_result import ATEResult
 from trajectopy_core.evaluation.rpe_result import RPEResult
 from trajectopy_core.plotting.plotly import bar_plots, multi_line_plots
+from trajectopy_core.plotting.plotly.utils import plotly_js
 from trajectopy_core.report.data import ATEReportData, ATEReportDataCollection, RPEReportData, RPEReportDataCollection
 from trajectopy_core.report.utils import TEMPLATES_PATH, convert_icon_to_base64
 from trajectopy_core.settings.report import ReportSettings
@@ -94,6 +95,7 @@ def render_multi_report(
         "rpe_available": rpe_results is not None,
         "one_line_plots": one_line_plots,
         "icon": icon,
+        "plotly_js": plotly_js(),
     }
 
     return template.render(context)
@@ -14,6 +14,7 @@ import numpy as np
 from trajectopy_core.evaluation.ate_result import ATEResult
 from trajectopy_core.evaluation.rpe_result import RPEResult
 from trajectopy_core.plotting.plotly import bar_plots, histograms, line_plots, scatter_plots
+from trajectopy_core.plotting.plotly.utils import plotly_js
 from trajectopy_core.report.data import ATEReportData, RPEReportData
 from trajectopy_core.report.utils import TEMPLATES_PATH, convert_icon_to_base64, number_to_string
 from trajectopy_core.settings.report import ReportSettings
@@ -120,8 +121,10 @@ def render_single_report(
 
     context = {
         "title": ate_result.name if ate_result is not None else rpe_result.name,
-        "ate_pos": number_to_string(ate_result.pos_ate) if ate_result is not None else "-",
-        "ate_rot": number_to_string(np.rad2deg(ate_result.rot_ate)) if ate_result is not None else "-",
+        "ate_pos": number_to_string(ate_report_data.metrics.pos_ate) if ate_report_data is not None else "-",
+        "ate_rot": (
+            number_to_string(np.rad2deg(ate_report_data.metrics.rot_ate)) if ate_report_data is not None else "-"
+        ),
         "rpe_pos": number_to_string(rpe_result.pos_rpe) if rpe_result is not None else "-",
         "rpe_rot": number_to_string(np.rad2deg(rpe_result.rot_rpe)) if rpe_result is not None else "-",
         "rpe_pos_drift_unit": rpe_result.pos_drift_unit if rpe_result is not None else "-",
@@ -131,6 +134,7 @@ def render_single_report(
         "side_by_side_plots": side_by_side_plots,
         "one_line_plots": one_line_plots,
         "icon": icon,
+        "plotly_js": plotly_js(),
         "rot_unit": report_settings.rot_unit,
     }
 
@@ -11,6 +11,7 @@ from typing import List
 import jinja2
 
 from trajectopy_core.plotting.plotly import multi_line_plots, scatter_plots
+from trajectopy_core.plotting.plotly.utils import plotly_js
 from trajectopy_core.report.utils import TEMPLATES_PATH, convert_icon_to_base64
 from trajectopy_core.settings.report import ReportSettings
 from trajectopy_core.trajectory import Trajectory
@@ -57,6 +58,7 @@ def render_trajectories(*, trajectories: List[Trajectory], report_settings: Repo
         "title": trajectories[0].name if len(trajectories) == 1 else "Trajectory Plot",
         "one_line_plots": one_line_plots,
         "icon": icon,
+        "plotly_js": plotly_js(),
     }
 
     return template.render(context)
@@ -6,7 +6,8 @@ mail@gtombrink.de
 """
 
 from dataclasses import dataclass, field
-from typing import List
+from enum import Enum, auto
+from typing import Any, List
 
 import numpy as np
 
@@ -16,6 +17,19 @@ METRIC_THRESHOLD = 1e-4
 TIME_THRESHOLD = 1e-4
 
 
+class JacobianMethod(Enum):
+    """
+    Method used to compute the design and condition matrix
+    of the Gauß-Helmert-Model.
+
+    ANALYTIC: closed-form derivatives, computed for all epochs at once
+    AUTOGRAD: automatic differentiation of the functional relationship (slow, used for verification)
+    """
+
+    ANALYTIC = auto()
+    AUTOGRAD = auto()
+
+
 @dataclass
 class AlignmentPreprocessing(Settings):
     """Dataclass defining alignment preprocessing configuration"""
@@ -277,6 +291,8 @@ class AlignmentSettings(Settings):
             - z_to
             - roll_pitch (platform orientations)
             - yaw
+        - jacobian_method (JacobianMethod): Method used to compute the
+                          derivatives of the functional relationship
 
     """
 
@@ -285,6 +301,15 @@ class AlignmentSettings(Settings):
     stochastics: AlignmentStochastics = field(default_factory=AlignmentStochastics)
     metric_threshold: float = METRIC_THRESHOLD
     time_threshold: float = TIME_THRESHOLD
+    jacobian_method: JacobianMethod = JacobianMethod.ANALYTIC
+
+    @staticmethod
+    def encoder(name: str, value: Any) -> Any:
+        return value.value if name == "jacobian_method" else value
+
+    @staticmethod
+    def decoder(name: str, value: Any) -> Any:
+        return JacobianMethod(value) if name == "jacobian_method" else value
 
     def __str__(self) -> str:
         return str(self.preprocessing) + str(self.estimation_settings) + str(self.stochastics)
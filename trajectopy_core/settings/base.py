@@ -6,10 +6,13 @@ mail@gtombrink.de
 """
 
 import json
+import logging
 from abc import ABC
 from dataclasses import dataclass
 from typing import Any
 
+logger = logging.getLogger("root")
+
 
 @dataclass
 class Settings(ABC):
@@ -44,10 +47,12 @@ class Settings(ABC):
 
     @classmethod
     def from_dict(cls, dct: dict) -> "Settings":
+        """Creates settings from a dictionary, attributes that are missing keep their default values"""
         settings = cls()
         for attribute_name, attribute_type in cls.__annotations__.items():
             if attribute_name not in dct:
-                raise ValueError(f"Attribute {attribute_name} not found in input data")
+                logger.debug("Attribute %s not found in input data, using default value", attribute_name)
+                continue
 
             attribute_data = dct[attribute_name]
             if isinstance(attribute_data, dict) and issubclass(attribute_type, Settings):
@@ -65,9 +70,11 @@ class Settings(ABC):
         return cls.from_dict(data)
 
     def update_from_dict(self, dct: dict):
+        """Updates the settings from a dictionary, attributes that are missing are left unchanged"""
         for attribute_name, attribute_type in self.__annotations__.items():
             if attribute_name not in dct:
-                raise ValueError(f"Attribute {attribute_name} not found in input data")
+                logger.debug("Attribute %s not found in input data, keeping current value", attribute_name)
+                continue
 
             attribute_data = dct[attribute_name]
             if isinstance(attribute_data, dict) and issubclass(attribute_type, Settings):
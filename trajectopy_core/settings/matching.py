@@ -26,6 +26,7 @@ class MatchingSettings(Settings):
     max_time_diff: float = 0.01
     max_distance: float = 0.00
     k_nearest: int = 10
+    cache_reference_index: bool = False
 
     @staticmethod
     def encoder(name: str, value: Any) -> Any:
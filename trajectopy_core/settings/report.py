@@ -6,10 +6,78 @@ mail@gtombrink.de
 """
 
 from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
 
 from trajectopy_core.settings.base import Settings
 
 
+class LineDecimation(Enum):
+    """
+    Decimation of line plots
+
+    MINMAX: minimum and maximum of each bucket
+    LTTB: largest triangle three buckets
+    NONE: no decimation
+    """
+
+    MINMAX = "minmax"
+    LTTB = "lttb"
+    NONE = "none"
+
+    @classmethod
+    def from_str(cls, method: str) -> "LineDecimation":
+        try:
+            return cls(method.lower())
+        except ValueError as e:
+            raise ValueError(f"Unknown line decimation method {method}") from e
+
+
+class EDFDecimation(Enum):
+    """
+    Decimation of cumulative probability plots
+
+    QUANTILE: evenly spaced quantiles
+    NONE: no decimation
+    """
+
+    QUANTILE = "quantile"
+    NONE = "none"
+
+    @classmethod
+    def from_str(cls, method: str) -> "EDFDecimation":
+        try:
+            return cls(method.lower())
+        except ValueError as e:
+            raise ValueError(f"Unknown EDF decimation method {method}") from e
+
+
+class ScatterDecimation(Enum):
+    """
+    Decimation of scatter plots
+
+    GRID: one point per grid cell, the largest deviation is kept
+    NONE: no decimation
+    """
+
+    GRID = "grid"
+    NONE = "none"
+
+    @classmethod
+    def from_str(cls, method: str) -> "ScatterDecimation":
+        try:
+            return cls(method.lower())
+        except ValueError as e:
+            raise ValueError(f"Unknown scatter decimation method {method}") from e
+
+
+DECIMATION_TYPES = {
+    "line_decimation": LineDecimation,
+    "edf_decimation": EDFDecimation,
+    "scatter_decimation": ScatterDecimation,
+}
+
+
 @dataclass
 class ExportSettings(Settings):
     format: str = "png"  # one of png, svg, jpeg, webp
@@ -65,6 +133,10 @@ class ReportSettings(Settings):
     - `rot_y_name` (str): The name of the pitch angle in rotation data. Default value is "pitch".
     - `rot_z_name` (str): The name of the yaw angle in rotation data. Default value is "yaw".
     - `rot_unit` (str): The unit of rotation angles. Default value is "°".
+    - `max_points_per_trace` (int): The maximum number of points of a single trace in the plots. Traces with more points are decimated before rendering. A value of 0 disables the decimation. Default value is 10000.
+    - `line_decimation` (LineDecimation): The decimation of line plots, stored as "minmax" (minimum and maximum per bucket), "lttb" (largest triangle three buckets) or "none". Default value is LineDecimation.MINMAX.
+    - `edf_decimation` (EDFDecimation): The decimation of cumulative probability plots, stored as "quantile" (evenly spaced quantiles) or "none". Default value is EDFDecimation.QUANTILE.
+    - `scatter_decimation` (ScatterDecimation): The decimation of scatter plots, stored as "grid" (one point per grid cell, the largest deviation is kept) or "none". Default value is ScatterDecimation.GRID.
     - `single_plot_export` (ExportSettings): The export settings for single plots. Default value is an instance of ExportSettings with width=800 and height=450.
     - `two_subplots_export` (ExportSettings): The export settings for two subplots. Default value is an instance of ExportSettings with width=800 and height=540.
     - `three_subplots_export` (ExportSettings): The export settings for three subplots. Default value is an instance of ExportSettings with width=800 and height=750.
@@ -113,10 +185,23 @@ class ReportSettings(Settings):
     rot_z_name: str = "yaw"
     rot_unit: str = "°"
 
+    max_points_per_trace: int = 10_000
+    line_decimation: LineDecimation = LineDecimation.MINMAX
+    edf_decimation: EDFDecimation = EDFDecimation.QUANTILE
+    scatter_decimation: ScatterDecimation = ScatterDecimation.GRID
+
     single_plot_export: ExportSettings = field(default_factory=lambda: ExportSettings(width=800, height=540))
     two_subplots_export: ExportSettings = field(default_factory=lambda: ExportSettings(width=800, height=540))
     three_subplots_export: ExportSettings = field(default_factory=lambda: ExportSettings(width=800, height=750))
 
+    @staticmethod
+    def encoder(name: str, value: Any) -> Any:
+        return value.value if name in DECIMATION_TYPES else value
+
+    @staticmethod
+    def decoder(name: str, value: Any) -> Any:
+        return DECIMATION_TYPES[name].from_str(value) if name in DECIMATION_TYPES else value
+
 
 if __name__ == "__main__":
     settings = ReportSettings()
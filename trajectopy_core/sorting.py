@@ -9,10 +9,10 @@ import logging
 from enum import Enum
 from typing import List, Tuple
 
-import matplotlib.tri as mtri
-import networkx as nx
 import numpy as np
-from scipy.spatial import KDTree
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, minimum_spanning_tree, shortest_path
+from scipy.spatial import Delaunay, KDTree
 
 from trajectopy_core.approximation.mls_approximation import mls_iterative
 from trajectopy_core.settings.sorting import SortingSettings
@@ -61,11 +61,12 @@ def sort(xyz_unsorted: np.ndarray, discard_missing: bool = True) -> List[int]:
         # insert missing points
         # some unsorted points need to be inserted into the sort vector
         logger.info("Inserting missing points %i", len(idx_missing))
-        missing_points: list = xyz_unsorted[idx_missing, :].tolist()
-
-        xyz_sorted_temp = xyz_unsorted[idx_sort, :]
-        for m_i, p in zip(idx_missing, missing_points):
-            idx_sort, xyz_sorted_temp = _insert_point(m_i, p, idx_sort, xyz_sorted_temp)
+        idx_sort = _insert_points(
+            missing_point_indices=idx_missing,
+            missing_points=xyz_unsorted[idx_missing, :],
+            idx_sort=idx_sort,
+            xyz_sorted=xyz_unsorted[idx_sort, :],
+        )
 
     # Set start position of lap as the position with the maximum z-value
     idx_sort = _begin_with(idx=idx_sort, begin=int(np.argmax(xyz_unsorted[:, 2])))
@@ -105,60 +106,47 @@ def lengths_from_xyz(xyz: np.ndarray) -> np.ndarray:
     return np.r_[0, np.cumsum(dists)]
 
 
-def _insert_point(
-    missing_point_index: int,
-    missing_point: np.ndarray,
+def _insert_points(
+    missing_point_indices: list,
+    missing_points: np.ndarray,
     idx_sort: list,
     xyz_sorted: np.ndarray,
-) -> Tuple[list, np.ndarray]:
-    """Inserts a point into an existing sorting
+) -> list:
+    """Inserts points into an existing sorting
+
+    Each missing point is placed between its two nearest neighbors
+    within the sorted points. If the neighbors are not adjacent in
+    the sorting, the point is placed halfway between them. Points
+    that are inserted at the same position keep the order in which
+    they are given.
 
     This method should only be called internally by the
     reconstruct method of the SpatialSorter class
 
     Args:
-        missing_point_index (int): index of the missing point
-                                   i.e. its position in the
-                                   unsorted array of points
-        missing_point (np.ndarray): coordinates of the missing
-                                    point that should be inserted
+        missing_point_indices (list): indices of the missing points
+                                      i.e. their positions in the
+                                      unsorted array of points
+        missing_points (np.ndarray): coordinates of the missing
+                                     points that should be inserted
         idx_sort (list): list of indices that establish the spatial
-                         sorting in which the missing point needs
+                         sorting in which the missing points need
                          to be inserted.
         xyz_sorted (np.ndarray): coordinates of the sorted points
                                  (sorted using idx_sort)
 
     Returns:
-        Tuple[list, np.ndarray]: idx_sort and xyz_sorted with inserted
-                                 point
+        list: idx_sort with inserted points
     """
-    # xyz_list
-    xyz_list: list = xyz_sorted.tolist()
-
-    # create KDTree for point set
-    tree = KDTree(xyz_sorted)
+    # get nearest neighbors of all missing points
+    _, neighbors = KDTree(xyz_sorted).query(missing_points, k=2)
 
-    # get nearest neighbor
-    _, ii = tree.query(missing_point, k=2)
+    min_idx = np.min(neighbors, axis=1)
+    idx_diff = np.max(neighbors, axis=1) - min_idx
 
-    # min idx
-    min_idx = min(ii)
-    # max idx
-    max_idx = max(ii)
-
-    idx_diff = abs(max_idx - min_idx)
-
-    # find these neighbours in the sort index list to know where the neighbors
-    # occur in the sorting. We should place the point in between both
-    if idx_diff == 1:
-        idx_sort.insert(min_idx + 1, missing_point_index)
-        xyz_list.insert(min_idx + 1, missing_point)
-    else:
-        diff = int(idx_diff / 2)
-        idx_sort.insert(min_idx + diff, missing_point_index)
-        xyz_list.insert(min_idx + diff, missing_point)
-
-    return idx_sort, np.array(xyz_list)
+    # place the points in between both neighbors
+    insert_positions = np.where(idx_diff == 1, min_idx + 1, min_idx + idx_diff // 2)
+    return np.insert(np.asarray(idx_sort), insert_positions, missing_point_indices).tolist()
 
 
 def _mst_sorting(xyz: np.ndarray) -> Tuple[list, list]:
@@ -187,15 +175,14 @@ def _mst_sorting(xyz: np.ndarray) -> Tuple[list, list]:
     # create minimum spanning tree
     mst, missing = _compute_mst(xyz)
 
-    # mst = nx.minimum_spanning_tree(delaunay, weight='weight', algorithm='prim')
     logger.info("searching for endpoints")
 
     # find possible candidates for endpoints
-    d1_nodes = [n for n in range(len(mst.nodes)) if mst.degree[n] == 1]
+    d1_nodes = np.flatnonzero(np.diff(mst.indptr) == 1)
     logger.info("found %i nodes of degree 1", len(d1_nodes))
 
     if len(d1_nodes) == 2:
-        end_nodes = d1_nodes
+        end_nodes = d1_nodes.tolist()
     else:
         # breadth-first search starting from a arbitrary d1-node
         bfs_a = _breadth_first_search(mst, d1_nodes[0])
@@ -208,7 +195,7 @@ def _mst_sorting(xyz: np.ndarray) -> Tuple[list, list]:
         # final end nodes
         end_nodes = [e_1, e_2]
 
-    shortest_path_lengths = nx.shortest_path_length(mst, end_nodes[0], end_nodes[1], weight="weight")
+    shortest_path_lengths = shortest_path(mst, method="D", directed=False, indices=end_nodes[0])[end_nodes[1]]
     logger.info("found minimum path length: %.3f m", shortest_path_lengths)
 
     # breadth-first-search through mst to reconstruct the order
@@ -236,59 +223,49 @@ def _begin_with(idx: list, begin: int) -> list:
     return idx_max_sort
 
 
-def _compute_mst(xyz: np.ndarray) -> Tuple[nx.Graph, list]:
+def _compute_mst(xyz: np.ndarray) -> Tuple[csr_matrix, list]:
     """Function that computes a Minimum-Spanning-Tree
-    using the matplotlib implementation. This implementation
-    may skip some (nearly) colinear points.
+    of the 2d delaunay triangulation of the positions.
+    The triangulation may skip some (nearly) identical points.
 
     Args:
         xyz (np.ndarray): 2d / 3d positions used for mst computation
 
     Returns:
-        Tuple[nx.Graph, list]: networkx.Graph object of the mst and
-                               list of missing point indices if any
-                               points are missing due to colinearity
+        Tuple[csr_matrix, list]: symmetric sparse adjacency matrix of the
+                                 mst with the edge lengths as weights and
+                                 list of missing point indices if any
+                                 points are missing due to colinearity
     """
     num_points = len(xyz)
     logger.info("building delaunay triangulation")
-    triang = mtri.Triangulation(x=xyz[:, 0], y=xyz[:, 1])
-    edges = triang.edges
+    indptr, indices = Delaunay(xyz[:, :2]).vertex_neighbor_vertices
 
-    # vertex indices of triangulation compared to initial point set
-    set1 = set(list(range(num_points)))
-    set2 = set(np.unique(np.r_[edges[:, 0], edges[:, 1]]).tolist())
-
-    # missing vertices where dropped due to colinearity
-    missing = list(sorted(set1 - set2))
+    # missing vertices where dropped by the triangulation
+    missing = np.flatnonzero(np.diff(indptr) == 0).tolist()
 
     # costs
-    e_diffs = xyz[edges[:, 1], :] - xyz[edges[:, 0], :]
-    e_costs = np.linalg.norm(e_diffs, axis=1)
+    vertices = np.repeat(np.arange(num_points), np.diff(indptr))
+    e_costs = np.linalg.norm(xyz[indices, :] - xyz[vertices, :], axis=1)
 
     logger.info("computing minimum spanning tree...")
-
-    # add edges to nx graph
-    delaunayt = nx.Graph()
-    delaunayt.add_nodes_from(range(num_points))
-    delaunayt.add_weighted_edges_from(np.c_[edges, e_costs])
-    mst = nx.minimum_spanning_tree(delaunayt)
+    mst = minimum_spanning_tree(csr_matrix((e_costs, indices, indptr), shape=(num_points, num_points)))
     logging.info("%i points were discarded during delaunay triangulation!", len(missing))
 
-    return mst, missing
+    return (mst + mst.T).tocsr(), missing
 
 
-def _breadth_first_search(graph: nx.Graph, root: int) -> list:
+def _breadth_first_search(graph: csr_matrix, root: int) -> list:
     """Performs a breadth first search
 
     Args:
-        graph (nx.Graph): networkx.Graph object
+        graph (csr_matrix): sparse adjacency matrix
         root (int): index of starting node for breadth-first-search
 
     Returns:
         list: list of visited nodes
     """
-    edges = nx.bfs_edges(graph, root)
-    return [root] + [int(v) for _, v in edges]
+    return breadth_first_order(graph, root, directed=False, return_predecessors=False).tolist()
 
 
 def detect_direction(xyz: np.ndarray) -> int:
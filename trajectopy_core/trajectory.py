@@ -7,24 +7,33 @@ mail@gtombrink.de
 
 import copy
 import logging
-from typing import List, Tuple, Union
+from typing import Callable, Dict, Iterator, List, Set, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from pointset import PointSet
-from scipy.spatial.transform import Slerp
 
+import trajectopy_core.input_output.binary_io as binary_io
 import trajectopy_core.input_output.trajectory_io as trajectory_io
 from trajectopy_core.alignment.equations import leverarm_time_component
 from trajectopy_core.alignment.parameters import AlignmentParameters
 from trajectopy_core.alignment.result import AlignmentResult
 from trajectopy_core.approximation.cubic_approximation import piecewise_cubic
 from trajectopy_core.approximation.rot_approximation import rot_average_window
+from trajectopy_core.input_output.header import HeaderData
+from trajectopy_core.poseset import PoseSet
 from trajectopy_core.rotationset import RotationSet
 from trajectopy_core.settings.approximation import ApproximationSettings
 from trajectopy_core.settings.sorting import SortingSettings
 from trajectopy_core.sorting import Sorting, sort_mls
-from trajectopy_core.utils import common_time_span, gradient_3d, lengths_from_xyz
+from trajectopy_core.utils import (
+    common_time_span,
+    gradient_3d,
+    hash_arrays,
+    interpolate_linear,
+    interpolate_slerp,
+    lengths_from_xyz,
+)
 
 # logger configuration
 logger = logging.getLogger("root")
@@ -34,12 +43,45 @@ class TrajectoryError(Exception):
     pass
 
 
+def _freeze(array: np.ndarray) -> bool:
+    """Marks an array as read-only so that it can be shared between copies
+
+    Views on writable memory cannot be protected this way, since their
+    memory can still be modified through other arrays.
+
+    Returns:
+        bool: True if the array is read-only now
+    """
+    if array.base is not None and (not isinstance(array.base, np.ndarray) or array.base.flags.writeable):
+        return False
+
+    array.flags.writeable = False
+    return True
+
+
 class Trajectory:
     """Class representing a trajectory, i.e. position and orientation of a plattform over time
 
     Position-Computations are always done in a local frame
     Time stamps are always in UTC time
     Rotations are always defined in a East-North-Up frame
+
+    The methods of the trajectory never modify components (pos, rot,
+    tstamps, arc_lengths, speed_3d) in-place but replace them. Copies of a
+    trajectory therefore share its components until they are handed out
+    by their properties, where they may be modified in-place (see copy).
+    Filtering a trajectory with inplace=False does not copy the components
+    that are replaced anyway.
+
+    Speeds and arc lengths that are not provided are derived from the
+    initial positions when they are needed for the first time, i.e. when
+    they are accessed or when the trajectory is written or compared.
+
+    The sorting indices, the sorted properties (function_of, xyz, quat,
+    rpy) and the content hash are cached until a component is replaced or retrieved via
+    its property, which allows modifying it in-place. Components that are
+    kept and modified in-place after accessing a sorted property must be
+    assigned again to update the cache.
     """
 
     _counter = 1
@@ -57,6 +99,19 @@ class Trajectory:
         if rot and len(rot) != len(pos):
             raise ValueError("Dimension mismatch between positions and orientations.")
 
+        # components that are shared with copies of the trajectory
+        self._shared: Set[str] = set()
+        # orientations may be referenced elsewhere if they were passed in or handed out
+        self._rot_exposed = False
+
+        # speeds and arc lengths that are derived from the initial positions and timestamps when needed
+        self._pending_fields: Set[str] = set()
+        self._derived_source: Union[Tuple[PointSet, np.ndarray], None] = None
+        self._derived_index: Union[np.ndarray, slice, None] = None
+
+        # cached sorting indices, sorted properties and content hash
+        self._views: Dict[str, Union[np.ndarray, str]] = {}
+
         self.sorting = sorting
 
         # pose
@@ -64,17 +119,22 @@ class Trajectory:
         self.rot = rot
         self.tstamps = np.arange(0, len(pos)) if tstamps is None else tstamps
 
-        if speed_3d is not None and len(speed_3d) == len(self.pos):
+        if speed_3d is not None and len(speed_3d) == len(pos):
             self._speed_3d = speed_3d
         else:
-            self._speed_3d = gradient_3d(xyz=self.pos.to_local(inplace=False).xyz, tstamps=self.tstamps)
-            logger.info("Speeds were not provided or had wrong dimensions. Speeds were computed instead.")
+            self._speed_3d = None
+            self._pending_fields.add("speed_3d")
+            logger.info("Speeds were not provided or had wrong dimensions. Speeds are computed instead.")
 
-        if arc_lengths is not None and len(arc_lengths) == len(self.pos):
+        if arc_lengths is not None and len(arc_lengths) == len(pos):
             self.arc_lengths = arc_lengths
         else:
-            self.arc_lengths = self.init_arc_lengths()
-            logger.info("Arc lengths were not provided or had wrong dimensions. Arc lengths were computed instead.")
+            self._arc_lengths = None
+            self._pending_fields.add("arc_lengths")
+            logger.info("Arc lengths were not provided or had wrong dimensions. Arc lengths are computed instead.")
+
+        if self._pending_fields:
+            self._derived_source = (pos, self._tstamps)
 
         self.name = name or f"Trajectory {Trajectory._counter}"
 
@@ -91,7 +151,7 @@ class Trajectory:
             f"| Name:                         {self.name:<{width}}|\n"
             f"| Number of poses:              {len(self):<{width}}|\n"
             f"| Orientation available:        {'yes' if self.has_orientation else 'no':<{width}}|\n"
-            f"| EPSG:                         {self.pos.epsg:<{width}}|\n"
+            f"| EPSG:                         {self._pos.epsg:<{width}}|\n"
             f"| Length [m]:                   {self.total_length:<{width}.3f}|\n"
             f"| Data rate [Hz]:               {self.data_rate:<{width}.3f}|\n"
             f"| Function of:                  {self.function_of_label:<{width}}|\n"
@@ -103,7 +163,7 @@ class Trajectory:
         """
         Returns True if orientation is available
         """
-        return self.rot is not None and len(self.rot) > 0
+        return self._rot is not None and len(self._rot) > 0
 
     def __repr__(self) -> str:
         return str(self)
@@ -112,33 +172,252 @@ class Trajectory:
         """
         Return number of poses
         """
-        return len(self.pos.xyz)
+        return len(self._pos.xyz)
 
     def __eq__(self, other: "Trajectory") -> bool:
-        if self.rot is not None and other.rot is not None:
-            rot_equal = np.allclose(self.rot.as_quat(), other.rot.as_quat())
-        elif self.rot is None and other.rot is None:
+        self._resolve_derived()
+        other._resolve_derived()
+
+        if self._rot is not None and other._rot is not None:
+            rot_equal = np.allclose(self._rot.as_quat(), other._rot.as_quat())
+        elif self._rot is None and other._rot is None:
             rot_equal = True
         else:
             rot_equal = False
 
         return (
-            np.allclose(self.pos.xyz, other.pos.xyz)
+            np.allclose(self._pos.xyz, other._pos.xyz)
             and rot_equal
-            and np.allclose(self.tstamps, other.tstamps)
-            and np.allclose(self.arc_lengths, other.arc_lengths)
+            and np.allclose(self._tstamps, other._tstamps)
+            and np.allclose(self._arc_lengths, other._arc_lengths)
             and np.allclose(self._speed_3d, other._speed_3d)
             and self.name == other.name
         )
 
     def init_arc_lengths(self):
-        return lengths_from_xyz(self.pos.to_local(inplace=False).xyz)
+        return lengths_from_xyz(self._pos.to_local(inplace=False).xyz)
 
     def copy(self) -> "Trajectory":
         """
-        Deep copy of itself
+        Copy of itself that shares the components with the original
+
+        The arrays of shared components are marked as read-only, which
+        also applies to references that were taken before copying. When
+        either trajectory hands out a shared component via its property,
+        it gets a private, writable copy of it first. Components that are
+        replaced, e.g. by filtering, are not copied at all.
+
+        Components that cannot be protected are copied right away. These
+        are views on writable arrays and orientations that were passed in
+        or handed out, since RotationSet objects are mutable.
+        """
+        if self._pending_fields:
+            derived_pos, derived_tstamps = self._derived_source
+            if not (_freeze(derived_pos.xyz) and _freeze(derived_tstamps)):
+                self._resolve_derived()
+
+        traj_copy = copy.copy(self)
+        traj_copy._pending_fields = set(self._pending_fields)
+        traj_copy._views = dict(self._views)
+        traj_copy._shared = set()
+        traj_copy._rot_exposed = False
+
+        for name in ("tstamps", "arc_lengths", "speed_3d"):
+            array = getattr(self, f"_{name}")
+            if array is None:
+                continue
+
+            if _freeze(array):
+                self._shared.add(name)
+                traj_copy._shared.add(name)
+            else:
+                setattr(traj_copy, f"_{name}", array.copy())
+
+        # the point set itself may be referenced elsewhere and is not shared
+        traj_copy._pos = copy.copy(self._pos)
+        if _freeze(self._pos.xyz):
+            self._shared.add("pos")
+            traj_copy._shared.add("pos")
+        else:
+            traj_copy._pos.xyz = self._pos.xyz.copy()
+
+        if self._rot is not None and self._rot_exposed:
+            traj_copy._rot = self._rot.copy()
+        elif self._rot is not None:
+            self._shared.add("rot")
+            traj_copy._shared.add("rot")
+
+        return traj_copy
+
+    def __deepcopy__(self, memo: dict) -> "Trajectory":
+        traj_copy = self.__class__.__new__(self.__class__)
+        memo[id(self)] = traj_copy
+        traj_copy.__dict__.update(copy.deepcopy(self.__dict__, memo))
+
+        # a deep copy shares nothing
+        traj_copy._shared = set()
+        traj_copy._rot_exposed = False
+        return traj_copy
+
+    def _unshare(self, name: str) -> None:
+        """Replaces a component that is shared with copies by a private copy before handing it out"""
+        if name not in self._shared:
+            return
+
+        self._shared.discard(name)
+        if name == "pos":
+            self._pos = copy.copy(self._pos)
+            self._pos.xyz = self._pos.xyz.copy()
+        elif name == "rot":
+            self._rot = self._rot.copy()
+        else:
+            setattr(self, f"_{name}", getattr(self, f"_{name}").copy())
+
+    def _select(self, name: str, array: np.ndarray, index: Union[list, np.ndarray, slice]) -> np.ndarray:
+        """Applies an index to a component array
+
+        Slices of shared components are read-only views and stay shared,
+        all other selections are new arrays.
+        """
+        if isinstance(index, slice) and name in self._shared:
+            return array[index]
+
+        self._shared.discard(name)
+        return array[index].copy() if isinstance(index, slice) else array[index]
+
+    def _replace_xyz(self, xyz: np.ndarray) -> None:
+        """Replaces the positions without modifying the point set, which may be used elsewhere"""
+        self._pos = copy.copy(self._pos)
+        self._pos.xyz = xyz
+        self._shared.discard("pos")
+        self._views.clear()
+
+    def _replace_rot(self, rot: Union[RotationSet, None]) -> None:
+        """Replaces the orientations by a new RotationSet that is not referenced elsewhere"""
+        self._rot = rot
+        self._rot_exposed = False
+        self._shared.discard("rot")
+        self._views.clear()
+
+    def _resolve_derived(self) -> None:
+        """Computes the pending speeds and arc lengths from the initial positions and timestamps"""
+        if not self._pending_fields:
+            return
+
+        pos, tstamps = self._derived_source
+        xyz = pos.to_local(inplace=False).xyz
+        index = slice(None) if self._derived_index is None else self._derived_index
+
+        if "speed_3d" in self._pending_fields:
+            self._speed_3d = gradient_3d(xyz=xyz, tstamps=tstamps)[index]
+
+        if "arc_lengths" in self._pending_fields:
+            self._arc_lengths = lengths_from_xyz(xyz)[index]
+
+        self._pending_fields.clear()
+        self._derived_source = None
+        self._derived_index = None
+
+    def _cached_view(self, name: str, compute: Callable[[], Union[np.ndarray, str]]) -> Union[np.ndarray, str]:
+        """Returns a cached sorting index, sorted property or hash, computing it if necessary"""
+        if name not in self._views:
+            self._views[name] = compute()
+
+        return self._views[name]
+
+    def _sorting_indices(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the cached sorting index and sort switching index"""
+
+        def sort_switching_index() -> np.ndarray:
+            sorting_index = self._cached_view("sorting_index", self._compute_sorting_index)
+            switching_index = np.empty_like(sorting_index)
+            switching_index[sorting_index] = np.arange(len(sorting_index))
+            return switching_index
+
+        return self._cached_view("sorting_index", self._compute_sorting_index), self._cached_view(
+            "sort_switching_index", sort_switching_index
+        )
+
+    def _compute_sorting_index(self) -> np.ndarray:
+        if self._sorting == Sorting.TIME:
+            return np.argsort(self._tstamps)
+
+        self._resolve_derived()
+        return np.argsort(self._arc_lengths)
+
+    @property
+    def sorting(self) -> Sorting:
+        """
+        Returns the sorting of the trajectory
+        """
+        return self._sorting
+
+    @sorting.setter
+    def sorting(self, sorting: Sorting) -> None:
+        self._sorting = sorting
+        self._views.clear()
+
+    @property
+    def pos(self) -> PointSet:
+        """
+        Returns the positions of the trajectory
+        """
+        self._unshare("pos")
+        self._views.clear()
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos: PointSet) -> None:
+        self._pos = pos
+        self._shared.discard("pos")
+        self._views.clear()
+
+    @property
+    def rot(self) -> Union[RotationSet, None]:
+        """
+        Returns the orientations of the trajectory
+        """
+        self._unshare("rot")
+        self._rot_exposed = self._rot is not None
+        self._views.clear()
+        return self._rot
+
+    @rot.setter
+    def rot(self, rot: Union[RotationSet, None]) -> None:
+        self._replace_rot(rot)
+        self._rot_exposed = rot is not None
+
+    @property
+    def tstamps(self) -> np.ndarray:
+        """
+        Returns the timestamps of the trajectory
+        """
+        self._unshare("tstamps")
+        self._views.clear()
+        return self._tstamps
+
+    @tstamps.setter
+    def tstamps(self, tstamps: np.ndarray) -> None:
+        self._tstamps = tstamps
+        self._shared.discard("tstamps")
+        self._views.clear()
+
+    @property
+    def arc_lengths(self) -> np.ndarray:
+        """
+        Returns the arc lengths of the trajectory
         """
-        return copy.deepcopy(self)
+        self._resolve_derived()
+        self._unshare("arc_lengths")
+        self._views.clear()
+        return self._arc_lengths
+
+    @arc_lengths.setter
+    def arc_lengths(self, arc_lengths: np.ndarray) -> None:
+        self._arc_lengths = arc_lengths
+        self._pending_fields.discard("arc_lengths")
+        self._shared.discard("arc_lengths")
+        self._views.clear()
 
     @classmethod
     def from_file(cls, filename: str, io_stream: bool = False) -> "Trajectory":
@@ -153,6 +432,8 @@ class Trajectory:
         by "vx", "vy" and "vz".
         The delimiter can be specified using the #delimiter
         tag. The default delimiter is a comma.
+        Binary files written by Trajectory.to_binary_file are detected
+        automatically.
 
         Args:
             filename (str): path to file
@@ -162,10 +443,38 @@ class Trajectory:
             Trajectory: trajectory object
         """
         if io_stream:
-            header_data, trajectory_data = trajectory_io.read_string(filename, dtype=object)
+            header_data, trajectory_data = trajectory_io.read_string(filename)
+        elif binary_io.is_binary_file(filename):
+            header_data, trajectory_data = binary_io.read_binary(filename)
         else:
-            header_data, trajectory_data = trajectory_io.read_data(filename, dtype=object)
+            header_data, trajectory_data = trajectory_io.read_data(filename)
+
+        return cls._from_data(header_data=header_data, trajectory_data=trajectory_data)
+
+    @classmethod
+    def iter_file_chunks(
+        cls, filename: str, chunk_size: int = trajectory_io.DEFAULT_CHUNK_SIZE
+    ) -> Iterator["Trajectory"]:
+        """Reads a trajectory file in chunks
+
+        The file format is the same as for Trajectory.from_file. However,
+        only chunk_size poses are held in memory at a time which allows
+        processing files that are too large to be loaded at once.
+        Arc lengths and speeds that are not contained in the file are
+        computed for each chunk individually.
+
+        Args:
+            filename (str): path to file
+            chunk_size (int, optional): Number of poses per chunk.
+
+        Yields:
+            Trajectory: trajectory object for each chunk
+        """
+        for header_data, trajectory_data in trajectory_io.read_data_chunks(filename, chunk_size=chunk_size):
+            yield cls._from_data(header_data=header_data, trajectory_data=trajectory_data)
 
+    @classmethod
+    def _from_data(cls, header_data: HeaderData, trajectory_data: np.ndarray) -> "Trajectory":
         tstamps = trajectory_io.extract_trajectory_timestamps(header_data=header_data, trajectory_data=trajectory_data)
         pos = trajectory_io.extract_trajectory_pointset(header_data=header_data, trajectory_data=trajectory_data)
         arc_lengths = trajectory_io.extract_trajectory_arc_lengths(
@@ -174,51 +483,65 @@ class Trajectory:
         speed_3d = trajectory_io.extract_trajectory_speed(header_data=header_data, trajectory_data=trajectory_data)
         rot = trajectory_io.extract_trajectory_rotations(header_data=header_data, trajectory_data=trajectory_data)
 
-        return Trajectory(
+        trajectory = Trajectory(
             tstamps=tstamps,
             pos=pos,
-            rot=rot,
             name=header_data.name,
             arc_lengths=arc_lengths,
             speed_3d=speed_3d,
         )
+        trajectory._replace_rot(rot)
+        return trajectory
 
     @property
     def sort_switching_index(self) -> np.ndarray:
         """
         Returns the index that switches the sorting of the trajectory
         """
-        return np.argsort(self.sorting_index)
+        return self._sorting_indices()[1].copy()
 
     @property
     def sorting_index(self) -> np.ndarray:
         """
         Returns the index that sorts the trajectory
         """
-        return np.argsort(self.tstamps) if self.sorting == Sorting.TIME else np.argsort(self.arc_lengths)
+        return self._sorting_indices()[0].copy()
 
     @property
     def function_of(self) -> np.ndarray:
         """
         Returns the function of the trajectory
         """
-        return (
-            self.tstamps[self.sorting_index] if self.sorting == Sorting.TIME else self.arc_lengths[self.sorting_index]
-        )
+
+        def function_of() -> np.ndarray:
+            sorting_index = self._sorting_indices()[0]
+            if self._sorting == Sorting.TIME:
+                return self._tstamps[sorting_index]
+
+            return self._arc_lengths[sorting_index]
+
+        return self._cached_view("function_of", function_of).copy()
+
+    @property
+    def content_hash(self) -> str:
+        """
+        Returns a hash of the positions and timestamps of the trajectory
+        """
+        return self._cached_view("content_hash", lambda: hash_arrays(self._pos.xyz, self._tstamps))
 
     @property
     def function_of_unit(self) -> str:
         """
         Returns the unit of the function of the trajectory
         """
-        return "s" if self.sorting == Sorting.TIME else "m"
+        return "s" if self._sorting == Sorting.TIME else "m"
 
     @property
     def function_of_label(self) -> str:
         """
         Returns the label of the function of the trajectory
         """
-        return "time [s]" if self.sorting == Sorting.TIME else "arc length [m]"
+        return "time [s]" if self._sorting == Sorting.TIME else "arc length [m]"
 
     @property
     def xyz(self) -> np.ndarray:
@@ -228,7 +551,7 @@ class Trajectory:
         In contrast to the pos.xyz attribute, this method
         reflects the current sorting of the trajectory.
         """
-        return self.pos.xyz[self.sorting_index]
+        return self._cached_view("xyz", lambda: self._pos.xyz[self._sorting_indices()[0]]).copy()
 
     @property
     def quat(self) -> np.ndarray:
@@ -238,10 +561,10 @@ class Trajectory:
         In contrast to the rot.as_quat() attribute, this method
         reflects the current sorting of the trajectory.
         """
-        if self.rot is None:
+        if self._rot is None:
             return np.zeros((len(self), 4))
 
-        return self.rot.as_quat()[self.sorting_index]
+        return self._cached_view("quat", lambda: self._rot.as_quat()[self._sorting_indices()[0]]).copy()
 
     @property
     def rpy(self) -> np.ndarray:
@@ -251,7 +574,10 @@ class Trajectory:
         In contrast to the rot.as_euler(seq="xyz") attribute, this method
         reflects the current sorting of the trajectory.
         """
-        return RotationSet.from_quat(self.quat).as_euler(seq="xyz")
+        if self._rot is None:
+            return RotationSet.from_quat(self.quat).as_euler(seq="xyz")
+
+        return self._cached_view("rpy", lambda: self._rot.as_euler(seq="xyz")[self._sorting_indices()[0]]).copy()
 
     def to_dataframe(self, sort_by: str = "") -> pd.DataFrame:
         """
@@ -268,10 +594,11 @@ class Trajectory:
         Returns:
             pd.DataFrame: Trajectory as dataframe
         """
+        self._resolve_derived()
         sort_by = sort_by or self.sorting
-        if self.rot:
+        if self._rot:
             dataframe = pd.DataFrame(
-                np.c_[self.tstamps, self.arc_lengths, self.pos.xyz, self.rot.as_quat(), self.speed_3d],
+                np.c_[self._tstamps, self._arc_lengths, self._pos.xyz, self._rot.as_quat(), self._speed_3d],
                 columns=[
                     "time",
                     "arc_length",
@@ -289,7 +616,7 @@ class Trajectory:
             )
         else:
             dataframe = pd.DataFrame(
-                np.c_[self.tstamps, self.arc_lengths, self.pos.xyz, self.speed_3d],
+                np.c_[self._tstamps, self._arc_lengths, self._pos.xyz, self._speed_3d],
                 columns=["time", "arc_length", "pos_x", "pos_y", "pos_z", "speed_x", "speed_y", "speed_z"],
             )
 
@@ -304,98 +631,115 @@ class Trajectory:
         Args:
             filename (str): Output filename
         """
+        header_data, trajectory_data = self._to_data()
+
+        with open(filename, mode=mode, newline="\n", encoding="utf-8") as file:
+            file.write(f"#epsg {header_data.epsg}\n")
+            file.write(f"#name {header_data.name}\n")
+            file.write(f"#nframe {header_data.nframe}\n")
+            file.write(f"#fields {','.join(header_data.fields)}\n")
+
+        pd.DataFrame(trajectory_data).to_csv(filename, header=False, index=False, mode="a", float_format="%.9f")
+
+    def to_binary_file(self, filename: str) -> None:
+        """Writes trajectory to a binary file
 
-        def write_header(filename: str, mode: str = "w") -> None:
-            fields = "t,l,px,py,pz,vx,vy,vz" if self.rot is None else "t,l,px,py,pz,qx,qy,qz,qw,vx,vy,vz"
-            with open(filename, mode=mode, newline="\n", encoding="utf-8") as file:
-                file.write(f"#epsg {self.pos.epsg}\n")
-                file.write(f"#name {self.name}\n")
-                file.write("#nframe enu\n")
-                file.write(f"#fields {fields}\n")
+        In contrast to to_file, the data is stored without loss of
+        precision and can be read without parsing. Trajectory.from_file
+        detects binary files automatically. It copies each field once from
+        the memory-mapped file, i.e. the trajectory is writable and does not
+        depend on the file afterwards.
 
-        if self.rot is None:
-            trajectory_data = np.c_[self.tstamps, self.arc_lengths, self.pos.xyz, self.speed_3d]
+        Args:
+            filename (str): Output filename
+        """
+        header_data, trajectory_data = self._to_data()
+        binary_io.write_binary(filename, header_data=header_data, data=trajectory_data)
+
+    def _to_data(self) -> Tuple[HeaderData, np.ndarray]:
+        """Returns the header data and the data written to trajectory files"""
+        self._resolve_derived()
+        if self._rot is None:
+            fields = "t,l,px,py,pz,vx,vy,vz"
+            trajectory_data = np.c_[self._tstamps, self._arc_lengths, self._pos.xyz, self._speed_3d]
         else:
+            fields = "t,l,px,py,pz,qx,qy,qz,qw,vx,vy,vz"
             trajectory_data = np.c_[
-                self.tstamps,
-                self.arc_lengths,
-                self.pos.xyz,
-                self.rot.as_quat(),
-                self.speed_3d,
+                self._tstamps,
+                self._arc_lengths,
+                self._pos.xyz,
+                self._rot.as_quat(),
+                self._speed_3d,
             ]
 
-        write_header(filename=filename, mode=mode)
-        pd.DataFrame(trajectory_data).to_csv(filename, header=False, index=False, mode="a", float_format="%.9f")
+        header_data = HeaderData({"epsg": self._pos.epsg, "name": self.name, "nframe": "enu", "fields": fields})
+        return header_data, trajectory_data
 
     @classmethod
     def from_numpy(cls, xyz: np.ndarray, quat: np.ndarray, tstamps: np.ndarray, epsg: int = 0) -> "Trajectory":
         """
         Initialize trajectory using numpy arrays
         """
-        pos = PointSet(xyz=xyz, epsg=epsg)
-        rot = RotationSet.from_quat(quat)
-        return Trajectory(pos=pos, rot=rot, tstamps=tstamps)
+        trajectory = Trajectory(pos=PointSet(xyz=xyz, epsg=epsg), tstamps=tstamps)
+        trajectory._replace_rot(RotationSet.from_quat(quat))
+        return trajectory
 
     @property
-    def se3(self) -> List[np.ndarray]:
-        """
-        Returns SE3 pose list
+    def se3(self) -> PoseSet:
         """
-        se3_list: List[np.ndarray] = []
-        xyz = self.pos.xyz
+        Returns SE3 poses
 
-        if len(xyz) == 0:
-            return se3_list
+        The PoseSet is a sequence of 4x4 matrices and can be used like
+        the list of matrices returned by earlier versions.
+        """
+        if len(self._pos.xyz) == 0:
+            return PoseSet(np.zeros((0, 4, 4)))
 
-        matrices = [np.eye(3)] * len(xyz) if self.rot is None else self.rot.as_matrix()
-        for t, r in zip(xyz, matrices):
-            se3 = np.eye(4)
-            se3[:3, 3] = t
-            se3[:3, :3] = r
-            se3_list.append(se3)
-        return se3_list
+        return PoseSet.from_components(
+            xyz=self._pos.xyz, rot_matrices=None if self._rot is None else self._rot.as_matrix()
+        )
 
     @se3.setter
-    def se3(self, se3_list: List[np.ndarray]) -> None:
+    def se3(self, se3: Union[PoseSet, List[np.ndarray], np.ndarray]) -> None:
         """
-        Sets position and rotation from se3 list
+        Sets position and rotation from SE3 poses
         """
-        xyz = np.zeros((len(se3_list), 3))
-        matrices = np.zeros((len(se3_list), 3, 3))
-
-        for i, pose in enumerate(se3_list):
-            xyz[i, :] = pose[:3, 3]
-            matrices[i, :, :] = pose[:3, :3]
+        se3 = se3 if isinstance(se3, PoseSet) else PoseSet(np.reshape(se3, (-1, 4, 4)))
 
-        self.pos.xyz = xyz
-        self.rot = RotationSet.from_matrix(matrices)
+        self._replace_xyz(se3.xyz.copy())
+        self._replace_rot(RotationSet.from_matrix(se3.rot_matrices))
 
     @property
     def data_rate(self) -> float:
         """
         Returns data rate
         """
-        return 1 / np.mean(np.diff(np.sort(self.tstamps)))
+        return 1 / np.mean(np.diff(np.sort(self._tstamps)))
 
     @property
     def total_length(self) -> float:
         """
         Return the total trajectory arc_length.
         """
-        return 0.0 if len(self.arc_lengths) == 0 else self.arc_lengths[-1]
+        self._resolve_derived()
+        return 0.0 if len(self._arc_lengths) == 0 else self._arc_lengths[-1]
 
     @property
     def speed_3d(self) -> np.ndarray:
         """Returns computed speeds or custom speeds"""
+        self._resolve_derived()
         if self._speed_3d is not None:
+            self._unshare("speed_3d")
             return self._speed_3d
 
-        return gradient_3d(xyz=self.pos.to_local(inplace=False).xyz, tstamps=self.tstamps)
+        return gradient_3d(xyz=self._pos.to_local(inplace=False).xyz, tstamps=self._tstamps)
 
     @speed_3d.setter
     def speed_3d(self, speed_3d: np.ndarray) -> None:
         """Sets custom speeds"""
         self._speed_3d = speed_3d
+        self._pending_fields.discard("speed_3d")
+        self._shared.discard("speed_3d")
 
     @property
     def speed(self) -> np.ndarray:
@@ -422,13 +766,16 @@ class Trajectory:
         Returns:
             Trajectory: Cropped trajectory
         """
+        # sorted timestamps are cropped using a slice instead of a boolean mask
+        if not inverse and np.all(np.diff(self._tstamps) >= 0):
+            index_start = np.searchsorted(self._tstamps, t_start, side="left")
+            index_end = np.searchsorted(self._tstamps, t_end, side="right")
+            return self.apply_index(index=slice(index_start, index_end), inplace=inplace)
+
         # filter to t_start and t_end
-        if inverse:
-            filt = [not t_start <= tstamps <= t_end for tstamps in self.tstamps]
-        else:
-            filt = [t_start <= tstamps <= t_end for tstamps in self.tstamps]
+        filt = (self._tstamps >= t_start) & (self._tstamps <= t_end)
 
-        return self.apply_index(index=filt, inplace=inplace)
+        return self.apply_index(index=~filt if inverse else filt, inplace=inplace)
 
     def interpolate(self, tstamps: Union[list, np.ndarray], inplace: bool = True) -> "Trajectory":
         """Interpolates a trajectory to specified timestamps
@@ -449,12 +796,13 @@ class Trajectory:
         """
         tstamps = np.sort(tstamps)
         traj_self = self if inplace else self.copy()
-        tstamps_cropped = np.array([tstamp for tstamp in tstamps if self.tstamps[0] <= tstamp <= self.tstamps[-1]])
+        tstamps_cropped = tstamps[(tstamps >= self._tstamps[0]) & (tstamps <= self._tstamps[-1])]
 
         traj_self._interpolate_positions(tstamps_cropped)  # pylint: disable=protected-access
         traj_self._interpolate_rotations(tstamps_cropped)  # pylint: disable=protected-access
-        traj_self.speed_3d = gradient_3d(xyz=traj_self.pos.xyz, tstamps=tstamps_cropped)
-        traj_self.arc_lengths = np.interp(tstamps_cropped, traj_self.tstamps, traj_self.arc_lengths)
+        traj_self.speed_3d = gradient_3d(xyz=traj_self._pos.xyz, tstamps=tstamps_cropped)
+        traj_self._resolve_derived()
+        traj_self.arc_lengths = interpolate_linear(tstamps_cropped, traj_self._tstamps, traj_self._arc_lengths)
         traj_self.tstamps = tstamps_cropped
 
         logger.info("Interpolated %s", traj_self.name)
@@ -476,14 +824,13 @@ class Trajectory:
         """
         traj_self = self if inplace else self.copy()
 
-        if not self.rot or len(tstamps) == 0:
+        if not self._rot or len(tstamps) == 0:
             return traj_self
 
         # spherical linear orientation interpolation
         # Slerp interpolation, as geodetic curve on unit sphere
-        slerp = Slerp(traj_self.tstamps, traj_self.rot)
-        r_i = slerp(tstamps)
-        traj_self.rot = RotationSet.from_quat(r_i.as_quat())
+        quat_i = interpolate_slerp(np.asarray(tstamps), traj_self._tstamps, traj_self._rot.as_quat())
+        traj_self._replace_rot(RotationSet.from_quat(quat_i))
         return traj_self
 
     def _interpolate_positions(self, tstamps: np.ndarray, inplace: bool = True) -> "Trajectory":
@@ -498,10 +845,7 @@ class Trajectory:
         """
         traj_self = self if inplace else self.copy()
 
-        x_i = np.interp(tstamps, traj_self.tstamps, traj_self.pos.x)
-        y_i = np.interp(tstamps, traj_self.tstamps, traj_self.pos.y)
-        z_i = np.interp(tstamps, traj_self.tstamps, traj_self.pos.z)
-        traj_self.pos.xyz = np.c_[x_i, y_i, z_i]
+        traj_self._replace_xyz(interpolate_linear(tstamps, traj_self._tstamps, traj_self._pos.xyz))
         return traj_self
 
     def match_timestamps(self, tstamps: np.ndarray, inplace: bool = True) -> "Trajectory":
@@ -515,7 +859,7 @@ class Trajectory:
             Trajectory: Trajectory with matched timestamps
         """
         traj_self = self if inplace else self.copy()
-        _, idx_self, _ = np.intersect1d(traj_self.tstamps, tstamps, return_indices=True)
+        _, idx_self, _ = np.intersect1d(traj_self._tstamps, tstamps, return_indices=True)
         traj_self.apply_index(idx_self)
         return traj_self
 
@@ -544,7 +888,7 @@ class Trajectory:
             Trajectory: Intersected trajectory
         """
         traj_self = self if inplace else self.copy()
-        time_span = common_time_span(tstamps1=tstamps, tstamps2=traj_self.tstamps)
+        time_span = common_time_span(tstamps1=tstamps, tstamps2=traj_self._tstamps)
 
         if time_span is None:
             raise ValueError("intersect_both: Timespans do not overlap!")
@@ -552,21 +896,18 @@ class Trajectory:
         traj_self.crop(t_start=time_span[0], t_end=time_span[1])
 
         tstamps_sorted = np.sort(tstamps)
-        lower_neighbor_list = np.searchsorted(tstamps_sorted, traj_self.tstamps, side="right") - 1
-
-        filter_index = [
-            idx
-            for idx, (tstamp, lower_neighbor) in enumerate(zip(traj_self.tstamps, lower_neighbor_list))
-            if (
-                tstamps_sorted[lower_neighbor] == tstamp
-                or (tstamps_sorted[lower_neighbor + 1] - tstamps_sorted[lower_neighbor]) <= max_gap_size
-            )
-        ]
-        traj_self.apply_index(np.array(filter_index, dtype=int))
+        lower_neighbor = np.searchsorted(tstamps_sorted, traj_self._tstamps, side="right") - 1
+        upper_neighbor = np.minimum(lower_neighbor + 1, len(tstamps_sorted) - 1)
+
+        # keep timestamps that are either contained in tstamps or not within a gap
+        filt = (tstamps_sorted[lower_neighbor] == traj_self._tstamps) | (
+            tstamps_sorted[upper_neighbor] - tstamps_sorted[lower_neighbor] <= max_gap_size
+        )
+        traj_self.apply_index(filt)
 
         return traj_self
 
-    def apply_index(self, index: Union[list, np.ndarray], inplace: bool = True) -> "Trajectory":
+    def apply_index(self, index: Union[list, np.ndarray, slice], inplace: bool = True) -> "Trajectory":
         """Applies index to the trajectory
 
         This will be done either in-place or using a new
@@ -581,7 +922,7 @@ class Trajectory:
         - sorting index (_sort_index)
 
         Args:
-            index (Union[list, np.ndarray]): index that should be applied
+            index (Union[list, np.ndarray, slice]): index that should be applied
             inplace (bool, optional): Perform in-place. Defaults to True.
 
         Returns:
@@ -589,18 +930,27 @@ class Trajectory:
         """
         traj_self = self if inplace else self.copy()
 
-        traj_self.tstamps = traj_self.tstamps[index]
-        traj_self.pos.xyz = traj_self.pos.xyz[index, :]
+        # pending speeds and arc lengths are selected when they are computed
+        if traj_self._pending_fields:
+            derived_index = np.arange(len(traj_self)) if traj_self._derived_index is None else traj_self._derived_index
+            traj_self._derived_index = derived_index[index]
+
+        traj_self._tstamps = traj_self._select("tstamps", traj_self._tstamps, index)
 
-        if traj_self.rot:
-            quat_filtered = traj_self.rot.as_quat()[index, :]
-            traj_self.rot = RotationSet.from_quat(quat_filtered)
+        pos = copy.copy(traj_self._pos)
+        pos.xyz = traj_self._select("pos", traj_self._pos.xyz, index)
+        traj_self._pos = pos
 
-        traj_self.arc_lengths = traj_self.arc_lengths[index]
+        if traj_self._rot:
+            traj_self._replace_rot(RotationSet.from_quat(traj_self._rot.as_quat()[index, :]))
 
-        if traj_self.speed_3d is not None:
-            traj_self.speed_3d = traj_self.speed_3d[index]
+        if "arc_lengths" not in traj_self._pending_fields:
+            traj_self._arc_lengths = traj_self._select("arc_lengths", traj_self._arc_lengths, index)
 
+        if traj_self._speed_3d is not None:
+            traj_self._speed_3d = traj_self._select("speed_3d", traj_self._speed_3d, index)
+
+        traj_self._views.clear()
         return traj_self
 
     def apply_transformation(self, transformation: np.ndarray, inplace: bool = True) -> "Trajectory":
@@ -615,7 +965,7 @@ class Trajectory:
 
         """
         traj_self = self if inplace else self.copy()
-        traj_self.se3 = [np.dot(transformation, p) for p in traj_self.se3]
+        traj_self.se3 = transformation @ traj_self.se3
         return traj_self
 
     def apply_alignment(self, alignment_result: AlignmentResult, inplace: bool = True) -> "Trajectory":
@@ -635,8 +985,8 @@ class Trajectory:
         def _prepare_alignment_application(
             trajectory: Trajectory, alignment_parameters: AlignmentParameters
         ) -> Tuple[float, ...]:
-            if trajectory.rot is not None:
-                rpy = trajectory.rot.as_euler("xyz", degrees=False)
+            if trajectory._rot is not None:
+                rpy = trajectory._rot.as_euler("xyz", degrees=False)
                 euler_x, euler_y, euler_z = rpy[:, 0], rpy[:, 1], rpy[:, 2]
                 lever_x, lever_y, lever_z = (
                     alignment_parameters.lever_x.value,
@@ -650,7 +1000,7 @@ class Trajectory:
 
             return euler_x, euler_y, euler_z, lever_x, lever_y, lever_z
 
-        trajectory = trajectory if inplace else self.copy()
+        trajectory = self if inplace else self.copy()
 
         # leverarm and time
         (
@@ -662,7 +1012,8 @@ class Trajectory:
             lever_z,
         ) = _prepare_alignment_application(trajectory, alignment_result.position_parameters)
 
-        speed_3d = trajectory.speed_3d
+        trajectory._resolve_derived()
+        speed_3d = trajectory._speed_3d
         speed_x, speed_y, speed_z = speed_3d[:, 0], speed_3d[:, 1], speed_3d[:, 2]
 
         trafo_x, trafo_y, trafo_z = leverarm_time_component(
@@ -677,7 +1028,7 @@ class Trajectory:
             speed_y=speed_y,
             speed_z=speed_z,
         )
-        trajectory.pos.xyz += np.c_[trafo_x, trafo_y, trafo_z]
+        trajectory._replace_xyz(trajectory._pos.xyz + np.c_[trafo_x, trafo_y, trafo_z])
 
         # similiarity transformation
         trajectory.apply_transformation(alignment_result.position_parameters.sim3_matrix)
@@ -685,8 +1036,8 @@ class Trajectory:
         logger.info("Applied alignment parameters to positions.")
 
         # sensor orientation
-        if trajectory.rot is not None:
-            trajectory.rot = alignment_result.rotation_parameters.rotation_set * trajectory.rot
+        if trajectory._rot is not None:
+            trajectory._replace_rot(alignment_result.rotation_parameters.rotation_set * trajectory._rot)
             logger.info("Applied alignment parameters to orientations.")
 
         return trajectory
@@ -705,7 +1056,7 @@ class Trajectory:
             Trajectory: Sorted trajectory.
 
         """
-        sort_idx, arc_lengths = sort_mls(xyz_unsorted=self.pos.xyz, settings=sorting_settings)
+        sort_idx, arc_lengths = sort_mls(xyz_unsorted=self._pos.xyz, settings=sorting_settings)
         arg_sort_sort_idx = np.argsort(sort_idx)
         trajectory = self.apply_index(sorted(sort_idx), inplace=inplace)
         trajectory.arc_lengths = arc_lengths[arg_sort_sort_idx]
@@ -732,8 +1083,9 @@ class Trajectory:
             min_obs=approximation_settings.fe_min_obs,
         )
 
+        sort_switching_index = self._sorting_indices()[1]
         traj_approx = self if inplace else self.copy()
-        traj_approx.pos.xyz = xyz_approx[self.sort_switching_index, :]
+        traj_approx._replace_xyz(xyz_approx[sort_switching_index, :])
 
         if not traj_approx.has_orientation:
             return traj_approx
@@ -743,7 +1095,7 @@ class Trajectory:
             quat=self.quat,
             win_size=approximation_settings.rot_approx_win_size,
         )
-        traj_approx.rot = RotationSet.from_quat(quat_approx[self.sort_switching_index, :])
+        traj_approx._replace_rot(RotationSet.from_quat(quat_approx[sort_switching_index, :]))
 
         return traj_approx
 
@@ -773,8 +1125,8 @@ class Trajectory:
             Trajectory: Transformed trajectory
         """
         trajectory = self if inplace else self.copy()
-        position_difference = trajectory.pos.xyz[0, :] - trajectory.pos.xyz[0, :]
-        trajectory.pos.xyz += position_difference
+        position_difference = trajectory._pos.xyz[0, :] - trajectory._pos.xyz[0, :]
+        trajectory._replace_xyz(trajectory._pos.xyz + position_difference)
         return trajectory
 
     def adopt_first_orientation(self, trajectory: "Trajectory", inplace: bool = True) -> "Trajectory":
@@ -788,10 +1140,10 @@ class Trajectory:
             Trajectory: Transformed trajectory
         """
         trajectory = self if inplace else self.copy()
-        if self.rot is not None and trajectory.rot is not None:
-            rpy_from = trajectory.rot.as_euler(seq="xyz")
-            rotation_difference = trajectory.rot.as_euler(seq="xyz")[0, :] - rpy_from[0, :]
+        if self._rot is not None and trajectory._rot is not None:
+            rpy_from = trajectory._rot.as_euler(seq="xyz")
+            rotation_difference = trajectory._rot.as_euler(seq="xyz")[0, :] - rpy_from[0, :]
 
-            trajectory.rot = RotationSet.from_euler(seq="xyz", angles=rpy_from + rotation_difference)
+            trajectory._replace_rot(RotationSet.from_euler(seq="xyz", angles=rpy_from + rotation_difference))
 
         return trajectory
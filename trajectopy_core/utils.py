@@ -5,6 +5,7 @@ Gereon Tombrink, 2023
 mail@gtombrink.de
 """
 
+import hashlib
 import logging
 from dataclasses import dataclass
 from typing import List, Tuple, Union
@@ -74,6 +75,25 @@ class Line3D:
         return [self.mean[0] + tr[0], self.mean[1] + tr[1], self.mean[2] + tr[2]]
 
 
+def fit_lines(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Fits a 3D line to each set of points at once.
+
+    Batched version of Line3D.from_points: The mean point of each
+    line is the mean of its points and the direction is the eigenvector
+    corresponding to the largest eigenvalue of the scatter matrix.
+
+    Args:
+        points (np.ndarray): Sets of k points each [m x k x 3].
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Line mean points [m x 3] and line directions [m x 3].
+    """
+    means = np.mean(points, axis=1)
+    centered_points = points - means[:, None, :]
+    scatter = np.einsum("nki,nkj->nij", centered_points, centered_points)
+    return means, np.linalg.eigh(scatter)[1][:, :, -1]
+
+
 def lengths_from_xyz(xyz: np.ndarray) -> np.ndarray:
     """
     Computes the cumulative distance along a path defined by a sequence of
@@ -116,7 +136,109 @@ def gradient_3d(xyz: np.ndarray, tstamps: np.ndarray) -> np.ndarray:
     t_diff = tstamps[1:] - tstamps[:-1]
 
     # no gradient for last position
-    return np.r_[diff / t_diff[:, None], np.zeros((1, 3))]
+    gradient = np.zeros_like(xyz, dtype=float)
+    valid = t_diff != 0
+    gradient[:-1][valid] = diff[valid] / t_diff[valid, None]
+
+    if np.all(valid):
+        return gradient
+
+    # repeated timestamps get the gradient of the next distinct timestamp
+    next_valid = np.where(np.r_[valid, True], np.arange(len(xyz)), len(xyz) - 1)
+    return gradient[np.minimum.accumulate(next_valid[::-1])[::-1]]
+
+
+def _interval_weights(x: np.ndarray, xp: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the indices of the lower neighbors of x in xp and the
+    interpolation weights between them and their upper neighbors.
+
+    Intervals of zero width, e.g. from repeated sample locations, get a weight of zero.
+    """
+    lower = np.clip(np.searchsorted(xp, x, side="right") - 1, 0, len(xp) - 2)
+    widths = xp[lower + 1] - xp[lower]
+    valid = widths != 0
+    weights = np.zeros(len(lower))
+    weights[valid] = (x[valid] - xp[lower[valid]]) / widths[valid]
+    return lower, weights
+
+
+def interpolate_linear(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """
+    Linearly interpolates all columns of fp at the locations x.
+
+    In contrast to calling np.interp for each column, the neighbors
+    of x are searched only once.
+
+    Args:
+        x (np.ndarray): Interpolation locations within the range of xp [m].
+        xp (np.ndarray): Sorted sample locations [n].
+        fp (np.ndarray): Sample values [n] or [nxk].
+
+    Returns:
+        np.ndarray: Interpolated values [m] or [mxk].
+    """
+    if len(xp) == 1:
+        return np.repeat(fp, len(x), axis=0)
+
+    lower, weights = _interval_weights(x, xp)
+
+    f_lower = np.take(fp, lower, axis=0)
+    f_upper = np.take(fp, lower + 1, axis=0)
+    return f_lower + np.reshape(weights, weights.shape + (1,) * (fp.ndim - 1)) * (f_upper - f_lower)
+
+
+def interpolate_slerp(x: np.ndarray, xp: np.ndarray, quat: np.ndarray) -> np.ndarray:
+    """
+    Spherical linear interpolation of unit quaternions at the locations x.
+
+    Only the quaternions neighboring x are used, i.e. the interpolation
+    is along the shortest path between them.
+
+    Args:
+        x (np.ndarray): Interpolation locations within the range of xp [m].
+        xp (np.ndarray): Sorted sample locations [n].
+        quat (np.ndarray): Unit quaternions [nx4].
+
+    Returns:
+        np.ndarray: Interpolated unit quaternions [mx4].
+    """
+    if len(xp) == 1:
+        return np.repeat(quat, len(x), axis=0)
+
+    lower, weights = _interval_weights(x, xp)
+
+    return slerp(np.take(quat, lower, axis=0), np.take(quat, lower + 1, axis=0), weights)
+
+
+def slerp(quat_lower: np.ndarray, quat_upper: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Spherical linear interpolation between pairs of unit quaternions.
+
+    Args:
+        quat_lower (np.ndarray): Unit quaternions at weight 0 [mx4].
+        quat_upper (np.ndarray): Unit quaternions at weight 1 [mx4].
+        weights (np.ndarray): Interpolation weights [m].
+
+    Returns:
+        np.ndarray: Interpolated unit quaternions [mx4].
+    """
+    # shortest path
+    cos_angle = np.sum(quat_lower * quat_upper, axis=1)
+    quat_upper = np.where(cos_angle[:, None] < 0, -quat_upper, quat_upper)
+    cos_angle = np.abs(cos_angle)
+
+    angle = np.arccos(np.minimum(cos_angle, 1.0))
+    sin_angle = np.sin(angle)
+
+    # linear interpolation for almost identical quaternions
+    small_angle = sin_angle < 1e-9
+    sin_angle[small_angle] = 1.0
+    weights_lower = np.where(small_angle, 1 - weights, np.sin((1 - weights) * angle) / sin_angle)
+    weights_upper = np.where(small_angle, weights, np.sin(weights * angle) / sin_angle)
+
+    quat_interp = weights_lower[:, None] * quat_lower + weights_upper[:, None] * quat_upper
+    return quat_interp / np.linalg.norm(quat_interp, axis=1, keepdims=True)
 
 
 def common_time_span(tstamps1: np.ndarray, tstamps2: np.ndarray) -> Union[Tuple[float, float], None]:
@@ -150,6 +272,30 @@ def common_time_span(tstamps1: np.ndarray, tstamps2: np.ndarray) -> Union[Tuple[
     return (t_start, t_end)
 
 
+def hash_arrays(*arrays: np.ndarray) -> str:
+    """
+    Computes a hash of the shapes and float contents of arrays.
+
+    Args:
+        *arrays (np.ndarray): Arrays to hash
+
+    Returns:
+        str: Hexadecimal hash
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=float)
+        digest.update(str(array.shape).encode("utf-8"))
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+def read_only(array: np.ndarray) -> np.ndarray:
+    """Marks an array as read-only and returns it"""
+    array.flags.writeable = False
+    return array
+
+
 def rndodd(s: float) -> int:
     """
     Rounds a float to the nearest odd integer.